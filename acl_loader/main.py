@@ -4,14 +4,15 @@ import click
 import ipaddress
 import json
 import syslog
-import operator
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
-import openconfig_acl
 import tabulate
-import pyangbind.lib.pybindJSON as pybindJSON
 from natsort import natsorted
 from sonic_py_common import multi_asic
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
+from utilities_common.db_pipeline import DEFAULT_BATCH_SIZE, chunked, get_pipelined_client
 from utilities_common.general import load_db_config
 
 def info(msg):
@@ -68,6 +69,13 @@ class AclLoaderException(Exception):
     pass
 
 
+# Rule keys to write by incremental update, and the number of unchanged rules
+AclRuleDiff = namedtuple("AclRuleDiff", ["added", "changed", "removed", "unchanged"])
+
+# Outcome of an incremental update in one Config DB
+AclUpdateReport = namedtuple("AclUpdateReport", ["added", "changed", "removed", "unchanged", "writes", "round_trips"])
+
+
 class AclLoader(object):
 
     ACL_TABLE = "ACL_TABLE"
@@ -86,6 +94,9 @@ class AclLoader(object):
     min_priority = 1
     max_priority = 10000
 
+    # Rules written per pipelined round trip by incremental update
+    incremental_batch_size = DEFAULT_BATCH_SIZE
+
     ethertype_map = {
         "ETHERTYPE_LLDP": 0x88CC,
         "ETHERTYPE_VLAN": 0x8100,
@@ -117,6 +128,7 @@ class AclLoader(object):
         self.tables_db_info = {}
         self.rules_db_info = {}
         self.rules_info = {}
+        self.capabilities = {}
 
         # Load database config files
         load_db_config()
@@ -332,6 +344,25 @@ class AclLoader(object):
 
     @staticmethod
     def parse_acl_json(filename):
+        """
+        Parse file with ACL rules configuration in openconfig ACL format
+        with the fast loader
+        :param filename: File in openconfig ACL format
+        :return: ACL sets laid out like the openconfig_acl binding
+        """
+        return AclJsonLoader.load(filename)
+
+    @staticmethod
+    def parse_acl_json_yang(filename):
+        """
+        Parse file with ACL rules configuration in openconfig ACL format
+        into the pyangbind openconfig_acl binding
+        :param filename: File in openconfig ACL format
+        :return: openconfig_acl binding
+        """
+        import openconfig_acl
+        import pyangbind.lib.pybindJSON as pybindJSON
+
         yang_acl = pybindJSON.load(filename, openconfig_acl, "openconfig_acl")
         # Check pybindJSON parsing
         # pybindJSON.load will silently return an empty json object if input invalid
@@ -341,14 +372,18 @@ class AclLoader(object):
                 raise AclLoaderException("Invalid input file %s" % filename)
         return yang_acl
 
-    def load_rules_from_file(self, filename):
+    def load_rules_from_file(self, filename, use_pyangbind=False):
         """
         Load file with ACL rules configuration in openconfig ACL format. Convert rules
         to Config DB schema.
         :param filename: File in openconfig ACL format
+        :param use_pyangbind: Parse the file with the pyangbind binding instead of the fast loader
         :return:
         """
-        self.yang_acl = AclLoader.parse_acl_json(filename)
+        if use_pyangbind:
+            self.yang_acl = AclLoader.parse_acl_json_yang(filename)
+        else:
+            self.yang_acl = AclLoader.parse_acl_json(filename)
         self.convert_rules()
 
     def convert_action(self, table_name, rule_idx, rule):
@@ -386,6 +421,29 @@ class AclLoader(object):
 
         return rule_props
 
+    def get_capabilities(self, stage):
+        """
+        Get the ACL stage and switch capabilities from state DB. They are
+        static, so they are read once per stage rather than once per rule.
+        :param stage: ACL stage
+        :return: Tuple of ACL stage capability and switch capability
+        """
+        stage = stage.upper()
+        if stage not in self.capabilities:
+            # check if per npu state db is there then read using first state db
+            # else read from global statedb
+            if self.per_npu_statedb:
+                # For multi-npu we will read using anyone statedb connector for front asic namespace.
+                # Same information should be there in all state DB's
+                # as it is static information about switch capability
+                statedb = list(self.per_npu_statedb.values())[0]
+            else:
+                statedb = self.statedb
+            aclcapability = statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage))
+            switchcapability = statedb.get_all(self.statedb.STATE_DB, "{}|switch".format(self.SWITCH_CAPABILITY_TABLE))
+            self.capabilities[stage] = (aclcapability, switchcapability)
+        return self.capabilities[stage]
+
     def validate_actions(self, table_name, action_props):
         if self.is_table_control_plane(table_name):
             return True
@@ -397,18 +455,7 @@ class AclLoader(object):
 
         stage = self.tables_db_info[table_name].get("stage", Stage.INGRESS)
 
-        # check if per npu state db is there then read using first state db
-        # else read from global statedb
-        if self.per_npu_statedb:
-            # For multi-npu we will read using anyone statedb connector for front asic namespace.
-            # Same information should be there in all state DB's
-            # as it is static information about switch capability
-            namespace_statedb = list(self.per_npu_statedb.values())[0]
-            aclcapability = namespace_statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage.upper()))
-            switchcapability = namespace_statedb.get_all(self.statedb.STATE_DB, "{}|switch".format(self.SWITCH_CAPABILITY_TABLE))
-        else:
-            aclcapability = self.statedb.get_all(self.statedb.STATE_DB, "{}|{}".format(self.ACL_STAGE_CAPABILITY_TABLE, stage.upper()))
-            switchcapability = self.statedb.get_all(self.statedb.STATE_DB, "{}|switch".format(self.SWITCH_CAPABILITY_TABLE))
+        aclcapability, switchcapability = self.get_capabilities(stage)
         for action_key in dict(action_props):
             action_list_key = self.ACL_ACTIONS_CAPABILITY_FIELD
             if action_list_key not in aclcapability:
@@ -691,80 +738,109 @@ class AclLoader(object):
         for namespace_configdb in self.per_npu_configdb.values():
             namespace_configdb.mod_config({self.ACL_RULE: self.rules_info})
 
-    def incremental_update(self):
+    def get_rule_diff(self):
         """
-        Perform incremental ACL rules configuration update. Get existing rules from
-        Config DB. Compare with rules specified in file and perform corresponding
-        modifications.
-        :return:
+        Compare the rules loaded from file with the rules in Config DB
+        :return: AclRuleDiff of the rule keys to add, change and remove.
+            Added and changed rules are sorted by descending priority,
+            removed rules by ascending priority.
         """
+        new_rules = {key: self.configdb.typed_to_raw(rule) for key, rule in self.rules_info.items()}
+        current_rules = {key: self.configdb.typed_to_raw(rule) for key, rule in self.rules_db_info.items()}
 
-        # TODO: Until we test ASIC behavior, we cannot assume that we can insert
-        # dataplane ACLs and shift existing ACLs. Therefore, we perform a full
-        # update on dataplane ACLs, and only perform an incremental update on
-        # control plane ACLs.
+        def priority(rules):
+            return lambda key: (int(rules[key].get("PRIORITY", 0)), key)
 
-        new_rules = set(self.rules_info.keys())
-        new_dataplane_rules = set()
-        new_controlplane_rules = set()
-        current_rules = set(self.rules_db_info.keys())
-        current_dataplane_rules = set()
-        current_controlplane_rules = set()
+        added = sorted(set(new_rules) - set(current_rules), key=priority(new_rules), reverse=True)
+        removed = sorted(set(current_rules) - set(new_rules), key=priority(current_rules))
+        changed = sorted([key for key in set(new_rules) & set(current_rules) if new_rules[key] != current_rules[key]],
+                         key=priority(new_rules), reverse=True)
+        unchanged = len(new_rules) - len(added) - len(changed)
+        return AclRuleDiff(added, changed, removed, unchanged)
 
-        for key in new_rules:
-            table_name = key[0]
-            if self.tables_db_info[table_name]['type'].upper() == self.ACL_TABLE_TYPE_CTRLPLANE:
-                new_controlplane_rules.add(key)
-            else:
-                new_dataplane_rules.add(key)
+    def write_rule_diff(self, configdb, diff):
+        """
+        Write the rule changes of <diff> to <configdb> make-before-break:
+        added rules first, then changed rules, both from the highest
+        priority down, and removed rules last, from the lowest priority up.
+        Every phase is written in pipelined batches, each applied atomically.
+        :param configdb: Config DB connector to write to
+        :param diff: AclRuleDiff
+        :return: Tuple of the number of write commands and of round trips
+        """
+        client = get_pipelined_client(configdb, "CONFIG_DB")
+        separator = configdb.TABLE_NAME_SEPARATOR
+        writes = 0
+        round_trips = 0
+
+        def rule_hash(key):
+            return self.ACL_RULE + separator + configdb.serialize_key(key)
+
+        def write(keys, queue):
+            nonlocal writes, round_trips
+            for batch in chunked(keys, self.incremental_batch_size):
+                if hasattr(client, "pipeline"):
+                    pipe = client.pipeline(transaction=True)
+                    for key in batch:
+                        writes += queue(pipe, key)
+                    pipe.execute()
+                    round_trips += 1
+                else:
+                    for key in batch:
+                        count = queue(client, key)
+                        writes += count
+                        round_trips += count
+
+        def add(pipe, key):
+            pipe.hmset(rule_hash(key), configdb.typed_to_raw(self.rules_info[key]))
+            return 1
+
+        def change(pipe, key):
+            new_rule = configdb.typed_to_raw(self.rules_info[key])
+            old_rule = configdb.typed_to_raw(self.rules_db_info[key])
+            pipe.hmset(rule_hash(key), new_rule)
+            stale_fields = [field for field in old_rule if field not in new_rule]
+            if stale_fields:
+                pipe.hdel(rule_hash(key), *stale_fields)
+                return 2
+            return 1
+
+        def remove(pipe, key):
+            pipe.delete(rule_hash(key))
+            return 1
+
+        write(diff.added, add)
+        write(diff.changed, change)
+        write(diff.removed, remove)
+        return writes, round_trips
 
-        for key in current_rules:
-            table_name = key[0]
-            if self.tables_db_info[table_name]['type'].upper() == self.ACL_TABLE_TYPE_CTRLPLANE:
-                current_controlplane_rules.add(key)
-            else:
-                current_dataplane_rules.add(key)
-
-        # Remove all existing dataplane rules
-        for key in current_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace also if present
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-
-        # Add all new dataplane rules
-        for key in new_dataplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        added_controlplane_rules = new_controlplane_rules.difference(current_controlplane_rules)
-        removed_controlplane_rules = current_controlplane_rules.difference(new_controlplane_rules)
-        existing_controlplane_rules = new_rules.intersection(current_controlplane_rules)
-
-        for key in added_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, self.rules_info[key])
-
-        for key in removed_controlplane_rules:
-            self.configdb.mod_entry(self.ACL_RULE, key, None)
-            # Program for per-asic namespace corresponding to front asic also if present.
-            # For control plane ACL it's not needed but to keep all db in sync program everywhere
-            for namespace_configdb in self.per_npu_configdb.values():
-                namespace_configdb.mod_entry(self.ACL_RULE, key, None)
-
-        for key in existing_controlplane_rules:
-            if not operator.eq(self.rules_info[key], self.rules_db_info[key]):
-                self.configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
-                # Program for per-asic namespace corresponding to front asic also if present.
-                # For control plane ACL it's not needed but to keep all db in sync program everywhere
-                for namespace_configdb in self.per_npu_configdb.values():
-                    namespace_configdb.set_entry(self.ACL_RULE, key, self.rules_info[key])
+    def incremental_update(self):
+        """
+        Perform incremental ACL rules configuration update. Get existing rules from
+        Config DB. Compare with rules specified in file and only write the rules
+        which were added, changed or removed. Config DB of every front asic
+        namespace is updated in parallel.
+        :return: Dict of AclUpdateReport by namespace, '' for the global Config DB
+        """
+        diff = self.get_rule_diff()
+
+        configdbs = {"": self.configdb}
+        # Program for per-asic namespace also if present
+        configdbs.update(self.per_npu_configdb or {})
+
+        with ThreadPoolExecutor(max_workers=len(configdbs)) as executor:
+            futures = {namespace: executor.submit(self.write_rule_diff, configdb, diff)
+                       for namespace, configdb in configdbs.items()}
+            report = {}
+            for namespace, future in futures.items():
+                writes, round_trips = future.result()
+                report[namespace] = AclUpdateReport(len(diff.added), len(diff.changed), len(diff.removed),
+                                                    diff.unchanged, writes, round_trips)
+
+        for namespace, namespace_report in report.items():
+            info("{}: {} rules added, {} changed, {} removed, {} unchanged; "
+                 "{} writes in {} round trips".format(namespace or "Config DB", *namespace_report))
+        return report
 
     def delete(self, table=None, rule=None):
         """
@@ -934,6 +1010,253 @@ class AclLoader(object):
         print(tabulate.tabulate(data, headers=header, tablefmt="simple", missingval=""))
 
 
+class OcLeaf(object):
+    """
+    Leaf of the openconfig ACL schema used by the fast loader. <convert>
+    checks and converts a value the way the pyangbind binding does and
+    raises ValueError on invalid values. Unset leaves read as "", the value
+    the rule converters expect for leaves missing from the file.
+    """
+
+    def __init__(self, convert=None, leaf_list=False):
+        self.convert = convert or (lambda value: value)
+        self.leaf_list = leaf_list
+
+    @property
+    def default(self):
+        return () if self.leaf_list else ""
+
+    def load(self, value, path):
+        if self.leaf_list:
+            if not isinstance(value, list):
+                raise ValueError("%s must be a list, got %r" % (path, value))
+            return tuple(self.load_value(item, path) for item in value)
+        return self.load_value(value, path)
+
+    def load_value(self, value, path):
+        try:
+            return self.convert(value)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid value %r for %s" % (value, path))
+
+
+def oc_uint(low, high):
+    def convert(value):
+        if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+            raise ValueError(value)
+        value = int(value)
+        if value < low or value > high:
+            raise ValueError(value)
+        return value
+    return convert
+
+
+def oc_identity(*identities):
+    def convert(value):
+        if not isinstance(value, str) or value.split(":")[-1] not in identities:
+            raise ValueError(value)
+        return value
+    return convert
+
+
+def oc_union(*converters):
+    def convert(value):
+        for converter in converters:
+            try:
+                return converter(value)
+            except (TypeError, ValueError):
+                pass
+        raise ValueError(value)
+    return convert
+
+
+def oc_string(value):
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return value
+
+
+IPV4_PREFIX_RE = re.compile(r"^(?:(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])\.){3}"
+                            r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])/(?:3[0-2]|[12]?[0-9])$")
+
+
+def oc_ip_prefix(value):
+    # the pattern of openconfig ipv4-prefix, much cheaper than ipaddress for the common case
+    if not IPV4_PREFIX_RE.match(oc_string(value)):
+        ipaddress.IPv6Network(value, strict=False)
+    return value
+
+
+def oc_port_range(value):
+    low, high = oc_string(value).split("..")
+    oc_uint(0, 65535)(low)
+    oc_uint(0, 65535)(high)
+    return value
+
+
+# Subset of the openconfig-acl model (with the SONiC extensions) read by the
+# fast loader. Leaves the rule converters do not use are accepted and kept
+# unconverted, "state" containers are ignored like the binding does.
+ACL_ENTRY_SCHEMA = {
+    "config": {
+        "sequence-id": OcLeaf(oc_uint(0, 4294967295)),
+        "description": OcLeaf(oc_string),
+    },
+    "actions": {
+        "config": {
+            "forwarding-action": OcLeaf(oc_identity("ACCEPT", "DROP", "REJECT")),
+            "log-action": OcLeaf(oc_identity("LOG_SYSLOG", "LOG_NONE")),
+        },
+    },
+    "l2": {
+        "config": {
+            "source-mac": OcLeaf(oc_string),
+            "source-mac-mask": OcLeaf(oc_string),
+            "destination-mac": OcLeaf(oc_string),
+            "destination-mac-mask": OcLeaf(oc_string),
+            "ethertype": OcLeaf(oc_union(oc_uint(1536, 65535), oc_identity(*AclLoader.ethertype_map))),
+            "vlan-id": OcLeaf(oc_uint(1, 4094)),
+        },
+    },
+    "ip": {
+        "config": {
+            "ip-version": OcLeaf(oc_identity("UNKNOWN", "IPV4", "IPV6")),
+            "source-ip-address": OcLeaf(oc_ip_prefix),
+            "destination-ip-address": OcLeaf(oc_ip_prefix),
+            "dscp": OcLeaf(oc_uint(0, 63)),
+            "protocol": OcLeaf(oc_union(oc_uint(0, 254), oc_identity(*AclLoader.ip_protocol_map))),
+            "hop-limit": OcLeaf(oc_uint(0, 255)),
+            "source-ip-flow-label": OcLeaf(oc_uint(0, 1048575)),
+            "destination-ip-flow-label": OcLeaf(oc_uint(0, 1048575)),
+        },
+    },
+    "icmp": {
+        "config": {
+            "type": OcLeaf(oc_uint(0, 255)),
+            "code": OcLeaf(oc_uint(0, 255)),
+        },
+    },
+    "transport": {
+        "config": {
+            "source-port": OcLeaf(oc_union(oc_port_range, oc_uint(0, 65535), oc_identity("ANY"))),
+            "destination-port": OcLeaf(oc_union(oc_port_range, oc_uint(0, 65535), oc_identity("ANY"))),
+            "tcp-flags": OcLeaf(oc_identity("TCP_FIN", "TCP_SYN", "TCP_RST", "TCP_PSH",
+                                            "TCP_ACK", "TCP_URG", "TCP_ECE", "TCP_CWR"), leaf_list=True),
+        },
+    },
+    "input-interface": {
+        "interface-ref": {
+            "config": {
+                "interface": OcLeaf(oc_string),
+                "subinterface": OcLeaf(oc_uint(0, 4294967295)),
+            },
+        },
+    },
+}
+
+ACL_SET_SCHEMA = {
+    "config": {
+        "name": OcLeaf(oc_string),
+        "type": OcLeaf(oc_string),
+        "description": OcLeaf(oc_string),
+    },
+}
+
+
+class OcRecord(object):
+    """
+    Lightweight record types built from an openconfig schema subset, with
+    the attribute layout of the pyangbind binding (rule.ip.config.protocol,
+    ...), so that the rule converters work on both.
+    """
+
+    def __init__(self, name, schema):
+        self.children = {}
+        # field name and load function of every key
+        self.loaders = {}
+        defaults = {}
+        for key, node in schema.items():
+            field = key.replace("-", "_")
+            if isinstance(node, dict):
+                self.children[key] = OcRecord(key, node)
+                self.loaders[key] = (field, self.children[key].load)
+                defaults[field] = self.children[key].empty
+            else:
+                self.loaders[key] = (field, node.load)
+                defaults[field] = node.default
+        self.type = namedtuple("Oc_" + name.replace("-", "_"), sorted(defaults))
+        self.empty = self.type(**defaults)
+        self.defaults = defaults
+
+    def load(self, data, path):
+        if not isinstance(data, dict):
+            raise AclLoaderException("%s must be an object" % path)
+        values = self.defaults.copy()
+        for key, value in data.items():
+            loader = self.loaders.get(key)
+            if loader is None:
+                if key == "state":
+                    continue
+                raise AclLoaderException("Unknown field %s/%s" % (path, key))
+            values[loader[0]] = loader[1](value, path + "/" + key)
+        return self.type(**values)
+
+
+OcAclEntries = namedtuple("OcAclEntries", ["acl_entry"])
+OcAclSet = namedtuple("OcAclSet", ["config", "acl_entries"])
+OcAclSets = namedtuple("OcAclSets", ["acl_set"])
+OcAcl = namedtuple("OcAcl", ["acl_sets"])
+OcRoot = namedtuple("OcRoot", ["acl"])
+
+
+class AclJsonLoader(object):
+    """
+    Fast loader for ACL files in openconfig format. The file is parsed once
+    with json and checked against ACL_ENTRY_SCHEMA into lightweight records
+    laid out like the pyangbind binding, which is much slower and heavier
+    for large rule sets. Invalid values raise ValueError like the binding.
+    """
+
+    acl_entry = OcRecord("acl-entry", ACL_ENTRY_SCHEMA)
+    acl_set = OcRecord("acl-set", ACL_SET_SCHEMA)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        try:
+            acl_sets = data["acl"]["acl-sets"]["acl-set"]
+        except (KeyError, TypeError):
+            raise AclLoaderException("Invalid input file %s" % filename)
+        if not isinstance(acl_sets, dict):
+            raise AclLoaderException("Invalid input file %s" % filename)
+
+        acl_set = {}
+        for acl_set_name, acl_set_data in acl_sets.items():
+            if not isinstance(acl_set_data, dict):
+                raise AclLoaderException("Invalid input file %s" % filename)
+            acl_set[acl_set_name] = cls.load_acl_set(acl_set_name, acl_set_data)
+        return OcRoot(OcAcl(OcAclSets(acl_set)))
+
+    @classmethod
+    def load_acl_set(cls, acl_set_name, data):
+        path = "acl-set/%s" % acl_set_name
+        acl_entry = {}
+        config = cls.acl_set.empty.config
+        for key, value in data.items():
+            if key == "config":
+                config = cls.acl_set.children["config"].load(value, path + "/config")
+            elif key == "acl-entries":
+                entries = value.get("acl-entry", {}) if isinstance(value, dict) else None
+                if not isinstance(entries, dict):
+                    raise AclLoaderException("%s/acl-entries must be an object" % path)
+                for entry_name, entry_data in entries.items():
+                    acl_entry[entry_name] = cls.acl_entry.load(entry_data, "%s/acl-entry/%s" % (path, entry_name))
+            elif key != "state":
+                raise AclLoaderException("Unknown field %s/%s" % (path, key))
+        return OcAclSet(config, OcAclEntries(acl_entry))
+
+
 @click.group()
 @click.pass_context
 def cli(ctx):
@@ -7,6 +7,7 @@ import utilities_common.cli as clicommon
 import utilities_common.multi_asic as multi_asic_util
 
 from flow_counter_util.route import exit_if_route_flow_counter_not_support
+from utilities_common import profiling
 from utilities_common import util_base
 from show.plugins.pbh import read_pbh_counters
 from config.plugins.pbh import serialize_pbh_counters
@@ -123,6 +124,7 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help', '-?'])
 
 # This is our entrypoint - the main "Clear" command
 @click.group(cls=AliasedGroup, context_settings=CONTEXT_SETTINGS)
+@profiling.profile_option
 def cli():
     """SONiC command line - 'Clear' command"""
     pass
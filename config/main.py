@@ -22,6 +22,7 @@ from portconfig import get_child_ports
 from socket import AF_INET, AF_INET6
 from sonic_py_common import device_info, multi_asic
 from sonic_py_common.interface import get_interface_table_name, get_port_table_name, get_intf_longname
+from utilities_common import profiling
 from utilities_common import util_base
 from swsscommon import swsscommon
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
@@ -1188,6 +1189,7 @@ def load_backend_acl(cfg_db, device_type):
 
 # This is our main entrypoint - the main 'config' command
 @click.group(cls=clicommon.AbbreviationGroup, context_settings=CONTEXT_SETTINGS)
+@profiling.profile_option
 @click.pass_context
 def config(ctx):
     """SONiC command line - 'config' command"""
@@ -1,7 +1,13 @@
+import bisect
+import collections
 import ipaddress
 
 import click
-from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
+from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector, ConfigDBPipeConnector
+from utilities_common.db_pipeline import get_pipelined_client
+
+# Number of entries written per ConfigDB pipeline by the bulk import
+NAT_BULK_WRITE_BATCH_SIZE = 500
 
 
 def is_valid_ipv4_address(address):
@@ -182,6 +188,221 @@ def getTwiceNatIdCountWithDynamicBinding(twice_nat_id, count, dynamic_key):
 
     return twice_id_count
  
+class StaticNatIndex(object):
+    """
+    In-memory view of the static NAT/NAPT entries, NAT pools and NAT bindings,
+    built with one read of each table. It answers the same questions as
+    isIpOverlappingWithAnyStaticEntry, isOverlappingWithAnyDynamicEntry and
+    the getTwiceNatIdCount* helpers without rescanning ConfigDB, and is kept
+    up to date as entries are added to it.
+    """
+
+    def __init__(self, config_db):
+        self.entries = {'STATIC_NAT': {}, 'STATIC_NAPT': {}}
+        self.static_ips = {'STATIC_NAT': collections.Counter(), 'STATIC_NAPT': collections.Counter()}
+        self.twice_nat_ids = {'STATIC_NAT': collections.Counter(), 'STATIC_NAPT': collections.Counter()}
+        self.dynamic_twice_nat_ids = collections.Counter()
+
+        for table in self.entries:
+            for key, values in (config_db.get_table(table) or {}).items():
+                if isinstance(key, tuple):
+                    key = '|'.join(key)
+                self._add(table, key, values)
+
+        # Pool ranges are merged and sorted so that a lookup is a bisection
+        ranges = []
+        nat_pool_dict = config_db.get_table('NAT_POOL') or {}
+        for values in nat_pool_dict.values():
+            ipAddr = values["nat_ip"].split('-')
+            startIp = int(ipaddress.IPv4Address(ipAddr[0]))
+            endIp = int(ipaddress.IPv4Address(ipAddr[-1]))
+            ranges.append((startIp, endIp))
+
+        self.pool_starts = []
+        self.pool_ends = []
+        for startIp, endIp in sorted(ranges):
+            if self.pool_ends and startIp <= self.pool_ends[-1] + 1:
+                self.pool_ends[-1] = max(self.pool_ends[-1], endIp)
+            else:
+                self.pool_starts.append(startIp)
+                self.pool_ends.append(endIp)
+
+        for values in (config_db.get_table('NAT_BINDINGS') or {}).values():
+            if values.get("nat_pool") not in nat_pool_dict:
+                continue
+            if values.get("twice_nat_id", "NULL") == "NULL":
+                continue
+            self.dynamic_twice_nat_ids[int(values["twice_nat_id"])] += 1
+
+    @staticmethod
+    def _effective_ip(table, key, values):
+        """Get the ip address used for overlap checks, as isIpOverlappingWithAnyStaticEntry does"""
+        fields = key.split('|')
+        if table == 'STATIC_NAPT' and len(fields) != 3:
+            return None
+        if table == 'STATIC_NAT' and len(fields) != 1:
+            return None
+
+        if values.get("nat_type", "dnat") == "snat":
+            return values["local_ip"]
+        return fields[0]
+
+    def _add(self, table, key, values):
+        ip = self._effective_ip(table, key, values)
+        if ip is not None:
+            self.static_ips[table][ip] += 1
+        if "twice_nat_id" in values:
+            self.twice_nat_ids[table][int(values["twice_nat_id"])] += 1
+        self.entries[table][key] = values
+
+    def _remove(self, table, key):
+        values = self.entries[table].pop(key)
+        ip = self._effective_ip(table, key, values)
+        if ip is not None:
+            self.static_ips[table][ip] -= 1
+        if "twice_nat_id" in values:
+            self.twice_nat_ids[table][int(values["twice_nat_id"])] -= 1
+
+    def set_entry(self, table, key, values):
+        """Record an entry that is going to be written to ConfigDB"""
+        if key in self.entries[table]:
+            self._remove(table, key)
+        self._add(table, key, values)
+
+    def get_entry(self, table, key):
+        return self.entries[table].get(key, {})
+
+    def isIpOverlappingWithAnyStaticEntry(self, ipAddress, table):
+        return self.static_ips[table][ipAddress] > 0
+
+    def isOverlappingWithAnyDynamicEntry(self, ipAddress):
+        ip = int(ipaddress.IPv4Address(ipAddress))
+        pos = bisect.bisect_right(self.pool_starts, ip) - 1
+        return pos >= 0 and ip <= self.pool_ends[pos]
+
+    def getTwiceNatIdCount(self, twice_nat_id, table):
+        return self.twice_nat_ids[table][twice_nat_id] + self.dynamic_twice_nat_ids[twice_nat_id]
+
+def parseStaticNatBulkLine(line):
+    """
+    Parse one line of a static NAT bulk import file into (table, key, data).
+    The line uses the same arguments as the single entry commands:
+        basic <global_ip> <local_ip> [-nat_type <snat|dnat>] [-twice_nat_id <id>]
+        tcp|udp <global_ip> <global_port> <local_ip> <local_port> [-nat_type <snat|dnat>] [-twice_nat_id <id>]
+    Raises ValueError describing the first problem found.
+    """
+    fields = line.split()
+    kind = fields[0].lower()
+    options = {}
+
+    if kind == 'basic':
+        positional = 2
+    elif kind in ('tcp', 'udp'):
+        positional = 4
+    else:
+        raise ValueError("Unknown entry type {}, expected basic, tcp or udp".format(fields[0]))
+
+    args = fields[1:positional + 1]
+    if len(args) != positional:
+        raise ValueError("Expected {} arguments for {} entry".format(positional, kind))
+
+    rest = fields[positional + 1:]
+    if len(rest) % 2 != 0:
+        raise ValueError("Option {} has no value".format(rest[-1]))
+    for option, value in zip(rest[0::2], rest[1::2]):
+        if option not in ('-nat_type', '-twice_nat_id'):
+            raise ValueError("Unknown option {}".format(option))
+        options[option[1:]] = value
+
+    if kind == 'basic':
+        global_ip, local_ip = args
+    else:
+        global_ip, global_port, local_ip, local_port = args
+
+    if is_valid_ipv4_address(local_ip) is False:
+        raise ValueError("Given local ip address {} is invalid".format(local_ip))
+
+    if is_valid_ipv4_address(global_ip) is False:
+        raise ValueError("Given global ip address {} is invalid".format(global_ip))
+
+    if 'nat_type' in options and options['nat_type'] not in ("snat", "dnat"):
+        raise ValueError("Given nat type {} is invalid".format(options['nat_type']))
+
+    if 'twice_nat_id' in options:
+        if not options['twice_nat_id'].isdigit() or int(options['twice_nat_id']) not in range(1, 10000):
+            raise ValueError("Given twice nat id {} is invalid".format(options['twice_nat_id']))
+
+    if kind == 'basic':
+        table = 'STATIC_NAT'
+        key = global_ip
+        data = {'local_ip': local_ip}
+    else:
+        for port in (global_port, local_port):
+            if not port.isdigit() or int(port) not in range(1, 65536):
+                raise ValueError("Given port {} is invalid".format(port))
+        table = 'STATIC_NAPT'
+        key = "{}|{}|{}".format(global_ip, kind.upper(), int(global_port))
+        data = {'local_ip': local_ip, 'local_port': str(int(local_port))}
+
+    data.update(options)
+    return table, key, data
+
+def validateStaticNatBulkEntry(index, table, key, data, max_reached=False):
+    """
+    Validate a parsed bulk entry against the index with the same rules, in
+    the same order, as 'config nat add static basic/tcp/udp'. Returns False
+    if the entry is already present, raises ValueError if it is rejected.
+    """
+    existing = index.get_entry(table, key)
+    present = bool(existing) and existing.get('local_ip') == data['local_ip'] and \
+        existing.get('local_port') == data.get('local_port')
+
+    if data.get('nat_type') == 'snat':
+        ipAddress = data['local_ip']
+    else:
+        ipAddress = key.split('|')[0]
+
+    if table == 'STATIC_NAT':
+        if index.isIpOverlappingWithAnyStaticEntry(ipAddress, 'STATIC_NAPT'):
+            raise ValueError("Given entry is overlapping with existing NAPT entry")
+        if index.isOverlappingWithAnyDynamicEntry(ipAddress):
+            raise ValueError("Given entry is overlapping with existing Dynamic entry")
+    elif index.isIpOverlappingWithAnyStaticEntry(ipAddress, 'STATIC_NAT'):
+        raise ValueError("Given entry is overlapping with existing NAT entry")
+
+    if present:
+        return False
+
+    if max_reached:
+        raise ValueError("Max limit is reached for NAT entries")
+
+    if 'twice_nat_id' in data:
+        if index.getTwiceNatIdCount(int(data['twice_nat_id']), table) > 1:
+            raise ValueError("Same Twice nat id is not allowed for more than 2 entries")
+
+    return True
+
+def writeStaticNatEntries(config_db, entries):
+    """
+    Write a list of (table, key, data, original) entries to ConfigDB in one
+    pipeline, with the set_entry semantics of the single entry commands:
+    every key is written with one HSET of all its fields, then the fields of
+    the <original> entry which are not in <data>, such as twice_nat_id or
+    nat_type, are removed. Keys are never deleted, so that natmgrd does not
+    tear down an entry which is only updated.
+    """
+    client = get_pipelined_client(config_db, config_db.CONFIG_DB)
+    pipe = client.pipeline(transaction=False) if hasattr(client, 'pipeline') else client
+    for table, key, data, original in entries:
+        _hash = "{}{}{}".format(table, config_db.TABLE_NAME_SEPARATOR, config_db.serialize_key(key))
+        raw = config_db.typed_to_raw(data)
+        pipe.hset(_hash, mapping=raw)
+        stale = [field for field in config_db.typed_to_raw(original or {}) if field not in raw]
+        if stale:
+            pipe.hdel(_hash, *stale)
+    if pipe is not client:
+        pipe.execute()
+
 ############### NAT Configuration ##################
 
 #
@@ -472,6 +693,65 @@ def add_udp(ctx, global_ip, global_port, local_ip, local_port, nat_type, twice_n
         else:
             config_db.set_entry(table, key, {dataKey1: local_ip, dataKey2: local_port})
 
+#
+# 'nat add static bulk' command ('config nat add static bulk <file>')
+#
+@static.command('bulk')
+@click.pass_context
+@click.argument('filename', metavar='<filename>', type=click.Path(exists=True, dir_okay=False), required=True)
+@click.option('--batch-size', metavar='<batch_size>', type=click.IntRange(1, 100000), default=NAT_BULK_WRITE_BATCH_SIZE,
+              show_default=True, help="Number of entries written per ConfigDB pipeline")
+def add_bulk(ctx, filename, batch_size):
+    """Add Static NAT/NAPT entries from a file, one 'basic', 'tcp' or 'udp' entry per line"""
+
+    config_db = ConfigDBPipeConnector()
+    config_db.connect()
+
+    index = StaticNatIndex(config_db)
+
+    counters_db = SonicV2Connector()
+    counters_db.connect(counters_db.COUNTERS_DB)
+    counter_entry = counters_db.get_all(counters_db.COUNTERS_DB, 'COUNTERS_GLOBAL_NAT:Values') or {}
+    snat_entries = int(counter_entry.get('SNAT_ENTRIES', 0))
+    max_entries = int(counter_entry.get('MAX_NAT_ENTRIES', 0))
+
+    pending = []
+    added = present = failed = 0
+
+    def flush():
+        if pending:
+            writeStaticNatEntries(config_db, pending)
+            del pending[:]
+
+    with open(filename) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+
+            try:
+                table, key, data = parseStaticNatBulkLine(line)
+                if not validateStaticNatBulkEntry(index, table, key, data,
+                                                  max_reached=snat_entries + added >= max_entries):
+                    present += 1
+                    continue
+            except ValueError as e:
+                click.echo("Line {}: {}, skipping the entry.".format(lineno, e))
+                failed += 1
+                continue
+
+            pending.append((table, key, data, index.get_entry(table, key)))
+            index.set_entry(table, key, data)
+            added += 1
+            if len(pending) >= batch_size:
+                flush()
+
+    flush()
+
+    click.echo("Added {} entries, {} already present, {} failed.".format(added, present, failed))
+    if failed:
+        ctx.exit(1)
+
 #
 # 'nat remove static' group ('config nat remove static ...')
 #
@@ -8,12 +8,12 @@ CLI Auto-generation tool HLD - https://github.com/Azure/SONiC/pull/78
 
 import os
 import click
-import json
 import ipaddress
 import re
 import utilities_common.cli as clicommon
 
 from show.plugins.pbh import deserialize_pbh_counters, PBH_COUNTERS_CACHE_FILENAME
+from utilities_common.acl_counters import save_snapshot
 
 GRE_KEY_RE = r"^(0x){1}[a-fA-F0-9]{1,8}/(0x){1}[a-fA-F0-9]{1,8}$"
 
@@ -445,22 +445,16 @@ def serialize_pbh_counters(obj):
     """ Helper that performs PBH counters serialization.
 
         in = {
-            ('pbh_table1', 'pbh_rule1'): {'SAI_ACL_COUNTER_ATTR_BYTES': '0', 'SAI_ACL_COUNTER_ATTR_PACKETS': '0'},
+            ('pbh_table1', 'pbh_rule1'): AclCounter(packets=0, bytes=0),
             ...
-            ('pbh_tableN', 'pbh_ruleN'): {'SAI_ACL_COUNTER_ATTR_BYTES': '0', 'SAI_ACL_COUNTER_ATTR_PACKETS': '0'}
+            ('pbh_tableN', 'pbh_ruleN'): AclCounter(packets=0, bytes=0)
         }
 
-        out = [
-            {
-                "key": ["pbh_table1", "pbh_rule1"],
-                "value": {"SAI_ACL_COUNTER_ATTR_BYTES": "0", "SAI_ACL_COUNTER_ATTR_PACKETS": "0"}
-            },
+        out = {
+            "pbh_table1|pbh_rule1": [0, 0],
             ...
-            {
-                "key": ["pbh_tableN", "pbh_ruleN"],
-                "value": {"SAI_ACL_COUNTER_ATTR_BYTES": "0", "SAI_ACL_COUNTER_ATTR_PACKETS": "0"}
-            }
-        ]
+            "pbh_tableN|pbh_ruleN": [0, 0]
+        }
 
         Args:
             obj: counters dict.
@@ -469,12 +463,8 @@ def serialize_pbh_counters(obj):
     cache = clicommon.UserCache('pbh')
     counters_cache_file = os.path.join(cache.get_directory(), PBH_COUNTERS_CACHE_FILENAME)
 
-    def remap_keys(obj):
-        return [{'key': k, 'value': v} for k, v in obj.items()]
-
     try:
-        with open(counters_cache_file, 'w') as f:
-            json.dump(remap_keys(obj), f)
+        save_snapshot(counters_cache_file, obj)
     except IOError as err:
         pass
 
@@ -4,14 +4,18 @@
 # Helper code for CLI for interacting with switches via console device
 #
 
+import glob
 import os
 import pexpect
 import re
 import subprocess
 import sys
+import time
 
 import click
 from sonic_py_common import device_info
+from swsscommon import swsscommon
+from utilities_common.db_pipeline import get_pipelined_client, hgetall_batched, hset_batched
 
 ERR_DISABLE = 1
 ERR_CMD = 2
@@ -48,6 +52,8 @@ UDEV_PREFIX_CONF_FILENAME = "udevprefix.conf"
 
 TIMEOUT_SEC = 0.2
 
+WATCH_SELECT_TIMEOUT_MSEC = 1000
+
 class ConsolePortProvider(object):
     """
     The console ports' provider.
@@ -82,36 +88,67 @@ class ConsolePortProvider(object):
 
     def _init_all(self, refresh):
         config_db = self._db.cfgdb
-        state_db = self._db.db
 
-        # Querying CONFIG_DB to get configured console ports
-        keys = config_db.get_keys(CONSOLE_PORT_TABLE)
+        # Querying CONFIG_DB to get configured console ports in a single round trip
         ports = []
+        for k, entry in config_db.get_table(CONSOLE_PORT_TABLE).items():
+            port = dict(entry)
+            port[LINE_KEY] = k
+            ports.append(port)
+
+        # Querying or refreshing STATE_DB for all configured lines at once
+        lines = [port[LINE_KEY] for port in ports]
         if refresh:
             busy_lines = SysInfoProvider.list_active_console_processes()
-        for k in keys:
-            port = config_db.get_entry(CONSOLE_PORT_TABLE, k)
-            port[LINE_KEY] = k
-            if refresh:
+            states = {}
+            for k in lines:
                 if k in busy_lines:
                     pid, date = busy_lines[k]
-                    port[CUR_STATE_KEY] = self._db_utils.update_state(k, BUSY_FLAG, pid, date)
+                    states[k] = (BUSY_FLAG, pid, date)
                 else:
-                    port[CUR_STATE_KEY] = self._db_utils.update_state(k, IDLE_FLAG)
-            else:
-                port[CUR_STATE_KEY] = state_db.get_all(state_db.STATE_DB, "{}|{}".format(CONSOLE_PORT_TABLE, k))
-            ports.append(port)
+                    states[k] = (IDLE_FLAG, "", "")
+            cur_states = self._db_utils.update_states(states)
+        else:
+            cur_states = self._db_utils.get_states(lines)
+        for port in ports:
+            port[CUR_STATE_KEY] = cur_states[port[LINE_KEY]]
 
         # Querying device directory to get all available console ports
         if not self._configured_only:
             available_ttys = SysInfoProvider.list_console_ttys()
+            configured_lines = set(lines)
             for tty in available_ttys:
                 k = tty[len(SysInfoProvider.DEVICE_PREFIX):]
-                if k not in keys:
+                if k not in configured_lines:
                     port = { LINE_KEY: k }
                     ports.append(port)
         self._ports = ports
 
+    def watch(self, timeout=WATCH_SELECT_TIMEOUT_MSEC):
+        """
+        Watches STATE_DB for console port state changes and yields every port whose
+        state changed, so that callers can keep a view up to date without recomputing it
+        """
+        state_db = swsscommon.DBConnector("STATE_DB", 0)
+        tbl = swsscommon.SubscriberStateTable(state_db, CONSOLE_PORT_TABLE)
+        sel = swsscommon.Select()
+        sel.addSelectable(tbl)
+
+        ports = {port[LINE_KEY]: port for port in self._ports}
+        while True:
+            rc, _ = sel.select(timeout)
+            if rc == swsscommon.Select.TIMEOUT:
+                continue
+            elif rc == swsscommon.Select.ERROR:
+                raise Exception("Failed to watch console port state: select() failed")
+
+            line_num, op, fvs = tbl.pop()
+            port = ports.get(line_num)
+            if port is None:
+                continue
+            port[CUR_STATE_KEY] = dict(fvs) if op == "SET" else {}
+            yield ConsolePortInfo(self._db_utils, port)
+
 class ConsolePortInfo(object):
     def __init__(self, db_utils, info):
         self._db_utils = db_utils
@@ -227,11 +264,13 @@ class ConsolePortInfo(object):
         else:
             # refresh all active ports' state because we already got newest state for all ports
             busy_lines = SysInfoProvider.list_active_console_processes()
+            states = {}
             for line_num, proc_info in busy_lines.items():
                 pid, date = proc_info
-                self._update_state(BUSY_FLAG, pid, date, line_num)
+                states[line_num] = (BUSY_FLAG, pid, date)
             if self.line_num not in busy_lines:
-                self._update_state(IDLE_FLAG, "", "")
+                states[self.line_num] = (IDLE_FLAG, "", "")
+            self._info[CUR_STATE_KEY] = self._db_utils.update_states(states)[self.line_num]
 
     def _update_state(self, state, pid, date, line_num=None):
         self._info[CUR_STATE_KEY] = self._db_utils.update_state(
@@ -262,6 +301,7 @@ class SysInfoProvider(object):
     The system level information provider.
     """
     DEVICE_PREFIX = "/dev/ttyUSB"
+    PROC_PATH = "/proc"
 
     @staticmethod
     def init_device_prefix():
@@ -276,53 +316,87 @@ class SysInfoProvider(object):
     @staticmethod
     def list_console_ttys():
         """Lists all console tty devices"""
-        cmd = "ls " + SysInfoProvider.DEVICE_PREFIX + "*"
-        output, _ = SysInfoProvider.run_command(cmd, abort=False)
-        ttys = output.split('\n')
-        ttys = list([dev for dev in ttys if re.match(SysInfoProvider.DEVICE_PREFIX + r"\d+", dev) != None])
-        return ttys
+        regex_tty = re.compile(re.escape(SysInfoProvider.DEVICE_PREFIX) + r"\d+$")
+        ttys = glob.glob(SysInfoProvider.DEVICE_PREFIX + "*")
+        return sorted([dev for dev in ttys if regex_tty.match(dev) is not None])
 
     @staticmethod
     def list_active_console_processes():
         """Lists all active console session processes"""
-        cmd = 'ps -eo pid,lstart,cmd | grep -E "(mini|pico)com"'
-        output = SysInfoProvider.run_command(cmd)
-        return SysInfoProvider._parse_processes_info(output)
+        pids = sorted(int(pid) for pid in os.listdir(SysInfoProvider.PROC_PATH) if pid.isdigit())
+
+        console_processes = {}
+        boot_time = None
+        for pid in pids:
+            cmd = SysInfoProvider._read_process_cmd(str(pid))
+            line_num = SysInfoProvider._match_console_cmd(cmd)
+            if line_num is None:
+                continue
+            if boot_time is None:
+                boot_time = SysInfoProvider._read_boot_time()
+            date = SysInfoProvider._read_process_start_time(str(pid), boot_time)
+            if date is not None:
+                console_processes[line_num] = (str(pid), date)
+        return console_processes
 
     @staticmethod
     def get_active_console_process_info(pid):
         """Gets active console process information by PID"""
-        cmd = 'ps -p {} -o pid,lstart,cmd | grep -E "(mini|pico)com"'.format(pid)
-        output = SysInfoProvider.run_command(cmd)
-        processes = SysInfoProvider._parse_processes_info(output)
-        if len(list(processes.keys())) == 1:
-            return (list(processes.keys())[0],) + list(processes.values())[0]
-        else:
+        pid = str(pid)
+        line_num = SysInfoProvider._match_console_cmd(SysInfoProvider._read_process_cmd(pid))
+        if line_num is None:
+            return None
+        date = SysInfoProvider._read_process_start_time(pid, SysInfoProvider._read_boot_time())
+        if date is None:
             return None
+        return (line_num, pid, date)
 
     @staticmethod
-    def _parse_processes_info(output):
-        processes = output.split('\n')
+    def _match_console_cmd(cmd):
+        """Returns the line number a minicom/picocom command line is attached to, or None"""
+        if not cmd:
+            return None
 
-        # matches any number of spaces then any number of digits
-        regex_pid = r" *(\d+)"
-        # matches anything of form: Xxx Xxx ( 0)or(00) 00:00:00 0000
-        regex_date = r"([A-Z][a-z]{2} [A-Z][a-z]{2} [\d ]\d \d{2}:\d{2}:\d{2} \d{4})"
         # matches any characters ending in minicom or picocom,
         # then a space and any chars followed by /dev/ttyUSB<any digits>,
         # then a space and any chars
-        regex_cmd = r".*(?:(?:mini)|(?:pico))com .*" + SysInfoProvider.DEVICE_PREFIX + r"(\d+)(?: .*)?"
-        regex_process = re.compile(r"^" + regex_pid + r" " + regex_date + r" " + regex_cmd + r"$")
+        regex_cmd = r"^.*(?:(?:mini)|(?:pico))com .*" + re.escape(SysInfoProvider.DEVICE_PREFIX) + r"(\d+)(?: .*)?$"
+        match = re.match(regex_cmd, cmd)
+        return match.group(1) if match is not None else None
 
-        console_processes = {}
-        for process in processes:
-            match = regex_process.match(process)
-            if match != None:
-                pid = match.group(1)
-                date = match.group(2)
-                line_num = match.group(3)
-                console_processes[line_num] = (pid, date)
-        return console_processes
+    @staticmethod
+    def _read_process_cmd(pid):
+        """Reads the command line of a process from procfs, returns None if the process is gone"""
+        try:
+            with open(os.path.join(SysInfoProvider.PROC_PATH, pid, "cmdline"), "rb") as f:
+                args = f.read().split(b"\0")
+        except (IOError, OSError):
+            return None
+        return " ".join(arg.decode("utf-8", "replace") for arg in args if arg)
+
+    @staticmethod
+    def _read_boot_time():
+        """Reads the system boot time in seconds since the epoch from procfs"""
+        with open(os.path.join(SysInfoProvider.PROC_PATH, "stat")) as f:
+            for line in f:
+                if line.startswith("btime "):
+                    return int(line.split()[1])
+        return 0
+
+    @staticmethod
+    def _read_process_start_time(pid, boot_time):
+        """Reads the start time of a process from procfs, formatted like 'ps -o lstart'"""
+        try:
+            with open(os.path.join(SysInfoProvider.PROC_PATH, pid, "stat")) as f:
+                stat = f.read()
+        except (IOError, OSError):
+            return None
+
+        # the command name may contain spaces, fields are counted from its closing parenthesis,
+        # starttime is the 22nd field and is expressed in clock ticks since boot
+        fields = stat[stat.rindex(")") + 2:].split()
+        start_ticks = int(fields[19])
+        return time.ctime(boot_time + start_ticks // os.sysconf("SC_CLK_TCK"))
 
     @staticmethod
     def run_command(cmd, abort=True):
@@ -340,17 +414,38 @@ class DbUtils(object):
         self._db = db
         self._config_db = db.cfgdb
         self._state_db = db.db
+        self._state_client = None
 
     def update_state(self, line_num, state, pid="", date=""):
-        key = "{}|{}".format(CONSOLE_PORT_TABLE, line_num)
-        self._state_db.set(self._state_db.STATE_DB, key, STATE_KEY, state)
-        self._state_db.set(self._state_db.STATE_DB, key, PID_KEY, pid)
-        self._state_db.set(self._state_db.STATE_DB, key, START_TIME_KEY, date)
-        return {
-            STATE_KEY: state,
-            PID_KEY: pid,
-            START_TIME_KEY: date
-        }
+        return self.update_states({ line_num: (state, pid, date) })[line_num]
+
+    def update_states(self, states):
+        """Writes the (state, pid, date) of every line in <states> with one pipelined round trip"""
+        cur_states = {}
+        for line_num, (state, pid, date) in states.items():
+            cur_states[line_num] = {
+                STATE_KEY: state,
+                PID_KEY: pid,
+                START_TIME_KEY: date
+            }
+        items = [(self._state_key(line_num), cur_state) for line_num, cur_state in cur_states.items()]
+        hset_batched(self._get_state_client(), items)
+        return cur_states
+
+    def get_states(self, lines):
+        """Reads the current state of every line in <lines> with one pipelined round trip"""
+        keys = [self._state_key(line_num) for line_num in lines]
+        states = dict(hgetall_batched(self._get_state_client(), keys))
+        return { line_num: states[key] for line_num, key in zip(lines, keys) }
+
+    def _get_state_client(self):
+        if self._state_client is None:
+            self._state_client = get_pipelined_client(self._state_db, "STATE_DB")
+        return self._state_client
+
+    @staticmethod
+    def _state_key(line_num):
+        return "{}|{}".format(CONSOLE_PORT_TABLE, line_num)
 
 class InvalidConfigurationError(Exception):
     def __init__(self, config_key, message):
@@ -28,17 +28,10 @@ def consutil(db):
 
     SysInfoProvider.init_device_prefix()
 
-# 'show' subcommand
-@consutil.command()
-@clicommon.pass_db
-@click.option('--brief', '-b', metavar='<brief_mode>', required=False, is_flag=True)
-def show(db, brief):
-    """Show all ports and their info include available ttyUSB devices unless specified brief mode"""
-    port_provider = ConsolePortProvider(db, brief, refresh=True)
-    ports = list(port_provider.get_all())
-
+def render_ports(ports):
+    """Renders console ports as a table sorted by line number"""
     # sort ports for table rendering
-    ports.sort(key=lambda p: int(p.line_num))
+    ports = sorted(ports, key=lambda p: int(p.line_num))
 
     # set table header style
     header = ["Line", "Baud", "Flow Control", "PID", "Start Time", "Device"]
@@ -51,7 +44,26 @@ def show(db, brief):
         baud = port.baud
         flow_control = "Enabled" if port.flow_control else "Disabled"
         body.append([busy+port.line_num, baud if baud else "-", flow_control, pid if pid else "-", date if date else "-", port.remote_device])
-    click.echo(tabulate(body, header, stralign='right'))
+    return tabulate(body, header, stralign='right')
+
+# 'show' subcommand
+@consutil.command()
+@clicommon.pass_db
+@click.option('--brief', '-b', metavar='<brief_mode>', required=False, is_flag=True)
+@click.option('--watch', '-w', is_flag=True, help="Keep running and redraw the table whenever a line state changes in STATE_DB")
+def show(db, brief, watch):
+    """Show all ports and their info include available ttyUSB devices unless specified brief mode"""
+    port_provider = ConsolePortProvider(db, brief, refresh=True)
+    click.echo(render_ports(port_provider.get_all()))
+    if not watch:
+        return
+
+    try:
+        for _ in port_provider.watch():
+            click.clear()
+            click.echo(render_ports(port_provider.get_all()))
+    except KeyboardInterrupt:
+        pass
 
 # 'clear' subcommand
 @consutil.command()
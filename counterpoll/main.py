@@ -1,7 +1,9 @@
 import click
 import json
+import sys
+from counterpoll.plan import DEFAULT_BUDGET, get_group_loads, reads_per_second, suggest_intervals
 from flow_counter_util.route import exit_if_route_flow_counter_not_support
-from swsscommon.swsscommon import ConfigDBConnector
+from swsscommon.swsscommon import ConfigDBConnector, SonicV2Connector
 from tabulate import tabulate
 
 BUFFER_POOL_WATERMARK = "BUFFER_POOL_WATERMARK"
@@ -430,6 +432,61 @@ def show():
 
     click.echo(tabulate(data, headers=header, tablefmt="simple", missingval=""))
 
+@cli.command()
+@click.option('-b', '--budget', type=click.IntRange(1), default=DEFAULT_BUDGET, show_default=True,
+              help="Stat reads per second the enabled counter groups should stay under")
+@click.option('-s', '--suggest', is_flag=True, help="Suggest poll intervals that fit the budget")
+@click.option('-a', '--apply', 'apply_intervals', is_flag=True, help="Apply the suggested poll intervals")
+def plan(budget, suggest, apply_intervals):
+    """ Show the expected counter polling load """
+    configdb = ConfigDBConnector()
+    configdb.connect()
+    countersdb = SonicV2Connector()
+    countersdb.connect(countersdb.COUNTERS_DB)
+    loads = get_group_loads(configdb, countersdb)
+
+    suggestion = None
+    if suggest or apply_intervals:
+        suggestion = suggest_intervals(loads, budget)
+
+    header = ["Type", "Status", "Objects", "Stats/Object", "Interval (in ms)", "Reads/s"]
+    if suggestion:
+        header += ["Suggested (in ms)", "Suggested Reads/s"]
+    data = []
+    total = 0
+    suggested_total = 0
+    for load in loads:
+        reads = reads_per_second(load)
+        total += reads
+        row = [load.group.display, ENABLE if load.enabled else DISABLE, load.objects, load.stats, load.interval,
+               int(round(reads))]
+        if suggestion:
+            interval = suggestion.get(load.group.name, load.interval)
+            suggested_reads = reads_per_second(load, interval)
+            suggested_total += suggested_reads
+            row += [interval, int(round(suggested_reads))]
+        data.append(row)
+
+    click.echo(tabulate(data, headers=header, tablefmt="simple", missingval=""))
+    click.echo("")
+    click.echo("Total: {} reads/s, budget: {} reads/s".format(int(round(total)), budget))
+    if total > budget:
+        click.echo("Warning: the enabled counter groups exceed the polling budget")
+
+    if not (suggest or apply_intervals):
+        return
+    if suggestion is None:
+        click.echo("Error: the budget cannot be met even with the longest poll intervals")
+        sys.exit(1)
+    click.echo("Suggested total: {} reads/s".format(int(round(suggested_total))))
+
+    if apply_intervals:
+        for load in loads:
+            interval = suggestion.get(load.group.name)
+            if interval is not None and interval != load.interval:
+                configdb.mod_entry("FLEX_COUNTER_TABLE", load.group.name, {'POLL_INTERVAL': interval})
+                click.echo("Set {} poll interval to {} ms".format(load.group.display, interval))
+
 def _update_config_db_flex_counter_table(status, filename):
     """ Update counter configuration in config_db file """
     with open(filename) as config_db_file:
@@ -0,0 +1,130 @@
+"""
+Flex counter polling load planner.
+
+The load a counter group puts on syncd is roughly the number of stats it
+reads per second: the number of objects in the group, taken from the
+COUNTERS_DB name maps, times the stats read per object, divided by the
+poll interval. The planner computes that for every FLEX_COUNTER_TABLE
+group and can suggest intervals that bring the total under a budget.
+"""
+
+import math
+from collections import namedtuple
+
+from utilities_common.db_pipeline import get_pipelined_client, hgetall_batched
+
+FLEX_COUNTER_TABLE = "FLEX_COUNTER_TABLE"
+ENABLE = "enable"
+
+# Stat reads per second above which 'counterpoll plan' warns
+DEFAULT_BUDGET = 50000
+
+# <stats> is the number of stats read per object. When <stat_prefix> is set the
+# fields of that prefix in the COUNTERS hash of one object are counted instead.
+# <min_interval>/<max_interval> are the intervals 'counterpoll <group> interval' accepts.
+FlexCounterGroup = namedtuple('FlexCounterGroup', [
+    'name', 'display', 'counter_map', 'stats', 'stat_prefix', 'default_interval', 'min_interval', 'max_interval'
+])
+
+FLEX_COUNTER_GROUPS = [
+    FlexCounterGroup('QUEUE', 'QUEUE_STAT', 'COUNTERS_QUEUE_NAME_MAP', 4, 'SAI_QUEUE_STAT_', 10000, 100, 30000),
+    FlexCounterGroup('PORT', 'PORT_STAT', 'COUNTERS_PORT_NAME_MAP', 100, 'SAI_PORT_STAT_', 1000, 100, 30000),
+    FlexCounterGroup('PORT_BUFFER_DROP', 'PORT_BUFFER_DROP', 'COUNTERS_PORT_NAME_MAP', 2, None, 60000, 30000, 300000),
+    FlexCounterGroup('RIF', 'RIF_STAT', 'COUNTERS_RIF_NAME_MAP', 12, 'SAI_ROUTER_INTERFACE_STAT_', 1000, 100, 30000),
+    FlexCounterGroup('QUEUE_WATERMARK', 'QUEUE_WATERMARK_STAT', 'COUNTERS_QUEUE_NAME_MAP', 1, None, 60000, 1000, 60000),
+    FlexCounterGroup('PG_WATERMARK', 'PG_WATERMARK_STAT', 'COUNTERS_PG_NAME_MAP', 2, None, 60000, 1000, 60000),
+    FlexCounterGroup('PG_DROP', 'PG_DROP_STAT', 'COUNTERS_PG_NAME_MAP', 1, None, 10000, 1000, 30000),
+    FlexCounterGroup('BUFFER_POOL_WATERMARK', 'BUFFER_POOL_WATERMARK_STAT', 'COUNTERS_BUFFER_POOL_NAME_MAP', 1, None,
+                     60000, 1000, 60000),
+    FlexCounterGroup('ACL', 'ACL', 'ACL_COUNTER_RULE_MAP', 2, None, 10000, 1000, 30000),
+    FlexCounterGroup('TUNNEL', 'TUNNEL_STAT', 'COUNTERS_TUNNEL_NAME_MAP', 4, None, 10000, 100, 30000),
+    FlexCounterGroup('FLOW_CNT_TRAP', 'FLOW_CNT_TRAP_STAT', 'COUNTERS_TRAP_NAME_MAP', 2, None, 10000, 1000, 30000),
+    FlexCounterGroup('FLOW_CNT_ROUTE', 'FLOW_CNT_ROUTE_STAT', 'COUNTERS_ROUTE_NAME_MAP', 2, None, 10000, 1000, 30000),
+]
+
+# Suggested intervals are rounded up to this many ms
+INTERVAL_STEP = 100
+
+GroupLoad = namedtuple('GroupLoad', ['group', 'enabled', 'interval', 'objects', 'stats'])
+
+
+def reads_per_second(load, interval=None):
+    """
+    Return the stat reads per second of <load>, polled every <interval> ms
+    (its configured interval by default). Disabled groups cost nothing.
+    """
+    if not load.enabled:
+        return 0.0
+    interval = interval or load.interval
+    return load.objects * load.stats * 1000.0 / interval
+
+
+def get_group_loads(config_db, counters_db):
+    """
+    Return a GroupLoad for every flex counter group configured in
+    FLEX_COUNTER_TABLE. The COUNTERS_DB maps, and the sample counters used
+    to count the stats per object, are read in two pipelined round trips.
+    """
+    flex_counter_table = config_db.get_table(FLEX_COUNTER_TABLE)
+    groups = [group for group in FLEX_COUNTER_GROUPS if group.name in flex_counter_table]
+
+    client = get_pipelined_client(counters_db, 'COUNTERS_DB')
+    counter_maps = dict(hgetall_batched(client, sorted(set(group.counter_map for group in groups))))
+
+    separator = counters_db.get_db_separator(counters_db.COUNTERS_DB)
+    samples = {}
+    for group in groups:
+        if group.stat_prefix and counter_maps[group.counter_map]:
+            samples[group.name] = 'COUNTERS' + separator + min(counter_maps[group.counter_map].values())
+    sample_counters = dict(hgetall_batched(client, sorted(set(samples.values()))))
+
+    loads = []
+    for group in groups:
+        entry = flex_counter_table[group.name]
+        stats = group.stats
+        if group.name in samples:
+            stats = len([f for f in sample_counters[samples[group.name]] if f.startswith(group.stat_prefix)]) or stats
+        loads.append(GroupLoad(group,
+                               entry.get('FLEX_COUNTER_STATUS') == ENABLE,
+                               int(entry.get('POLL_INTERVAL', group.default_interval)),
+                               len(counter_maps[group.counter_map]),
+                               stats))
+    return loads
+
+
+def _round_interval(interval, group):
+    interval = int(math.ceil(interval / float(INTERVAL_STEP))) * INTERVAL_STEP
+    return min(max(interval, group.min_interval), group.max_interval)
+
+
+def suggest_intervals(loads, budget):
+    """
+    Return {group name: interval} for the enabled groups, stretching all
+    intervals by a common factor so that the total reads per second fit
+    in <budget>. Intervals are only ever made longer and stay within what
+    the group accepts. Returns None if the budget cannot be met even at
+    the longest intervals.
+    """
+    enabled = [load for load in loads if load.enabled]
+
+    def scaled(factor):
+        return {load.group.name: _round_interval(load.interval * factor, load.group) for load in enabled}
+
+    def total(intervals):
+        return sum(reads_per_second(load, intervals[load.group.name]) for load in enabled)
+
+    if total(scaled(1)) <= budget:
+        return scaled(1)
+
+    high = max([float(load.group.max_interval) / load.interval for load in enabled] + [1.0])
+    if total(scaled(high)) > budget:
+        return None
+
+    low = 1.0
+    for _ in range(64):
+        mid = (low + high) / 2
+        if total(scaled(mid)) <= budget:
+            high = mid
+        else:
+            low = mid
+    return scaled(high)
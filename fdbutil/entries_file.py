@@ -0,0 +1,151 @@
+import json
+
+FORMAT_JSON = 'json'
+FORMAT_NDJSON = 'ndjson'
+FORMATS = [FORMAT_JSON, FORMAT_NDJSON]
+
+READ_CHUNK_SIZE = 64 * 1024
+
+class EntriesWriter(object):
+    """
+        Streaming writer for swssconfig entry files (fdb.json, arp.json, ...)
+
+        Entries are written as they are appended, either as a JSON array laid out exactly
+        like json.dump(entries, indent=2) or, in ndjson format, as one compact JSON object
+        per line. The writer has an append() method so that it can be used where a list
+        of entries is built.
+
+        Args:
+            filename(str): file to write
+            fmt(str): one of FORMATS
+    """
+    def __init__(self, filename, fmt=FORMAT_JSON):
+        if fmt not in FORMATS:
+            raise ValueError("Unknown entries file format '{0}'".format(fmt))
+        self.filename = filename
+        self.fmt = fmt
+        self.count = 0
+        self.fp = open(filename, 'w')
+
+    def append(self, entry):
+        if self.fmt == FORMAT_NDJSON:
+            self.fp.write(json.dumps(entry, separators=(',', ':')))
+            self.fp.write('\n')
+        else:
+            self.fp.write(',\n  ' if self.count else '[\n  ')
+            self.fp.write(json.dumps(entry, indent=2, separators=(',', ': ')).replace('\n', '\n  '))
+        self.count += 1
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def close(self):
+        if self.fp.closed:
+            return
+        if self.fmt == FORMAT_JSON:
+            self.fp.write('\n]' if self.count else '[]')
+        self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def detect_format(fp):
+    """
+        Detect the format of an entries file from its first non blank character
+
+        Args:
+            fp(file): file open for reading, positioned at its start
+
+        Returns:
+            fmt(str) FORMAT_JSON if the file holds a JSON array, FORMAT_NDJSON otherwise.
+            The file position is left unchanged.
+    """
+    pos = fp.tell()
+    fmt = FORMAT_NDJSON
+    while True:
+        chunk = fp.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        chunk = chunk.lstrip()
+        if chunk:
+            fmt = FORMAT_JSON if chunk[0] == '[' else FORMAT_NDJSON
+            break
+    fp.seek(pos)
+    return fmt
+
+def _iter_json_array(fp):
+    decoder = json.JSONDecoder()
+    buf = ''
+    started = False
+    eof = False
+    while True:
+        # skip the opening bracket, separators and blanks between entries
+        buf = buf.lstrip()
+        if not started and buf:
+            if buf[0] != '[':
+                raise ValueError("Entries file is not a JSON array")
+            buf = buf[1:]
+            started = True
+            continue
+        if started and buf and buf[0] == ',':
+            buf = buf[1:]
+            continue
+        if started and buf and buf[0] == ']':
+            return
+        if buf:
+            try:
+                entry, end = decoder.raw_decode(buf)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                # the object could end with a number cut by the read, make sure it is terminated
+                if end < len(buf) or eof:
+                    yield entry
+                    buf = buf[end:]
+                    continue
+        if eof:
+            raise ValueError("Unterminated JSON array in entries file")
+        chunk = fp.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buf += chunk
+
+def iter_entries(filename):
+    """
+        Iterate over the entries of an entries file
+
+        Both the JSON array format read by swssconfig and the ndjson format are accepted.
+        Entries are decoded one at a time, the file is never loaded as a whole.
+
+        Args:
+            filename(str): entries file name
+
+        Returns:
+            generator of entries (dict)
+    """
+    with open(filename, 'r') as fp:
+        if detect_format(fp) == FORMAT_JSON:
+            for entry in _iter_json_array(fp):
+                yield entry
+        else:
+            for line in fp:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+def get_format(filename):
+    """
+        Get the format of an entries file
+
+        Args:
+            filename(str): entries file name
+
+        Returns:
+            fmt(str) one of FORMATS
+    """
+    with open(filename, 'r') as fp:
+        return detect_format(fp)
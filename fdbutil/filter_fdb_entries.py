@@ -9,6 +9,8 @@ import traceback
 from collections import defaultdict
 from ipaddress import ip_address, ip_network, ip_interface
 
+from fdbutil.entries_file import FORMATS, EntriesWriter, get_format, iter_entries
+
 def get_vlan_cidr_map(filename):
     """
         Generate Vlan CIDR information from Config DB file
@@ -39,27 +41,36 @@ def get_vlan_cidr_map(filename):
 
     return vlan_cidr
 
-def get_arp_entries_map(arp_filename, config_db_filename):
+def mac_to_int(mac):
+    """
+        Convert a MAC address to an integer
+
+        Args:
+            mac(str): MAC address using either ':' or '-' as separator
+
+        Returns:
+            mac(int) MAC address value
+    """
+    return int(mac.replace(':', '').replace('-', ''), 16)
+
+def get_arp_mac_set(arp_filename, config_db_filename):
     """
-        Generate map for ARP entries
+        Generate the set of MACs of the ARP entries
 
-        ARP entry map is using the MAC as a key for the arp entry. The map key is reformated in order
-        to match FDB table formatting
+        Only ARP entries whose IP is within the CIDR of their Vlan are kept. MACs are stored
+        as integers to keep the set compact with a large number of neighbors
 
         Args:
             arp_filename(str): ARP entry file name
             config_db_filename(str): Config DB file name
 
         Returns:
-            arp_map(dict) map of ARP entries using MAC as key.
+            arp_macs(set) set of ARP entry MACs as returned by mac_to_int
     """
     vlan_cidr = get_vlan_cidr_map(config_db_filename)
 
-    with open(arp_filename, 'r') as fp:
-        arp_entries = json.load(fp)
-
-    arp_map = defaultdict()
-    for arp in arp_entries:
+    arp_macs = set()
+    for arp in iter_entries(arp_filename):
         for key, config in arp.items():
             if "NEIGH_TABLE" not in key:
                 continue
@@ -67,47 +78,65 @@ def get_arp_entries_map(arp_filename, config_db_filename):
             if "NEIGH_TABLE" in table and vlan in vlan_cidr \
                 and ip_address(ip) in ip_network(vlan_cidr[vlan][ip_interface(ip).version]) \
                 and "neigh" in config:
-                arp_map[config["neigh"].replace(':', '-').upper()] = ""
+                arp_macs.add(mac_to_int(config["neigh"]))
 
-    return arp_map
+    return arp_macs
 
-def filter_fdb_entries(fdb_filename, arp_filename, config_db_filename, backup_file):
+def filter_fdb_entries(fdb_filename, arp_filename, config_db_filename, backup_file, fmt=None):
     """
         Filter FDB entries based on MAC presence into ARP entries
 
         FDB entries that do not have MAC entry in the ARP table are filtered out. New FDB entries
-        file will be created if it has fewer entries than original one.
+        file will be created if it has fewer entries than original one, or if it has to be
+        converted to another format. FDB entries are filtered in a single streaming pass into
+        a temporary file which then replaces the original one.
 
         Args:
             fdb_filename(str): FDB entries file name
             arp_filename(str): ARP entry file name
             config_db_filename(str): Config DB file name
             backup_file(bool): Create backup copy of FDB file before creating new one
+            fmt(str): format of the new FDB entries file, format of the original one if None
 
         Returns:
             None
     """
-    arp_map = get_arp_entries_map(arp_filename, config_db_filename)
-
-    with open(fdb_filename, 'r') as fp:
-        fdb_entries = json.load(fp)
+    arp_macs = get_arp_mac_set(arp_filename, config_db_filename)
 
     def filter_fdb_entry(fdb_entry):
         for key, _ in fdb_entry.items():
             if 'FDB_TABLE' in key:
-                return key.split(':')[-1].upper() in arp_map
+                try:
+                    return mac_to_int(key.split(':')[-1]) in arp_macs
+                except ValueError:
+                    return False
 
         # malformed entry, default to False so it will be deleted
         return False
 
-    new_fdb_entries = list(filter(filter_fdb_entry, fdb_entries))
+    in_fmt = get_format(fdb_filename)
+    out_fmt = fmt or in_fmt
+    tmp_filename = fdb_filename + '.tmp'
+    filtered = 0
+    try:
+        with EntriesWriter(tmp_filename, out_fmt) as writer:
+            for fdb_entry in iter_entries(fdb_filename):
+                if filter_fdb_entry(fdb_entry):
+                    writer.append(fdb_entry)
+                else:
+                    filtered += 1
+    except Exception:
+        os.remove(tmp_filename)
+        raise
+
+    if filtered == 0 and out_fmt == in_fmt:
+        os.remove(tmp_filename)
+        return
 
-    if len(new_fdb_entries) < len(fdb_entries):
-        if backup_file:
-            os.rename(fdb_filename, fdb_filename + '-' + time.strftime("%Y%m%d-%H%M%S"))
+    if backup_file:
+        os.rename(fdb_filename, fdb_filename + '-' + time.strftime("%Y%m%d-%H%M%S"))
 
-        with open(fdb_filename, 'w') as fp:
-            json.dump(new_fdb_entries, fp, indent=2, separators=(',', ': '))
+    os.rename(tmp_filename, fdb_filename)
 
 def file_exists_or_raise(filename):
     """
@@ -131,12 +160,15 @@ def main(argv=sys.argv):
     parser.add_argument('-a', '--arp', type=str, default='/tmp/arp.json', help='arp file name')
     parser.add_argument('-c', '--config_db', type=str, default='/tmp/config_db.json', help='config db file name')
     parser.add_argument('-b', '--backup_file', type=bool, default=True, help='Back up old fdb entries file')
+    parser.add_argument('--format', type=str, choices=FORMATS, default=None,
+                        help='format of the new fdb entries file, same as the original one by default')
     args = parser.parse_args(argv[1:])
 
     fdb_filename = args.fdb
     arp_filename = args.arp
     config_db_filename = args.config_db
     backup_file = args.backup_file
+    fmt = args.format
 
     res = 0
     try:
@@ -150,7 +182,7 @@ def main(argv=sys.argv):
         syslog.syslog(syslog.LOG_NOTICE, "SIGINT received. Quitting")
         res = 1
     else:
-        filter_fdb_entries(fdb_filename, arp_filename, config_db_filename, backup_file)
+        filter_fdb_entries(fdb_filename, arp_filename, config_db_filename, backup_file, fmt)
     finally:
         syslog.closelog()
 
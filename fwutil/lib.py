@@ -8,12 +8,15 @@ try:
     import glob
     import os
     import json
+    import queue
     import shutil
     import socket
     import subprocess
     import time
     import tarfile
+    import threading
     from collections import OrderedDict
+    from concurrent.futures import FIRST_COMPLETED, Future, wait
     from urllib.parse import urlparse
     from urllib.request import urlopen, urlretrieve
 
@@ -39,6 +42,11 @@ FIRMWARE_AU_STATUS_DIR = "/tmp/firmwareupdate/"
 FW_AU_TASK_FILE_REGEX = "*_fw_au_task"
 FW_AU_STATUS_FILE = "fw_au_status"
 FW_AU_STATUS_FILE_PATH = os.path.join(FIRMWARE_AU_STATUS_DIR, FW_AU_STATUS_FILE)
+FW_VERSION_CACHE_FILE = "fw_version_cache"
+FW_VERSION_CACHE_FILE_PATH = os.path.join(FIRMWARE_AU_STATUS_DIR, FW_VERSION_CACHE_FILE)
+FW_VERSION_CACHE_TTL = 60 # seconds
+FW_PROBE_MAX_WORKERS = 8
+FW_PROBE_TIMEOUT = 120 # seconds
 
 # ========================= Variables ==========================================
 
@@ -151,6 +159,190 @@ class URL(object):
     url = property(fget=get_url)
 
 
+class FirmwareVersionCache(object):
+    """
+    FirmwareVersionCache
+
+    Keeps the current firmware version of the components for a short time,
+    so that a status check following an update or another status check does
+    not read the versions from hardware again. The entry of a component is
+    invalidated whenever its firmware is installed or updated.
+    """
+    VERSION_KEY = "version"
+    TIMESTAMP_KEY = "timestamp"
+
+    def __init__(self, filename=FW_VERSION_CACHE_FILE_PATH, ttl=FW_VERSION_CACHE_TTL):
+        self.__filename = filename
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__data = self.__load()
+
+    def __load(self):
+        try:
+            with open(self.__filename) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return { }
+
+        if not isinstance(data, dict):
+            return { }
+
+        return data
+
+    def __save(self):
+        try:
+            os.makedirs(os.path.dirname(self.__filename), exist_ok=True)
+            with open(self.__filename, 'w') as cache_file:
+                json.dump(self.__data, cache_file, indent=4, sort_keys=True)
+        except OSError:
+            # The cache is an optimization only
+            pass
+
+    def get(self, component_path):
+        with self.__lock:
+            entry = self.__data.get(component_path)
+
+        if not isinstance(entry, dict):
+            return None
+
+        timestamp = entry.get(self.TIMESTAMP_KEY, 0)
+        if not (0 <= time.time() - timestamp < self.__ttl):
+            return None
+
+        return entry.get(self.VERSION_KEY)
+
+    def set(self, component_path, version):
+        with self.__lock:
+            self.__data[component_path] = {
+                self.VERSION_KEY: version,
+                self.TIMESTAMP_KEY: time.time()
+            }
+            self.__save()
+
+    def invalidate(self, component_path=None):
+        with self.__lock:
+            if component_path is None:
+                self.__data.clear()
+            else:
+                self.__data.pop(component_path, None)
+            self.__save()
+
+
+class ComponentVersionProber(object):
+    """
+    ComponentVersionProber
+
+    Reads the current and the available firmware versions of several
+    components concurrently, with a bounded number of workers and a timeout
+    per component, counted from the time its probe starts. The versions of
+    a component which does not answer in time are reported as None and its
+    worker is replaced, so that the components queued behind it are still
+    probed; any other error is raised to the caller. The workers are daemon
+    threads, so that a component which hangs does not keep the CLI from
+    exiting.
+    """
+    def __init__(self, cache=None, max_workers=FW_PROBE_MAX_WORKERS, timeout=FW_PROBE_TIMEOUT):
+        self.__cache = cache
+        self.__max_workers = max_workers
+        self.__timeout = timeout
+
+    def __get_current_version(self, component_path, component):
+        if self.__cache is not None:
+            version = self.__cache.get(component_path)
+            if version is not None:
+                return version
+
+        version = component.get_firmware_version()
+
+        if self.__cache is not None:
+            self.__cache.set(component_path, version)
+
+        return version
+
+    def __probe(self, component_path, component, firmware_path):
+        firmware_version_current = self.__get_current_version(component_path, component)
+
+        firmware_version_available = None
+        if firmware_path is not None:
+            firmware_version_available = component.get_available_firmware_version(firmware_path)
+
+        return firmware_version_current, firmware_version_available
+
+    def __start_worker(self, work, started):
+        threading.Thread(target=self.__run, args=(work, started), daemon=True).start()
+
+    def __run(self, work, started):
+        while True:
+            try:
+                future, args = work.get_nowait()
+            except queue.Empty:
+                return
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started[future] = time.monotonic()
+
+            try:
+                future.set_result(self.__probe(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def get_current_version(self, component_path, component):
+        return self.__get_current_version(component_path, component)
+
+    def probe(self, probe_list):
+        """
+        Probe the components of probe_list, a list of
+        (component_path, component, firmware_path) tuples. The available
+        version is read from firmware_path unless it is None.
+        Returns a dict of component_path -> (current version, available version),
+        in the order of probe_list. Both versions are None for a component
+        which timed out
+        """
+        versions = OrderedDict()
+
+        if not probe_list:
+            return versions
+
+        work = queue.Queue()
+        futures = OrderedDict()
+        for component_path, component, firmware_path in probe_list:
+            futures[component_path] = Future()
+            work.put((futures[component_path], (component_path, component, firmware_path)))
+
+        # future -> time its probe started
+        started = {}
+        for _ in range(min(self.__max_workers, len(futures))):
+            self.__start_worker(work, started)
+
+        timed_out = set()
+        pending = set(futures.values())
+        while pending:
+            deadlines = [started[future] + self.__timeout for future in pending if future in started]
+            timeout = max(0, min(deadlines) - time.monotonic()) if deadlines else self.__timeout
+            _, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            time_now = time.monotonic()
+            for future in [future for future in pending if future in started]:
+                if time_now - started[future] >= self.__timeout:
+                    pending.discard(future)
+                    timed_out.add(future)
+                    if not work.empty():
+                        # The worker is stuck in the component: give its slot to a new one
+                        self.__start_worker(work, started)
+
+        for component_path, future in futures.items():
+            if future in timed_out:
+                log_helper.print_warning("Timed out reading firmware version: component={}".format(component_path))
+                versions[component_path] = (None, None)
+                continue
+
+            versions[component_path] = future.result()
+
+        return versions
+
+
 class PlatformDataProvider(object):
     """
     PlatformDataProvider
@@ -162,6 +354,9 @@ class PlatformDataProvider(object):
         self.chassis_component_map = self.__get_chassis_component_map()
         self.module_component_map = self.__get_module_component_map()
 
+        self.version_cache = FirmwareVersionCache()
+        self.version_prober = ComponentVersionProber(self.version_cache)
+
     def __get_chassis_component_map(self):
         chassis_component_map = OrderedDict()
 
@@ -202,6 +397,12 @@ class PlatformDataProvider(object):
     def is_chassis_has_components(self):
         return self.__chassis.get_num_components() > 0
 
+    def get_component_path(self, chassis_name, module_name, component_name):
+        if module_name is not None:
+            return "{}/{}/{}".format(chassis_name, module_name, component_name)
+
+        return "{}/{}".format(chassis_name, component_name)
+
     platform = property(fget=get_platform)
     chassis = property(fget=get_chassis)
 
@@ -526,6 +727,7 @@ class ComponentUpdateProvider(PlatformDataProvider):
 
     FW_STATUS_UPDATE_REQUIRED = "update is required"
     FW_STATUS_UP_TO_DATE = "up-to-date"
+    FW_STATUS_UNKNOWN = "unknown"
 
     SECTION_CHASSIS = "Chassis"
     SECTION_MODULE = "Module"
@@ -582,10 +784,57 @@ class ComponentUpdateProvider(PlatformDataProvider):
             pcp.module_component_map
         )
 
+    def __probe_versions(self):
+        probe_list = [ ]
+
+        for chassis_name, chassis_component_map in self.chassis_component_map.items():
+            for chassis_component_name, chassis_component in chassis_component_map.items():
+                component = self.__pcp.chassis_component_map[chassis_name][chassis_component_name]
+
+                if component:
+                    probe_list.append(
+                        (
+                            self.get_component_path(chassis_name, None, chassis_component_name),
+                            chassis_component,
+                            self.__get_probe_firmware_path(component)
+                        )
+                    )
+
+        chassis_name = self.chassis.get_name()
+
+        for module_name, module_component_map in self.module_component_map.items():
+            for module_component_name, module_component in module_component_map.items():
+                component = self.__pcp.module_component_map[module_name][module_component_name]
+
+                if component:
+                    probe_list.append(
+                        (
+                            self.get_component_path(chassis_name, module_name, module_component_name),
+                            module_component,
+                            self.__get_probe_firmware_path(component)
+                        )
+                    )
+
+        return self.version_prober.probe(probe_list)
+
+    def __get_probe_firmware_path(self, component):
+        # The available version is only read from the firmware when it is not given in the platform components file
+        if self.__pcp.VERSION_KEY in component:
+            return None
+
+        firmware_path = component[self.__pcp.FIRMWARE_KEY]
+
+        if self.__root_path is not None:
+            firmware_path = self.__root_path + firmware_path
+
+        return firmware_path
+
     def get_updates_status(self):
         status_table = [ ]
         auto_update_status_table = [ ]
 
+        versions = self.__probe_versions()
+
         append_chassis_name = self.is_chassis_has_components()
         append_module_na = not self.is_modular_chassis()
         module_name = NA
@@ -602,19 +851,24 @@ class ComponentUpdateProvider(PlatformDataProvider):
                     if self.__root_path is not None:
                         firmware_path = self.__root_path + firmware_path
 
-                    firmware_version_current = chassis_component.get_firmware_version()
+                    component_path = self.get_component_path(chassis_name, None, chassis_component_name)
+                    firmware_version_current, firmware_version_available = versions[component_path]
 
                     if self.__pcp.VERSION_KEY in component:
                         firmware_version_available = component[self.__pcp.VERSION_KEY]
-                    else:
-                        firmware_version_available = chassis_component.get_available_firmware_version(firmware_path)
 
                     if self.__root_path is not None:
                         firmware_path = component[self.__pcp.FIRMWARE_KEY]
 
-                    firmware_version = "{} / {}".format(firmware_version_current, firmware_version_available)
+                    firmware_version = "{} / {}".format(
+                        NA if firmware_version_current is None else firmware_version_current,
+                        firmware_version_available
+                    )
 
-                    if firmware_version_current != firmware_version_available:
+                    if firmware_version_current is None:
+                        # The version was not read: never update the component blindly
+                        status = self.FW_STATUS_UNKNOWN
+                    elif firmware_version_current != firmware_version_available:
                         status = self.FW_STATUS_UPDATE_REQUIRED
                     else:
                         status = self.FW_STATUS_UP_TO_DATE
@@ -669,19 +923,24 @@ class ComponentUpdateProvider(PlatformDataProvider):
                         if self.__root_path is not None:
                             firmware_path = self.__root_path + firmware_path
 
-                        firmware_version_current = module_component.get_firmware_version()
+                        component_path = self.get_component_path(chassis_name, module_name, module_component_name)
+                        firmware_version_current, firmware_version_available = versions[component_path]
 
                         if self.__pcp.VERSION_KEY in component:
                             firmware_version_available = component[self.__pcp.VERSION_KEY]
-                        else:
-                            firmware_version_available = module_component.get_available_firmware_version(firmware_path)
 
                         if self.__root_path is not None:
                             firmware_path = component[self.__pcp.FIRMWARE_KEY]
 
-                        firmware_version = "{} / {}".format(firmware_version_current, firmware_version_available)
+                        firmware_version = "{} / {}".format(
+                            NA if firmware_version_current is None else firmware_version_current,
+                            firmware_version_available
+                        )
 
-                        if firmware_version_current != firmware_version_available:
+                        if firmware_version_current is None:
+                            # The version was not read: never update the component blindly
+                            status = self.FW_STATUS_UNKNOWN
+                        elif firmware_version_current != firmware_version_available:
                             status = self.FW_STATUS_UPDATE_REQUIRED
                         else:
                             status = self.FW_STATUS_UP_TO_DATE
@@ -787,6 +1046,8 @@ class ComponentUpdateProvider(PlatformDataProvider):
         except Exception as e:
             log_helper.log_fw_update_end(component_path, firmware_path, False, e)
             raise
+        finally:
+            self.version_cache.invalidate(component_path)
 
     def update_au_status_file(self, au_info_data, filename=FW_AU_STATUS_FILE_PATH):
         with open(filename, 'w') as f:
@@ -893,6 +1154,8 @@ class ComponentUpdateProvider(PlatformDataProvider):
         except Exception as e:
             log_helper.log_fw_auto_update_end(component_path, firmware_path, boot, False, e)
             raise
+        finally:
+            self.version_cache.invalidate(component_path)
 
 
     def is_capable_auto_update(self, boot):
@@ -942,7 +1205,8 @@ class ComponentUpdateProvider(PlatformDataProvider):
         if self.__root_path is not None:
             firmware_path = self.__root_path + firmware_path
 
-        firmware_version_current = component.get_firmware_version()
+        component_path = self.get_component_path(chassis_name, module_name, component_name)
+        firmware_version_current = self.version_prober.get_current_version(component_path, component)
 
         if self.__pcp.VERSION_KEY in parser:
             firmware_version_available = parser[self.__pcp.VERSION_KEY]
@@ -970,16 +1234,36 @@ class ComponentStatusProvider(PlatformDataProvider):
     def __parser_fail_fw_au_status(self, msg):
         raise RuntimeError("Failed to parse \"{}\": {}".format(FW_AU_STATUS_FILE_PATH, msg))
 
+    def __probe_versions(self):
+        probe_list = [ ]
+
+        for chassis_name, chassis_component_map in self.chassis_component_map.items():
+            for chassis_component_name, chassis_component in chassis_component_map.items():
+                component_path = self.get_component_path(chassis_name, None, chassis_component_name)
+                probe_list.append((component_path, chassis_component, None))
+
+        chassis_name = self.chassis.get_name()
+
+        for module_name, module_component_map in self.module_component_map.items():
+            for module_component_name, module_component in module_component_map.items():
+                component_path = self.get_component_path(chassis_name, module_name, module_component_name)
+                probe_list.append((component_path, module_component, None))
+
+        return self.version_prober.probe(probe_list)
+
     def get_status(self):
         status_table = [ ]
 
+        versions = self.__probe_versions()
+
         append_chassis_name = self.is_chassis_has_components()
         append_module_na = not self.is_modular_chassis()
         module_name = NA
 
         for chassis_name, chassis_component_map in self.chassis_component_map.items():
             for chassis_component_name, chassis_component in chassis_component_map.items():
-                firmware_version = chassis_component.get_firmware_version()
+                firmware_version, _ = versions[self.get_component_path(chassis_name, None, chassis_component_name)]
+                firmware_version = NA if firmware_version is None else firmware_version
                 description = chassis_component.get_description()
 
                 status_table.append(
@@ -1006,7 +1290,8 @@ class ComponentStatusProvider(PlatformDataProvider):
                 append_module_name = True
 
                 for module_component_name, module_component in module_component_map.items():
-                    firmware_version = module_component.get_firmware_version()
+                    firmware_version, _ = versions[self.get_component_path(chassis_name, module_name, module_component_name)]
+                    firmware_version = NA if firmware_version is None else firmware_version
                     description = module_component.get_description()
 
                     status_table.append(
@@ -214,6 +214,8 @@ def install_fw(ctx, fw_path):
     except Exception as e:
         log_helper.log_fw_install_end(component_path, fw_path, False, e)
         cli_abort(ctx, str(e))
+    finally:
+        pdp.version_cache.invalidate(component_path)
 
     if not status:
         log_helper.print_error("Firmware install failed")
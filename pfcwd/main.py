@@ -1,6 +1,8 @@
 import importlib
 import os
 import sys
+import time
+from collections import deque, namedtuple
 
 import click
 import utilities_common.cli as clicommon
@@ -9,6 +11,7 @@ from sonic_py_common.multi_asic import get_external_ports
 from tabulate import tabulate
 from utilities_common import multi_asic as multi_asic_util
 from utilities_common import constants
+from utilities_common.db_pipeline import get_pipelined_client, hgetall_batched
 from utilities_common.general import load_db_config
 from sonic_py_common import logger
 
@@ -54,6 +57,18 @@ CONFIG_DESCRIPTION = [
 ]
 
 STATS_HEADER = ('QUEUE', 'STATUS',) + list(zip(*STATS_DESCRIPTION))[0]
+
+# Counters followed in watch mode: storms detected/restored, then TX/RX drops
+WATCH_COUNTERS = (
+    'PFC_WD_QUEUE_STATS_DEADLOCK_DETECTED', 'PFC_WD_QUEUE_STATS_DEADLOCK_RESTORED',
+    'PFC_WD_QUEUE_STATS_TX_DROPPED_PACKETS', 'PFC_WD_QUEUE_STATS_RX_DROPPED_PACKETS',
+)
+WATCH_HEADER = ('QUEUE', 'STATUS', 'STORM DETECTED/RESTORED', 'DELTA', 'RATE/S', 'TX/RX DROP DELTA')
+# Samples kept per queue, rates are computed over this window
+WATCH_HISTORY = 10
+DEFAULT_WATCH_INTERVAL = 1
+
+StatsSample = namedtuple('StatsSample', ['time', 'status', 'counters'])
 CONFIG_HEADER = ('PORT',) + list(zip(*CONFIG_DESCRIPTION))[0]
 
 CONFIG_DB_PFC_WD_TABLE_NAME = 'PFC_WD'
@@ -65,8 +80,9 @@ def cli():
     """ SONiC PFC Watchdog """
     load_db_config()
 
-def get_all_queues(db, namespace=None, display=constants.DISPLAY_ALL):
-    queue_names = db.get_all(db.COUNTERS_DB, 'COUNTERS_QUEUE_NAME_MAP')
+def get_all_queues(db, namespace=None, display=constants.DISPLAY_ALL, queue_names=None):
+    if queue_names is None:
+        queue_names = db.get_all(db.COUNTERS_DB, 'COUNTERS_QUEUE_NAME_MAP')
     queues = list(queue_names.keys()) if queue_names else {}
     if display == constants.DISPLAY_ALL:
         return natsorted(queues)
@@ -116,30 +132,39 @@ class PfcwdCli(object):
         )
         self.table = []
         self.all_ports = []
+        self.history = {}
 
-    @multi_asic_util.run_on_multi_asic
-    def collect_stats(self, empty, queues):
-        table = []
-
+    def read_queue_stats(self, queues):
+        """
+        Return [(queue, stats)] for <queues>, or all queues if empty. The
+        counters of all queues are fetched in pipelined batches.
+        """
+        queue_names = self.db.get_all(
+            self.db.COUNTERS_DB, 'COUNTERS_QUEUE_NAME_MAP'
+        ) or {}
         if len(queues) == 0:
             queues = get_all_queues(
                 self.db,
                 self.multi_asic.current_namespace,
-                self.multi_asic.display_option
+                self.multi_asic.display_option,
+                queue_names
             )
 
+        counter_keys = {}
         for queue in queues:
+            queue_oid = queue_names.get(queue)
+            if queue_oid is not None:
+                counter_keys['COUNTERS:' + queue_oid] = queue
+
+        client = get_pipelined_client(self.db, 'COUNTERS_DB')
+        return [(counter_keys[key], stats) for key, stats in hgetall_batched(client, counter_keys)]
+
+    @multi_asic_util.run_on_multi_asic
+    def collect_stats(self, empty, queues):
+        table = []
+
+        for queue, stats in self.read_queue_stats(queues):
             stats_list = []
-            queue_oid = self.db.get(
-                self.db.COUNTERS_DB, 'COUNTERS_QUEUE_NAME_MAP', queue
-            )
-            if queue_oid is None:
-                continue
-            stats = self.db.get_all(
-                self.db.COUNTERS_DB, 'COUNTERS:' + queue_oid
-            )
-            if stats is None:
-                continue
             for stat in STATS_DESCRIPTION:
                 line = stats.get(stat[1], '0') + '/' + stats.get(stat[2], '0')
                 stats_list.append(line)
@@ -158,6 +183,69 @@ class PfcwdCli(object):
             tablefmt='simple'
         ))
 
+    @multi_asic_util.run_on_multi_asic
+    def sample_stats(self, queues):
+        now = time.time()
+        for queue, stats in self.read_queue_stats(queues):
+            counters = tuple(int(stats.get(counter, 0)) for counter in WATCH_COUNTERS)
+            if queue not in self.history:
+                self.history[queue] = deque(maxlen=WATCH_HISTORY)
+            self.history[queue].append(
+                StatsSample(now, stats.get('PFC_WD_STATUS', 'N/A'), counters)
+            )
+
+    def render_watch(self, empty, interval):
+        """
+        Render the queues whose counters changed within the sample window,
+        or all queues if <empty>. Queues that changed since the previous
+        sample are highlighted.
+        """
+        table = []
+        changed = 0
+        for queue in natsorted(self.history):
+            samples = self.history[queue]
+            first, prev, last = samples[0], samples[-2 if len(samples) > 1 else -1], samples[-1]
+            # counters going backwards were cleared, count from zero
+            delta = [max(cur - old, 0) for cur, old in zip(last.counters, prev.counters)]
+            window = [max(cur - old, 0) for cur, old in zip(last.counters, first.counters)]
+            if any(delta):
+                changed += 1
+            if not any(window) and not empty:
+                continue
+            elapsed = last.time - first.time
+            rate = [value / elapsed if elapsed else 0.0 for value in window[:2]]
+            table.append([
+                click.style(queue, fg='red', bold=True) if any(delta) else queue,
+                last.status,
+                '{}/{}'.format(*last.counters[:2]),
+                '+{}/+{}'.format(*delta[:2]),
+                '{:.2f}/{:.2f}'.format(*rate),
+                '+{}/+{}'.format(*delta[2:]),
+            ])
+
+        output = 'Every {:g}s: {} queues, {} changed\n\n'.format(interval, len(self.history), changed)
+        output += tabulate(
+            table, WATCH_HEADER, stralign='right', numalign='right',
+            tablefmt='simple'
+        )
+        return output
+
+    def watch_stats(self, empty, queues, interval, count=None):
+        """
+        Sample the queue counters every <interval> seconds and redraw,
+        <count> times or until interrupted
+        """
+        self.history = {}
+        iteration = 0
+        while True:
+            self.sample_stats(queues)
+            click.clear()
+            click.echo(self.render_watch(empty, interval))
+            iteration += 1
+            if count is not None and iteration >= count:
+                break
+            time.sleep(interval)
+
     @multi_asic_util.run_on_multi_asic
     def get_all_namespace_ports(self):
         ports = get_all_ports(
@@ -422,13 +510,24 @@ class Show(object):
     @show.command()
     @multi_asic_util.multi_asic_click_options
     @click.option('-e', '--empty', is_flag=True)
+    @click.option('-w', '--watch', is_flag=True, help="Keep sampling the stats and show the queues whose counters change")
+    @click.option('-i', '--interval', type=click.FloatRange(0.1), default=DEFAULT_WATCH_INTERVAL, show_default=True,
+                  help="Seconds between samples in watch mode")
+    @click.option('-c', '--count', type=click.IntRange(1), default=None, help="Number of samples to take in watch mode")
     @click.argument('queues', nargs=-1)
     @clicommon.pass_db
-    def stats(db, namespace, display, empty, queues):
+    def stats(db, namespace, display, empty, watch, interval, count, queues):
         """ Show PFC Watchdog stats per queue """
         if (len(queues)):
             display = constants.DISPLAY_ALL
-        PfcwdCli(db, namespace, display).show_stats(empty, queues)
+        if not watch:
+            PfcwdCli(db, namespace, display).show_stats(empty, queues)
+            return
+
+        try:
+            PfcwdCli(db, namespace, display).watch_stats(empty, queues, interval, count)
+        except KeyboardInterrupt:
+            pass
 
     # Show config
     @show.command()
@@ -6,9 +6,11 @@ import json
 import sys
 import traceback
 import re
+import time
 
 from sonic_py_common import device_info, logger
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector, SonicDBConfig
+from utilities_common.staged_db import StagedDBConnector
 
 INIT_CFG_FILE = '/etc/sonic/init_cfg.json'
 
@@ -32,7 +34,7 @@ log = logger.Logger(SYSLOG_IDENTIFIER)
 
 
 class DBMigrator():
-    def __init__(self, namespace, socket=None):
+    def __init__(self, namespace, socket=None, staged=False):
         """
         Version string format:
            version_<major>_<minor>_<build>
@@ -43,6 +45,10 @@ class DBMigrator():
                      github public branches. These private branches shall use
                      none-zero values.
               build: sequentially increase within a minor version domain.
+
+        With staged=True, CONFIG_DB and APPL_DB are read once into an
+        in-memory working copy, all steps run against it and nothing is
+        written until flush() is called.
         """
         self.CURRENT_VERSION = 'version_3_0_5'
 
@@ -70,6 +76,13 @@ class DBMigrator():
         if self.stateDB is not None:
             self.stateDB.connect(self.stateDB.STATE_DB)
 
+        self.staged = staged
+        if staged:
+            self.configDB = StagedDBConnector(self.configDB, 'CONFIG_DB', socket)
+            self.appDB = StagedDBConnector(self.appDB, 'APPL_DB', socket)
+
+        self.step_timing = []
+
         version_info = device_info.get_sonic_version_info()
         asic_type = version_info.get('asic_type')
         self.asic_type = asic_type
@@ -761,16 +774,49 @@ class DBMigrator():
         else:
             log.log_notice("Asic Type: {}, Hwsku: {}".format(self.asic_type, self.hwsku))
 
+    def run_step(self, name, step):
+        start = time.time()
+        result = step()
+        elapsed = time.time() - start
+        self.step_timing.append((name, elapsed))
+        log.log_info('Step {} took {:.3f}s'.format(name, elapsed))
+        return result
+
     def migrate(self):
         version = self.get_version()
         log.log_info('Upgrading from version ' + version)
         while version:
-            next_version = getattr(self, version)()
+            next_version = self.run_step(version, getattr(self, version))
             if next_version == version:
                 raise Exception('Version migrate from %s stuck in same version' % version)
             version = next_version
         # Perform common migration ops
-        self.common_migration_ops()
+        self.run_step('common_migration_ops', self.common_migration_ops)
+
+    def flush(self):
+        """
+        Write the staged changes, one pipelined write per DB
+        """
+        for name, db in [('CONFIG_DB', self.configDB), ('APPL_DB', self.appDB)]:
+            count = self.run_step('flush_' + name, db.flush)
+            log.log_info('Flushed {} changed keys to {}'.format(count, name))
+
+    def diff_report(self):
+        """
+        Return the staged changes and the per step timing as text
+        """
+        lines = []
+        for name, db in [('CONFIG_DB', self.configDB), ('APPL_DB', self.appDB)]:
+            lines.append(name)
+            for key, to_set, to_del in db.diff():
+                if to_set is None:
+                    lines.append('  - {}'.format(key))
+                else:
+                    lines.append('  ~ {} set: {} del: {}'.format(key, to_set, to_del))
+        lines.append('Step timing')
+        for name, elapsed in self.step_timing:
+            lines.append('  {}: {:.3f}s'.format(name, elapsed))
+        return '\n'.join(lines)
 
 def main():
     try:
@@ -798,6 +844,12 @@ def main():
                         required = False,
                         help = 'The asic namespace whose DB instance we need to connect',
                         default = None )
+        parser.add_argument('--staged',
+                        action='store_true',
+                        help = 'run all steps against an in-memory copy of the DBs and write the net changes at the end')
+        parser.add_argument('--dry-run',
+                        action='store_true',
+                        help = 'like --staged, but print the changes and step timing instead of writing them')
         args = parser.parse_args()
         operation = args.operation
         socket_path = args.socket
@@ -808,15 +860,21 @@ def main():
         else:
             SonicDBConfig.initialize()
 
+        staged = args.staged or args.dry_run
         if socket_path:
-            dbmgtr = DBMigrator(namespace, socket=socket_path)
+            dbmgtr = DBMigrator(namespace, socket=socket_path, staged=staged)
         else:
-            dbmgtr = DBMigrator(namespace)
+            dbmgtr = DBMigrator(namespace, staged=staged)
 
         result = getattr(dbmgtr, operation)()
         if result:
             print(str(result))
 
+        if args.dry_run:
+            print(dbmgtr.diff_report())
+        elif staged:
+            dbmgtr.flush()
+
     except Exception as e:
         log.log_error('Caught exception: ' + str(e))
         traceback.print_exc()
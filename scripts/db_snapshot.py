@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+"""
+Save Redis DB snapshots for techsupport.
+
+Every DB given on the command line is dumped concurrently, on its own
+connection, to <outdir>/<name>.gz. Keys are enumerated with SCAN and read
+with pipelined batches, and the snapshot is written to the compressed file
+as it is read, one key per line and in key order. Entries have the same
+shape as the ones of sonic-db-dump, the ttl being in seconds (-0.001 for
+keys without expiry) and expireat the time the key expires at:
+
+    {
+    "KEY": {"expireat": 1650000000.5, "ttl": -0.001, "type": "hash", "value": {"field": "value"}},
+    ...
+    }
+
+With --base a snapshot is stored as a delta against an earlier snapshot of
+the same DB, e.g. the repeated COUNTERS_DB snapshots of a techsupport. Keys
+that did not change are left out, hashes only hold the fields that changed
+and list the fields that were removed under "deleted", and removed keys are
+null. The expireat of a key is not compared, so a key left out of a delta
+keeps the expireat of its base. --expand rebuilds the complete snapshot
+from the base and the delta:
+
+    db_snapshot.py --expand COUNTERS_DB_1.json.gz COUNTERS_DB_2.delta.json.gz
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# mock the redis for unit test purposes #
+try:
+    if os.environ["UTILITIES_UNIT_TESTING"] == "2":
+        modules_path = os.path.join(os.path.dirname(__file__), "..")
+        tests_path = os.path.join(modules_path, "tests")
+        sys.path.insert(0, modules_path)
+        sys.path.insert(0, tests_path)
+        import mock_tables.dbconnector
+except KeyError:
+    pass
+
+from swsscommon.swsscommon import SonicV2Connector
+from utilities_common.db_pipeline import dump_batched, get_pipelined_client, scan_keys
+
+COMPRESS_LEVEL = 6
+
+# CONFIG_DB content left out of snapshots with --mask-secrets
+SECRET_FIELDS = ['passkey']
+SECRET_TABLES = ['SNMP_COMMUNITY']
+SECRET_MASK = '****'
+
+
+def to_json(key_type, value):
+    """ Convert a value as read by dump_batched to JSON """
+    if key_type == 'set':
+        return sorted(value)
+    if key_type == 'zset':
+        return [[member, score] for member, score in value]
+    return value
+
+
+def to_entry(key_type, value, pttl):
+    """ Return the entry of a key as sonic-db-dump saves it """
+    if pttl is None or pttl < 0:
+        pttl = -1
+    ttl = pttl / 1000.0
+    return {'expireat': time.time() + ttl, 'ttl': ttl, 'type': key_type, 'value': to_json(key_type, value)}
+
+
+def read_db(db_name, namespace):
+    """ Yield (key, entry) for every key of <db_name>, in key order """
+    db = SonicV2Connector(use_unix_socket_path=True, namespace=namespace)
+    db.connect(db_name)
+    client = get_pipelined_client(db, db_name)
+    keys = sorted(set(scan_keys(client, '*')))
+    for key, key_type, value, pttl in dump_batched(client, keys, with_ttl=True):
+        yield key, to_entry(key_type, value, pttl)
+
+
+def remove_secrets(entries):
+    """ Leave out the secret tables and mask the secret fields of <entries> """
+    for key, entry in entries:
+        if key.split('|')[0] in SECRET_TABLES:
+            continue
+        if entry['type'] == 'hash' and any(field in entry['value'] for field in SECRET_FIELDS):
+            value = {field: SECRET_MASK if field in SECRET_FIELDS else data
+                     for field, data in entry['value'].items()}
+            entry = dict(entry, value=value)
+        yield key, entry
+
+
+def without_expireat(entry):
+    """ Return <entry> without its expireat, which changes with every snapshot """
+    return {name: data for name, data in entry.items() if name != 'expireat'}
+
+
+def diff_entry(base, entry):
+    """ Return the delta from <base> to <entry> of a key, None if it did not change """
+    if base['type'] != 'hash' or entry['type'] != 'hash':
+        return None if without_expireat(base) == without_expireat(entry) else entry
+
+    changed = {field: data for field, data in entry['value'].items() if base['value'].get(field) != data}
+    deleted = sorted(field for field in base['value'] if field not in entry['value'])
+    if not changed and not deleted and base.get('ttl') == entry.get('ttl'):
+        return None
+    delta = dict(entry, value=changed)
+    if deleted:
+        delta['deleted'] = deleted
+    return delta
+
+
+def diff(base_entries, entries):
+    """ Yield the delta from <base_entries> to <entries>, both in key order """
+    base_entries = iter(base_entries)
+    base = next(base_entries, None)
+    for key, entry in entries:
+        while base is not None and base[0] < key:
+            yield base[0], None
+            base = next(base_entries, None)
+        if base is not None and base[0] == key:
+            delta = diff_entry(base[1], entry)
+            base = next(base_entries, None)
+            if delta is not None:
+                yield key, delta
+        else:
+            yield key, entry
+    while base is not None:
+        yield base[0], None
+        base = next(base_entries, None)
+
+
+def apply_delta(entry, delta):
+    """ Return the entry of a key updated by its <delta> """
+    if entry['type'] != 'hash' or delta['type'] != 'hash':
+        return delta
+    value = dict(entry['value'])
+    value.update(delta['value'])
+    for field in delta.get('deleted', []):
+        value.pop(field, None)
+    entry = dict(delta, value=value)
+    entry.pop('deleted', None)
+    return entry
+
+
+def expand(base_entries, delta_entries):
+    """ Yield the entries of <base_entries> updated by <delta_entries>, both in key order """
+    delta_entries = iter(delta_entries)
+    delta = next(delta_entries, None)
+    for key, entry in base_entries:
+        while delta is not None and delta[0] < key:
+            if delta[1] is not None:
+                yield delta
+            delta = next(delta_entries, None)
+        if delta is not None and delta[0] == key:
+            if delta[1] is not None:
+                yield key, apply_delta(entry, delta[1])
+            delta = next(delta_entries, None)
+        else:
+            yield key, entry
+    while delta is not None:
+        if delta[1] is not None:
+            yield delta
+        delta = next(delta_entries, None)
+
+
+def write_snapshot(f, entries):
+    """ Write <entries> to the text file <f>, one key per line. Returns the number of keys """
+    count = 0
+    f.write('{\n')
+    for key, entry in entries:
+        if count:
+            f.write(',\n')
+        f.write(json.dumps(key))
+        f.write(': ')
+        f.write(json.dumps(entry, sort_keys=True))
+        count += 1
+    f.write('\n}\n' if count else '}\n')
+    return count
+
+
+def read_snapshot(path):
+    """ Yield (key, entry) for every key of the snapshot or delta at <path> """
+    with gzip.open(path, 'rt') as f:
+        for line in f:
+            line = line.rstrip().rstrip(',')
+            if line in ('{', '}', ''):
+                continue
+            yield next(iter(json.loads('{' + line + '}').items()))
+
+
+def save_db(db_name, namespace, path, base=None, mask_secrets=False):
+    """ Save a snapshot of <db_name> to <path>, as a delta against <base> if given """
+    start = time.time()
+    entries = read_db(db_name, namespace)
+    if mask_secrets:
+        entries = remove_secrets(entries)
+    if base is not None:
+        entries = diff(read_snapshot(base), entries)
+    with gzip.open(path, 'wt', compresslevel=COMPRESS_LEVEL) as f:
+        count = write_snapshot(f, entries)
+    print('{}: {} keys in {:.3f}s'.format(db_name, count, time.time() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Save Redis DB snapshots',
+                                     formatter_class=argparse.RawTextHelpFormatter,
+                                     epilog="""
+Examples:
+  db_snapshot.py -o /tmp APPL_DB ASIC_DB
+  db_snapshot.py -n asic0 -o /tmp --name '{db}.json.0' APPL_DB
+  db_snapshot.py -o /tmp --name '{db}_2.delta.json' --base /tmp/COUNTERS_DB_1.json.gz COUNTERS_DB
+  db_snapshot.py --expand /tmp/COUNTERS_DB_1.json.gz /tmp/COUNTERS_DB_2.delta.json.gz
+""")
+    parser.add_argument('dbs', metavar='DB', nargs='*', help='DB names')
+    parser.add_argument('-n', '--namespace', default='', help='Namespace name')
+    parser.add_argument('-o', '--outdir', default='.', help='Directory to save the snapshots to')
+    parser.add_argument('--name', default='{db}.json',
+                        help='Snapshot file name, {db} is replaced by the DB name and .gz is appended')
+    parser.add_argument('--base', help='Save the snapshot as a delta against this snapshot')
+    parser.add_argument('--mask-secrets', action='store_true', help='Leave out secrets saved in CONFIG_DB')
+    parser.add_argument('--expand', nargs=2, metavar=('BASE', 'DELTA'),
+                        help='Print the complete snapshot of a delta and its base')
+    args = parser.parse_args()
+
+    if args.expand:
+        write_snapshot(sys.stdout, expand(read_snapshot(args.expand[0]), read_snapshot(args.expand[1])))
+        return 0
+
+    if not args.dbs:
+        parser.error('no DB given')
+    if args.base and len(args.dbs) > 1:
+        parser.error('--base applies to a single DB')
+
+    with ThreadPoolExecutor(max_workers=len(args.dbs)) as executor:
+        futures = {}
+        for db_name in args.dbs:
+            path = os.path.join(args.outdir, args.name.format(db=db_name) + '.gz')
+            futures[db_name] = executor.submit(save_db, db_name, args.namespace, path,
+                                               args.base, args.mask_secrets)
+
+    rc = 0
+    for db_name, future in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            print('Failed to save {}: {}'.format(db_name, e), file=sys.stderr)
+            rc = 1
+    return rc
+
+
+if __name__ == '__main__':
+    sys.exit(main())
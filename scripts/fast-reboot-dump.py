@@ -13,16 +13,17 @@ import syslog
 import traceback
 import ipaddress
 from builtins import str #for unicode conversion in python2
+from fdbutil.entries_file import FORMAT_JSON, FORMATS, EntriesWriter
 
 
 ARP_CHUNK = binascii.unhexlify('08060001080006040001') # defines a part of the packet for ARP Request
 ARP_PAD = binascii.unhexlify('00' * 18)
 
-def generate_neighbor_entries(filename, all_available_macs):
+def generate_neighbor_entries(filename, all_available_macs, fmt=FORMAT_JSON):
     db = SonicV2Connector(use_unix_socket_path=False)
     db.connect(db.APPL_DB, False)   # Make one attempt only
 
-    arp_output = []
+    arp_output = EntriesWriter(filename, fmt)
     neighbor_entries = []
     keys = db.keys(db.APPL_DB, 'NEIGH_TABLE:*')
     keys = [] if keys is None else keys
@@ -44,9 +45,7 @@ def generate_neighbor_entries(filename, all_available_macs):
         syslog.syslog(syslog.LOG_INFO, "Neighbor entry: [Vlan: %s, Mac: %s, Ip: %s]" % (vlan_name, mac, ip_addr))
 
     db.close(db.APPL_DB)
-
-    with open(filename, 'w') as fp:
-        json.dump(arp_output, fp, indent=2, separators=(',', ': '))
+    arp_output.close()
 
     return neighbor_entries
 
@@ -150,7 +149,7 @@ def get_vlan_oid_by_vlan_id(db, vlan_id):
 
     raise Exception('Not found bvi oid for vlan_id: %d' % vlan_id)
 
-def get_fdb(db, vlan_name, vlan_id, bridge_id_2_iface):
+def get_fdb(db, vlan_name, vlan_id, bridge_id_2_iface, fdb_entries=None):
     fdb_types = {
       'SAI_FDB_ENTRY_TYPE_DYNAMIC': 'dynamic',
       'SAI_FDB_ENTRY_TYPE_STATIC' : 'static'
@@ -159,7 +158,7 @@ def get_fdb(db, vlan_name, vlan_id, bridge_id_2_iface):
     bvid = get_vlan_oid_by_vlan_id(db, vlan_id)
     available_macs = set()
     map_mac_ip = {}
-    fdb_entries = []
+    fdb_entries = [] if fdb_entries is None else fdb_entries
     keys = db.keys(db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:{*\"bvid\":\"%s\"*}' % bvid)
     keys = [] if keys is None else keys
     for key in keys:
@@ -189,7 +188,7 @@ def get_fdb(db, vlan_name, vlan_id, bridge_id_2_iface):
 
     return fdb_entries, available_macs, map_mac_ip
 
-def generate_fdb_entries(filename):
+def generate_fdb_entries(filename, fmt=FORMAT_JSON):
     asic_db = SonicV2Connector(use_unix_socket_path=False)
     app_db = SonicV2Connector(use_unix_socket_path=False)
     asic_db.connect(asic_db.ASIC_DB, False)   # Make one attempt only
@@ -197,18 +196,17 @@ def generate_fdb_entries(filename):
 
     vlan_ifaces = get_vlan_ifaces()
 
-    fdb_entries, all_available_macs, map_mac_ip_per_vlan = generate_fdb_entries_logic(asic_db, app_db, vlan_ifaces)
+    # entries are written to the file as they are generated
+    with EntriesWriter(filename, fmt) as fdb_output:
+        _, all_available_macs, map_mac_ip_per_vlan = generate_fdb_entries_logic(asic_db, app_db, vlan_ifaces, fdb_output)
 
     asic_db.close(asic_db.ASIC_DB)
     app_db.close(app_db.APPL_DB)
 
-    with open(filename, 'w') as fp:
-        json.dump(fdb_entries, fp, indent=2, separators=(',', ': '))
-
     return all_available_macs, map_mac_ip_per_vlan
 
-def generate_fdb_entries_logic(asic_db, app_db, vlan_ifaces):
-    fdb_entries = []
+def generate_fdb_entries_logic(asic_db, app_db, vlan_ifaces, fdb_entries=None):
+    fdb_entries = [] if fdb_entries is None else fdb_entries
     all_available_macs = set()
     map_mac_ip_per_vlan = {}
 
@@ -216,9 +214,8 @@ def generate_fdb_entries_logic(asic_db, app_db, vlan_ifaces):
 
     for vlan in vlan_ifaces:
         vlan_id = int(vlan.replace('Vlan', ''))
-        fdb_entry, available_macs, map_mac_ip_per_vlan[vlan] = get_fdb(asic_db, vlan, vlan_id, bridge_id_2_iface)
+        _, available_macs, map_mac_ip_per_vlan[vlan] = get_fdb(asic_db, vlan, vlan_id, bridge_id_2_iface, fdb_entries)
         all_available_macs |= available_macs
-        fdb_entries.extend(fdb_entry)
 
     return fdb_entries, all_available_macs, map_mac_ip_per_vlan
 
@@ -300,11 +297,11 @@ def get_default_entries(db, route):
 
     return obj
 
-def generate_default_route_entries(filename):
+def generate_default_route_entries(filename, fmt=FORMAT_JSON):
     db = SonicV2Connector(unix_socket_path=False)
     db.connect(db.APPL_DB, False)   # Make one attempt only
 
-    default_routes_output = []
+    default_routes_output = EntriesWriter(filename, fmt)
 
     ipv4_default = get_default_entries(db, '0.0.0.0/0')
     if ipv4_default is not None:
@@ -315,9 +312,7 @@ def generate_default_route_entries(filename):
         default_routes_output.append(ipv6_default)
 
     db.close(db.APPL_DB)
-
-    with open(filename, 'w') as fp:
-        json.dump(default_routes_output, fp, indent=2, separators=(',', ': '))
+    default_routes_output.close()
 
 def generate_media_config(filename):
     db = SonicV2Connector(host='127.0.0.1')
@@ -348,14 +343,16 @@ def generate_media_config(filename):
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('-t', '--target', type=str, default='/tmp', help='target directory for files')
+    parser.add_argument('-f', '--format', type=str, choices=FORMATS, default=FORMAT_JSON,
+                        help='format of the fdb, arp and default routes files')
     args = parser.parse_args()
     root_dir = args.target
     if not os.path.isdir(root_dir):
         print("Target directory '%s' not found" % root_dir)
         return 3
-    all_available_macs, map_mac_ip_per_vlan = generate_fdb_entries(root_dir + '/fdb.json')
-    neighbor_entries = generate_neighbor_entries(root_dir + '/arp.json', all_available_macs)
-    generate_default_route_entries(root_dir + '/default_routes.json')
+    all_available_macs, map_mac_ip_per_vlan = generate_fdb_entries(root_dir + '/fdb.json', args.format)
+    neighbor_entries = generate_neighbor_entries(root_dir + '/arp.json', all_available_macs, args.format)
+    generate_default_route_entries(root_dir + '/default_routes.json', args.format)
     generate_media_config(root_dir + '/media_config.json')
     send_garp_nd(neighbor_entries, map_mac_ip_per_vlan)
     return 0
@@ -293,11 +293,11 @@ def expected(db, interfacename):
         click.echo("DEVICE_NEIGHBOR_METADATA information is not present.")
         return
 
+    display_name = clicommon.get_interface_display_name_func()
     for port in natsorted(list(neighbor_dict.keys())):
-        temp_port = port
-        if clicommon.get_interface_naming_mode() == "alias":
-            port = clicommon.InterfaceAliasConverter().name_to_alias(port)
-            neighbor_dict[port] = neighbor_dict.pop(temp_port)
+        display_port = display_name(port)
+        if display_port != port:
+            neighbor_dict[display_port] = neighbor_dict.pop(port)
 
     header = ['LocalPort', 'Neighbor', 'NeighborPort', 'NeighborLoopback', 'NeighborMgmt', 'NeighborType']
     body = []
@@ -401,12 +401,9 @@ def mpls(ctx, interfacename, namespace, display):
     body = []
 
     # Output name and alias for all interfaces
+    display_name = clicommon.get_interface_display_name_func()
     for intf_name in natsorted(list(intfs_data.keys())):
-        if clicommon.get_interface_naming_mode() == "alias":
-            alias = clicommon.InterfaceAliasConverter().name_to_alias(intf_name)
-            body.append([alias, intfs_data[intf_name]])
-        else:
-            body.append([intf_name, intfs_data[intf_name]])
+        body.append([display_name(intf_name), intfs_data[intf_name]])
 
     click.echo(tabulate(body, header))
 
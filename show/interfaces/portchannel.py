@@ -98,6 +98,7 @@ class Teamshow(object):
         """
              Get teamshow results by parsing the output of teamdctl and combining port channel status.
         """
+        display_name = clicommon.get_interface_display_name_func()
         for team in self.teams:
             info = {}
             team_id = self.get_team_id(team)
@@ -130,11 +131,7 @@ class Teamshow(object):
                     status = self.get_portchannel_member_status(team, port)
                     pstate = self.db.get_all(self.db.STATE_DB, PORT_CHANNEL_MEMBER_STATE_TABLE_PREFIX+team+'|'+port)
                     selected = True if pstate['runner.aggregator.selected'] == "true" else False
-                    if clicommon.get_interface_naming_mode() == "alias":
-                        alias = clicommon.InterfaceAliasConverter().name_to_alias(port)
-                        info["ports"] += alias + "("
-                    else:
-                        info["ports"] += port + "("
+                    info["ports"] += display_name(port) + "("
                     info["ports"] += "S" if selected else "D"
                     if status is None or (status == "enabled" and not selected) or (status == "disabled" and selected):
                         info["ports"] += "*"
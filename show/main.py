@@ -14,6 +14,7 @@ from natsort import natsorted
 from sonic_py_common import device_info
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
 from tabulate import tabulate
+from utilities_common import profiling
 from utilities_common import util_base
 from utilities_common.db import Db
 from datetime import datetime
@@ -250,6 +251,7 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help', '-?'])
 # This is our entrypoint - the main "show" command
 # TODO: Consider changing function name to 'show' for better understandability
 @click.group(cls=clicommon.AliasedGroup, context_settings=CONTEXT_SETTINGS)
+@profiling.profile_option
 @click.pass_context
 def cli(ctx):
     """SONiC command line - 'show' command"""
@@ -1915,10 +1917,22 @@ def information():
 #
 @cli.command('line')
 @click.option('--brief', '-b', metavar='<brief_mode>', required=False, is_flag=True)
+@click.option('--watch', '-w', is_flag=True, help="Keep running and redraw the table whenever a line state changes")
 @click.option('--verbose', is_flag=True, help="Enable verbose output")
-def line(brief, verbose):
+def line(brief, watch, verbose):
     """Show all console lines and their info include available ttyUSB devices unless specified brief mode"""
     cmd = "consutil show" + (" -b" if brief else "")
+    if watch:
+        # consutil redraws the table in place, so it writes to the terminal
+        # directly instead of a pipe, also in alias naming mode
+        cmd += " -w"
+        if verbose:
+            click.echo(click.style("Command: ", fg='cyan') + click.style(cmd, fg='green'))
+        rc = subprocess.call(cmd, shell=True)
+        if rc != 0:
+            sys.exit(rc)
+        return
+
     run_command(cmd, display_cmd=verbose)
     return
 
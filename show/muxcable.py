@@ -8,7 +8,7 @@ import utilities_common.cli as clicommon
 from natsort import natsorted
 from collections import OrderedDict
 from operator import itemgetter
-from sonic_py_common import multi_asic
+from sonic_py_common import logger, multi_asic
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
 from swsscommon import swsscommon
 from tabulate import tabulate
@@ -17,6 +17,10 @@ from utilities_common.general import get_optional_value_for_key_in_config_tbl
 
 platform_sfputil = None
 
+SYSLOG_IDENTIFIER = "show_muxcable"
+
+log = logger.Logger(SYSLOG_IDENTIFIER)
+
 REDIS_TIMEOUT_MSECS = 0
 SELECT_TIMEOUT = 1000
 HWMODE_MUXDIRECTION_TIMEOUT = 0.1
@@ -219,17 +223,45 @@ def get_result(port, res_dict, cmd ,result, table_name):
 
 def update_and_get_response_for_xcvr_cmd(cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name ,port, cmd_timeout_secs, param_dict= None, arg=None):
 
-    res_dict = {}
+    res_dicts, timed_out_ports = issue_xcvr_cmd_ports(
+        cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name, [port], cmd_timeout_secs, param_dict, arg)
+
+    if port in timed_out_ports:
+        # Not echoed: the output of the commands may be JSON
+        log.log_warning("Did not receive a port response {}".format(port))
+
+    return res_dicts[port]
+
+
+def update_and_get_response_for_xcvr_cmd_ports(cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name, port_list, cmd_timeout_secs, param_dict=None, arg=None):
+    """
+    Issue a xcvrd command for all ports in port_list at once and wait for the
+    responses on a single selector, demultiplexed by port key. Every port gets
+    cmd_timeout_secs from the time its command was written, so the whole batch
+    takes about one timeout instead of one per port.
+    Returns a dict of port -> res_dict, res_dict being {0: rc, 1: response}.
+    """
+
+    res_dicts, _ = issue_xcvr_cmd_ports(
+        cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name, port_list, cmd_timeout_secs, param_dict, arg)
+
+    return res_dicts
+
+
+def issue_xcvr_cmd_ports(cmd_name, rsp_name, exp_rsp, cmd_table_name, cmd_arg_table_name, rsp_table_name, port_list, cmd_timeout_secs, param_dict=None, arg=None):
+    """
+    Same as update_and_get_response_for_xcvr_cmd_ports, but also return the
+    list of the ports which did not answer before their deadline.
+    """
+
+    res_dicts = {}
+    timed_out_ports = []
     state_db, appl_db = {}, {}
     firmware_rsp_tbl, firmware_rsp_tbl_keys = {}, {}
     firmware_rsp_sub_tbl = {}
     firmware_cmd_tbl = {}
     firmware_cmd_arg_tbl = {}
 
-    CMD_TIMEOUT_SECS = cmd_timeout_secs
-
-    time_start = time.time()
-
     sel = swsscommon.Select()
     namespaces = multi_asic.get_front_end_namespaces()
     for namespace in namespaces:
@@ -246,53 +278,58 @@ def update_and_get_response_for_xcvr_cmd(cmd_name, rsp_name, exp_rsp, cmd_table_
             firmware_rsp_tbl[asic_id]._del(key)
         sel.addSelectable(firmware_rsp_sub_tbl[asic_id])
 
-    rc = CONFIG_FAIL
-    res_dict[0] = CONFIG_FAIL
-    res_dict[1] = 'unknown'
-
-    logical_port_list = platform_sfputil_helper.get_logical_list()
-    if port not in logical_port_list:
-        click.echo("ERR: This is not a valid port, valid ports ({})".format(", ".join(logical_port_list)))
-        res_dict[0] = rc
-        return res_dict
-
-    asic_index = None
-    if platform_sfputil is not None:
-        asic_index = platform_sfputil_helper.get_asic_id_for_logical_port(port)
-    if asic_index is None:
-        # TODO this import is only for unit test purposes, and should be removed once sonic_platform_base
-        # is fully mocked
-        import sonic_platform_base.sonic_sfp.sfputilhelper
-        asic_index = sonic_platform_base.sonic_sfp.sfputilhelper.SfpUtilHelper().get_asic_id_for_logical_port(port)
-        if asic_index is None:
-            click.echo("Got invalid asic index for port {}, cant perform firmware cmd".format(port))
-            res_dict[0] = rc
-            return res_dict
-
     if arg is None:
         cmd_arg = "null"
     else:
         cmd_arg = str(arg)
 
-    if param_dict is not None:
-        for key, value in param_dict.items():
-            fvs = swsscommon.FieldValuePairs([(str(key), str(value))])
-            firmware_cmd_arg_tbl[asic_index].set(port, fvs)
+    logical_port_list = platform_sfputil_helper.get_logical_list()
 
-    fvs = swsscommon.FieldValuePairs([(cmd_name, cmd_arg)])
-    firmware_cmd_tbl[asic_index].set(port, fvs)
+    # port -> time after which the port is given up
+    deadlines = {}
 
-    # Listen indefinitely for changes to the HW_MUX_CABLE_TABLE in the Application DB's
-    while True:
-        # Use timeout to prevent ignoring the signals we want to handle
-        # in signal_handler() (e.g. SIGTERM for graceful shutdown)
+    for port in port_list:
+        res_dicts[port] = {0: CONFIG_FAIL, 1: 'unknown'}
 
-        (state, selectableObj) = sel.select(SELECT_TIMEOUT)
+        if port not in logical_port_list:
+            click.echo("ERR: This is not a valid port, valid ports ({})".format(", ".join(logical_port_list)))
+            continue
+
+        asic_index = None
+        if platform_sfputil is not None:
+            asic_index = platform_sfputil_helper.get_asic_id_for_logical_port(port)
+        if asic_index is None:
+            # TODO this import is only for unit test purposes, and should be removed once sonic_platform_base
+            # is fully mocked
+            import sonic_platform_base.sonic_sfp.sfputilhelper
+            asic_index = sonic_platform_base.sonic_sfp.sfputilhelper.SfpUtilHelper().get_asic_id_for_logical_port(port)
+            if asic_index is None:
+                click.echo("Got invalid asic index for port {}, cant perform firmware cmd".format(port))
+                continue
+
+        if param_dict is not None:
+            for key, value in param_dict.items():
+                fvs = swsscommon.FieldValuePairs([(str(key), str(value))])
+                firmware_cmd_arg_tbl[asic_index].set(port, fvs)
+
+        fvs = swsscommon.FieldValuePairs([(cmd_name, cmd_arg)])
+        firmware_cmd_tbl[asic_index].set(port, fvs)
+        deadlines[port] = time.time() + cmd_timeout_secs
 
+    # Listen for changes to the response tables until every port answered or timed out
+    while deadlines:
         time_now = time.time()
-        time_diff = time_now - time_start
-        if time_diff >= CMD_TIMEOUT_SECS:
-            return res_dict
+        for port in [port for port, deadline in deadlines.items() if deadline <= time_now]:
+            del deadlines[port]
+            timed_out_ports.append(port)
+        if not deadlines:
+            break
+
+        # Use timeout to prevent ignoring the signals we want to handle
+        # in signal_handler() (e.g. SIGTERM for graceful shutdown), and
+        # to not wait past the earliest per port deadline
+        select_timeout = min(SELECT_TIMEOUT, max(1, int((min(deadlines.values()) - time_now) * 1000)))
+        (state, selectableObj) = sel.select(select_timeout)
 
         if state == swsscommon.Select.TIMEOUT:
             # Do not flood log when select times out
@@ -310,43 +347,65 @@ def update_and_get_response_for_xcvr_cmd(cmd_name, rsp_name, exp_rsp, cmd_table_
 
         (port_m, op_m, fvp_m) = firmware_rsp_sub_tbl[asic_index].pop()
 
-        if not port_m:
-            click.echo("Did not receive a port response {}".format(port))
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
-            break
-
-        if port_m != port:
-
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
+        if port_m not in deadlines:
+            # Not a response to one of the pending commands
             continue
 
+        del deadlines[port_m]
+
         if fvp_m:
 
             fvp_dict = dict(fvp_m)
             if rsp_name in fvp_dict:
                 # check if xcvrd got a probe command
-                result = fvp_dict[rsp_name]
+                res_dicts[port_m][1] = fvp_dict[rsp_name]
+                res_dicts[port_m][0] = 0
 
-                res_dict[1] = result
-                res_dict[0] = 0
-            else:
-                res_dict[1] = 'unknown'
-                res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
-            break
-        else:
-            res_dict[1] = 'unknown'
-            res_dict[0] = CONFIG_FAIL
-            firmware_rsp_tbl[asic_index]._del(port)
-            break
+        firmware_rsp_tbl[asic_index]._del(port_m)
 
     delete_all_keys_in_db_table("STATE_DB", rsp_table_name)
 
-    return res_dict
+    return res_dicts, timed_out_ports
+
+
+def get_mux_cable_ports():
+    """
+    Get the logical ports which are y-cable ports, keeping only the first
+    logical port of each physical port.
+    """
+
+    ports = []
+    logical_port_list = platform_sfputil_helper.get_logical_list()
+
+    for port in logical_port_list:
+
+        if platform_sfputil is not None:
+            physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
+
+        if not isinstance(physical_port_list, list):
+            continue
+        if len(physical_port_list) != 1:
+            continue
+
+        if not check_port_in_mux_cable_table(port):
+            continue
+
+        physical_port = physical_port_list[0]
+        logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
+
+        logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
+
+        """ This check is required for checking whether or not this logical port is the one which is
+        actually mapped to physical port and by convention it is always the first port.
+        TODO: this should be removed with more logic to check which logical port maps to actual physical port
+        being used"""
+
+        if port != logical_port_list_per_port[0]:
+            continue
+
+        ports.append(port)
+
+    return ports
 
 
 # 'muxcable' command ("show muxcable")
@@ -1162,26 +1221,30 @@ def cableinfo(db, port):
 
 def get_hwmode_mux_direction_port(db, port):
 
-
-    delete_all_keys_in_db_table("APPL_DB", "XCVRD_SHOW_HWMODE_DIR_CMD")
-    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RSP")
-    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RES")
-
     res_dict = {}
     res_dict[0] = CONFIG_FAIL
     res_dict[1] = "unknown"
     res_dict[2] = "unknown"
-    result = {}
     if port is not None:
+        res_dict = get_hwmode_mux_direction_ports(db, [port])[port]
+
+    return res_dict
 
-        res_dict = update_and_get_response_for_xcvr_cmd(
-            "state", "state", "True", "XCVRD_SHOW_HWMODE_DIR_CMD", "XCVRD_SHOW_HWMODE_DIR_RES", "XCVRD_SHOW_HWMODE_DIR_RSP", port, HWMODE_MUXDIRECTION_TIMEOUT, None, "probe")
 
-        result = get_result(port, res_dict, "muxdirection" , result, "XCVRD_SHOW_HWMODE_DIR_RES")
+def get_hwmode_mux_direction_ports(db, port_list):
 
+    delete_all_keys_in_db_table("APPL_DB", "XCVRD_SHOW_HWMODE_DIR_CMD")
+    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RSP")
+    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_HWMODE_DIR_RES")
+
+    res_dicts = update_and_get_response_for_xcvr_cmd_ports(
+        "state", "state", "True", "XCVRD_SHOW_HWMODE_DIR_CMD", "XCVRD_SHOW_HWMODE_DIR_RES", "XCVRD_SHOW_HWMODE_DIR_RSP", port_list, HWMODE_MUXDIRECTION_TIMEOUT, None, "probe")
+
+    for port, res_dict in res_dicts.items():
+        result = get_result(port, res_dict, "muxdirection" , {}, "XCVRD_SHOW_HWMODE_DIR_RES")
         res_dict[2] = result.get("presence","unknown")
 
-    return res_dict
+    return res_dicts
 
 
 @muxcable.group(cls=clicommon.AbbreviationGroup)
@@ -1230,40 +1293,17 @@ def muxdirection(db, port):
 
     else:
 
-        logical_port_list = platform_sfputil_helper.get_logical_list()
-
         rc_exit = True
         body = []
 
-        for port in logical_port_list:
-
-            if platform_sfputil is not None:
-                physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
-
-            if not isinstance(physical_port_list, list):
-                continue
-            if len(physical_port_list) != 1:
-                continue
-
-            if not check_port_in_mux_cable_table(port):
-                continue
-
-            physical_port = physical_port_list[0]
-            logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
-
-            logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
+        port_list = get_mux_cable_ports()
+        res_dicts = get_hwmode_mux_direction_ports(db, port_list)
 
-            """ This check is required for checking whether or not this logical port is the one which is
-            actually mapped to physical port and by convention it is always the first port.
-            TODO: this should be removed with more logic to check which logical port maps to actual physical port
-            being used"""
-
-            if port != logical_port_list_per_port[0]:
-                continue
+        for port in port_list:
 
             temp_list = []
 
-            res_dict = get_hwmode_mux_direction_port(db, port)
+            res_dict = res_dicts[port]
 
             port = platform_sfputil_helper.get_interface_alias(port, db)
             temp_list.append(port)
@@ -1325,43 +1365,17 @@ def switchmode(db, port):
 
     else:
 
-        logical_port_list = platform_sfputil_helper.get_logical_list()
-
         rc_exit = True
         body = []
 
-        for port in logical_port_list:
-
-            if platform_sfputil is not None:
-                physical_port_list = platform_sfputil_helper.logical_port_name_to_physical_port_list(port)
-
-            if not isinstance(physical_port_list, list):
-                continue
-            if len(physical_port_list) != 1:
-                continue
-
-            if not check_port_in_mux_cable_table(port):
-                continue
-
-            physical_port = physical_port_list[0]
-            logical_port_list_for_physical_port = platform_sfputil_helper.get_physical_to_logical()
-
-            logical_port_list_per_port = logical_port_list_for_physical_port.get(physical_port, None)
+        port_list = get_mux_cable_ports()
+        res_dicts = update_and_get_response_for_xcvr_cmd_ports(
+            "state", "state", "True", "XCVRD_SHOW_HWMODE_SWMODE_CMD", None, "XCVRD_SHOW_HWMODE_SWMODE_RSP", port_list, 1, None, "probe")
 
-            """ This check is required for checking whether or not this logical port is the one which is
-            actually mapped to physical port and by convention it is always the first port.
-            TODO: this should be removed with more logic to check which logical port maps to actual physical port
-            being used"""
-
-            if port != logical_port_list_per_port[0]:
-                continue
+        for port in port_list:
 
             temp_list = []
-            res_dict = {}
-            res_dict[0] = CONFIG_FAIL
-            res_dict[1] = "unknown"
-            res_dict = update_and_get_response_for_xcvr_cmd(
-                "state", "state", "True", "XCVRD_SHOW_HWMODE_SWMODE_CMD", None, "XCVRD_SHOW_HWMODE_SWMODE_RSP", port, 1, None, "probe")
+            res_dict = res_dicts[port]
             port = platform_sfputil_helper.get_interface_alias(port, db)
             temp_list.append(port)
             temp_list.append(res_dict[1])
@@ -1514,12 +1528,52 @@ def firmware():
     pass
 
 
+def get_firmware_version_all_ports(db, active):
+
+    delete_all_keys_in_db_table("APPL_DB", "XCVRD_DOWN_FW_CMD")
+    delete_all_keys_in_db_table("STATE_DB", "XCVRD_DOWN_FW_RSP")
+    delete_all_keys_in_db_table("APPL_DB", "XCVRD_SHOW_FW_CMD")
+    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_FW_RSP")
+    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_FW_RES")
+
+    port_list = get_mux_cable_ports()
+
+    # The firmware version command is sent to all the ports at once
+    res_dicts = update_and_get_response_for_xcvr_cmd_ports(
+        "firmware_version", "status", "True", "XCVRD_SHOW_FW_CMD", None, "XCVRD_SHOW_FW_RSP", port_list, 20, None, "probe")
+
+    port_info_dict = OrderedDict()
+    for port in port_list:
+        mux_info_dict = OrderedDict()
+        for key in ["version_nic_active", "version_nic_inactive", "version_nic_next",
+                    "version_peer_active", "version_peer_inactive", "version_peer_next",
+                    "version_self_active", "version_self_inactive", "version_self_next"]:
+            mux_info_dict[key] = "N/A"
+
+        if res_dicts[port][1] == "True":
+            mux_info_dict = get_response_for_version(port, mux_info_dict)
+
+        if active is True:
+            mux_info_dict = {key: value for key, value in mux_info_dict.items() if key.endswith("_active")}
+
+        port_info_dict[platform_sfputil_helper.get_interface_alias(port, db)] = mux_info_dict
+
+    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_FW_RSP")
+    delete_all_keys_in_db_table("STATE_DB", "XCVRD_SHOW_FW_RES")
+
+    click.echo("{}".format(json.dumps(port_info_dict, indent=4)))
+
+
 @firmware.command()
 @click.argument('port', metavar='<port_name>', required=True, default=None)
 @click.option('--active', 'active', required=False, is_flag=True, type=click.BOOL, help="display the firmware version of only active bank within MCU's")
 @clicommon.pass_db
 def version(db, port, active):
-    """Show muxcable firmware version"""
+    """Show muxcable firmware version, <port_name> may be 'all'"""
+
+    if port == "all":
+        get_firmware_version_all_ports(db, active)
+        return
 
     port = platform_sfputil_helper.get_interface_name(port, db)
     delete_all_keys_in_db_table("APPL_DB", "XCVRD_DOWN_FW_CMD")
@@ -10,15 +10,9 @@ import os
 import click
 import tabulate
 import natsort
-import json
 import utilities_common.cli as clicommon
 from swsscommon.swsscommon import SonicV2Connector
-
-COUNTER_PACKETS_ATTR = "SAI_ACL_COUNTER_ATTR_PACKETS"
-COUNTER_BYTES_ATTR = "SAI_ACL_COUNTER_ATTR_BYTES"
-
-COUNTERS = "COUNTERS"
-ACL_COUNTER_RULE_MAP = "ACL_COUNTER_RULE_MAP"
+from utilities_common.acl_counters import AclCounterReader, get_counter_delta, load_snapshot
 
 PBH_COUNTERS_CACHE_FILENAME = "pbh-counters"
 
@@ -383,8 +377,8 @@ def PBH_STATISTICS(db):
             row = [
                 key[0],
                 key[1],
-                get_counter_value(pbh_counters, saved_pbh_counters, key, COUNTER_PACKETS_ATTR),
-                get_counter_value(pbh_counters, saved_pbh_counters, key, COUNTER_BYTES_ATTR),
+                get_counter_value(pbh_counters, saved_pbh_counters, key, 'packets'),
+                get_counter_value(pbh_counters, saved_pbh_counters, key, 'bytes'),
             ]
             body.append(row)
 
@@ -392,36 +386,25 @@ def PBH_STATISTICS(db):
 
 
 def get_counter_value(pbh_counters, saved_pbh_counters, key, type):
-    if not pbh_counters[key]:
+    if key not in pbh_counters:
         return '0'
 
-    if key in saved_pbh_counters:
-        new_value = int(pbh_counters[key][type]) - int(saved_pbh_counters[key][type])
-        if new_value >= 0:
-            return str(new_value)
-
-    return str(pbh_counters[key][type])
+    return str(get_counter_delta(pbh_counters, saved_pbh_counters, key, type))
 
 
 def deserialize_pbh_counters():
     """ Helper that performs PBH counters deserialization.
 
-        in = [
-            {
-                "key": ["pbh_table1", "pbh_rule1"],
-                "value": {"SAI_ACL_COUNTER_ATTR_BYTES": "0", "SAI_ACL_COUNTER_ATTR_PACKETS": "0"}
-            },
+        in = {
+            "pbh_table1|pbh_rule1": [0, 0],
             ...
-            {
-                "key": ["pbh_tableN", "pbh_ruleN"],
-                "value": {"SAI_ACL_COUNTER_ATTR_BYTES": "0", "SAI_ACL_COUNTER_ATTR_PACKETS": "0"}
-            }
-        ]
+            "pbh_tableN|pbh_ruleN": [0, 0]
+        }
 
         out = {
-            ('pbh_table1', 'pbh_rule1'): {'SAI_ACL_COUNTER_ATTR_BYTES': '0', 'SAI_ACL_COUNTER_ATTR_PACKETS': '0'},
+            ('pbh_table1', 'pbh_rule1'): AclCounter(packets=0, bytes=0),
             ...
-            ('pbh_tableN', 'pbh_ruleN'): {'SAI_ACL_COUNTER_ATTR_BYTES': '0', 'SAI_ACL_COUNTER_ATTR_PACKETS': '0'}
+            ('pbh_tableN', 'pbh_ruleN'): AclCounter(packets=0, bytes=0)
         }
 
         Returns:
@@ -431,50 +414,29 @@ def deserialize_pbh_counters():
     cache = clicommon.UserCache('pbh')
     counters_cache_file = os.path.join(cache.get_directory(), PBH_COUNTERS_CACHE_FILENAME)
 
-    def remap_keys(obj):
-        res = {}
-        for e in obj:
-            res[e['key'][0], e['key'][1]] = e['value']
-        return res
-
     if os.path.isfile(counters_cache_file):
         try:
-            with open(counters_cache_file, 'r') as f:
-                return remap_keys(json.load(f))
+            return load_snapshot(counters_cache_file)
         except Exception as err:
             pass
 
     return {}
 
 
-def read_acl_rule_counter_map(db_connector):
-    if db_connector.exists(db_connector.COUNTERS_DB, ACL_COUNTER_RULE_MAP):
-        return db_connector.get_all(db_connector.COUNTERS_DB, ACL_COUNTER_RULE_MAP)
-    return {}
+def read_pbh_counters(pbh_rules) -> dict:
+    """ Helper that reads the counters of PBH rules.
 
+        Args:
+            pbh_rules: PBH rules keyed by (table, rule).
 
-def read_pbh_counters(pbh_rules) -> dict:
-    pbh_counters = {}
+        Returns:
+            obj: {(table, rule): AclCounter} for the rules which have counters.
+    """
 
     db_connector = SonicV2Connector(use_unix_socket_path=False)
     db_connector.connect(db_connector.COUNTERS_DB)
-    counters_db_separator = db_connector.get_db_separator(db_connector.COUNTERS_DB)
-    rule_to_counter_map = read_acl_rule_counter_map(db_connector)
-
-    for table, rule in natsort.natsorted(pbh_rules):
-        pbh_counters[table, rule] = {}
-        rule_identifier = table + counters_db_separator + rule
-        if not rule_to_counter_map:
-            continue
-        counter_oid = rule_to_counter_map.get(rule_identifier)
-        if not counter_oid:
-            continue
-        counters_db_key = COUNTERS + counters_db_separator + counter_oid
-        counter_props = db_connector.get_all(db_connector.COUNTERS_DB, counters_db_key)
-        if counter_props:
-            pbh_counters[table, rule] = counter_props
-
-    return pbh_counters
+
+    return AclCounterReader(db_connector).read(pbh_rules)
 
 
 def inject_symmetric_field(obj_list):
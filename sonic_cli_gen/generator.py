@@ -4,7 +4,7 @@ import os
 import pkgutil
 import jinja2
 
-from sonic_cli_gen.yang_parser import YangParser
+from sonic_cli_gen.yang_parser import YangIndex, YangParser, get_yang_dir_signature
 
 templates_path_switch = '/usr/share/sonic/templates/sonic-cli-gen/'
 
@@ -22,24 +22,54 @@ class CliGenerator:
         """ Initialize CliGenerator. """
 
         self.logger = logger
+        self.yang_index = None
+
+
+    def get_yang_index(self):
+        """ Get the index of YANG models. YANG models are loaded once
+            for all generated plugins, and loaded again only if
+            YANG models were installed or removed since.
+        """
+
+        if self.yang_index is None or self.yang_index.signature != get_yang_dir_signature():
+            self.yang_index = YangIndex.load()
+
+        return self.yang_index
+
+
+    def generate_cli_plugins(
+        self,
+        cli_group,
+        plugin_names,
+        templates_path='/usr/share/sonic/templates/sonic-cli-gen/'
+    ):
+        """ Generate click CLI plugins for several YANG models,
+            with YANG models loaded once.
+        """
+
+        for plugin_name in plugin_names:
+            self.generate_cli_plugin(cli_group, plugin_name, templates_path=templates_path)
 
 
     def generate_cli_plugin(
         self,
         cli_group,
         plugin_name,
-        config_db_path='configDB',
+        config_db_path=None,
         templates_path='/usr/share/sonic/templates/sonic-cli-gen/'
     ):
         """ Generate click CLI plugin and put it to:
             /usr/local/lib/<python>/dist-packages/<CLI group>/plugins/auto/
+
+            Only YANG models are loaded, unless config_db_path is passed.
         """
 
         parser = YangParser(
             yang_model_name=plugin_name,
             config_db_path=config_db_path,
             allow_tbl_without_yang=True,
-            debug=False
+            debug=False,
+            yang_index=None if config_db_path else self.get_yang_index()
         )
         # yang_dict will be used as an input for templates located in
         # /usr/share/sonic/templates/sonic-cli-gen/
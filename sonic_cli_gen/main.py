@@ -28,12 +28,12 @@ def cli(ctx):
 
 @cli.command()
 @click.argument('cli_group', type=click.Choice(['config', 'show']))
-@click.argument('yang_model_name', type=click.STRING)
+@click.argument('yang_model_name', type=click.STRING, nargs=-1, required=True)
 @click.pass_context
 def generate(ctx, cli_group, yang_model_name):
-    """ Generate click CLI plugin. """
+    """ Generate click CLI plugin for one or more YANG models. """
 
-    ctx.obj['gen'].generate_cli_plugin(cli_group, yang_model_name)
+    ctx.obj['gen'].generate_cli_plugins(cli_group, yang_model_name)
 
 
 @cli.command()
@@ -1,18 +1,118 @@
 #!/usr/bin/env python
 
+import glob
+import os
+import sonic_yang
 from collections import OrderedDict
-from config.config_mgmt import ConfigMgmt
+from config.config_mgmt import ConfigMgmt, YANG_DIR
 from typing import List, Dict
 
 yang_guidelines_link = 'https://github.com/Azure/SONiC/blob/master/doc/mgmt/SONiC_YANG_Model_Guidelines.md'
 
 
+def get_yang_dir_signature(yang_dir=YANG_DIR) -> tuple:
+    """ Get the signature of the YANG models directory,
+        it changes when a YANG model is added, removed or modified
+
+        Args:
+            yang_dir: YANG models directory
+        Returns:
+            tuple of YANG model file names, sizes and modification times
+    """
+
+    signature = list()
+    for path in sorted(glob.glob(os.path.join(yang_dir, '*.yang'))):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        signature.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+
+    return tuple(signature)
+
+
+class YangIndex:
+    """ Index of the parsed YANG models
+
+        Attributes:
+        modules: 'module' entities by YANG model name
+        groupings: 'grouping' entities by YANG model name
+        signature: signature of the YANG models directory
+            the YANG models were loaded from, if known
+    """
+
+    def __init__(self, y_json, signature=None):
+        self.modules = dict()
+        self.groupings = dict()
+        self.signature = signature
+
+        for yang_model in y_json:
+            y_module = yang_model.get('module')
+            self.modules[y_module.get('@name')] = y_module
+
+    @classmethod
+    def load(cls, yang_dir=YANG_DIR, debug=False) -> 'YangIndex':
+        """ Load the YANG models only, without reading and
+            loading config data as ConfigMgmt does
+
+            Args:
+                yang_dir: YANG models directory
+                debug: verbose mode
+            Returns:
+                YangIndex of the YANG models
+        """
+
+        signature = get_yang_dir_signature(yang_dir)
+
+        try:
+            sy = sonic_yang.SonicYang(yang_dir, debug=debug)
+            sy.loadYangModel()
+        except Exception as e:
+            raise Exception("Failed to load the YANG models {}".format(str(e)))
+
+        return cls(sy.yJson, signature)
+
+    def get_module(self, yang_model_name) -> OrderedDict:
+        """ Get the 'module' entity of YANG model
+
+            Args:
+                yang_model_name: YANG model name
+            Returns:
+                reference to 'module' or None if YANG model is NOT exist
+        """
+
+        return self.modules.get(yang_model_name)
+
+    def get_groupings(self, yang_model_name) -> list:
+        """ Get the 'grouping' entities of YANG model
+
+            Args:
+                yang_model_name: YANG model name
+            Returns:
+                list of 'grouping' entities
+        """
+
+        if yang_model_name not in self.groupings:
+            y_module = self.get_module(yang_model_name) or {}
+            grouping = y_module.get('grouping')
+            if grouping is None:
+                self.groupings[yang_model_name] = list()
+            elif isinstance(grouping, list):
+                self.groupings[yang_model_name] = grouping
+            else:
+                self.groupings[yang_model_name] = [grouping]
+
+        return self.groupings[yang_model_name]
+
+
 class YangParser:
     """ YANG model parser
 
         Attributes:
         yang_model_name: Name of the YANG model file
-        conf_mgmt: Instance of Config Mgmt class to
+        conf_mgmt: Instance of Config Mgmt class, if the parser
+            was asked to load config data along with YANG models
+        yang_index: Instance of YangIndex class to
             help parse YANG models
         y_module: Reference to 'module' entity
             from YANG model file
@@ -58,16 +158,33 @@ class YangParser:
 
     def __init__(self,
                  yang_model_name,
-                 config_db_path,
-                 allow_tbl_without_yang,
-                 debug):
+                 config_db_path=None,
+                 allow_tbl_without_yang=True,
+                 debug=False,
+                 yang_index=None):
+        """ Initialize YangParser.
+
+            YANG models are taken from yang_index if passed, so that
+            several YANG models can be parsed with models loaded once.
+            Otherwise, only YANG models are loaded if config_db_path
+            is None, config data is not needed to parse them.
+        """
+
         self.yang_model_name = yang_model_name
         self.conf_mgmt = None
+        self.yang_index = yang_index
         self.y_module = None
         self.y_top_level_container = None
         self.y_table_containers = None
         self.yang_2_dict = dict()
 
+        if self.yang_index is not None:
+            return
+
+        if config_db_path is None:
+            self.yang_index = YangIndex.load(debug=debug)
+            return
+
         try:
             self.conf_mgmt = ConfigMgmt(config_db_path,
                                         debug,
@@ -75,6 +192,8 @@ class YangParser:
         except Exception as e:
             raise Exception("Failed to load the {} class".format(str(e)))
 
+        self.yang_index = YangIndex(self.conf_mgmt.sy.yJson)
+
     def _init_yang_module_and_containers(self):
         """ Initialize inner class variables:
             self.y_module
@@ -105,17 +224,15 @@ class YangParser:
         self.y_table_containers = self.y_top_level_container.get('container')
 
     def _find_yang_model_in_yjson_obj(self) -> OrderedDict:
-        """ Find provided YANG model inside the yJson object,
-            the yJson object contain all yang-models
+        """ Find provided YANG model inside the YANG index,
+            the YANG index contain all yang-models
             parsed from directory - /usr/local/yang-models
 
             Returns:
                 reference to yang_model_name
         """
 
-        for yang_model in self.conf_mgmt.sy.yJson:
-            if yang_model.get('module').get('@name') == self.yang_model_name:
-                return yang_model.get('module')
+        return self.yang_index.get_module(self.yang_model_name)
 
     def parse_yang_model(self) -> dict:
         """ Parse provided YANG model and save
@@ -132,7 +249,7 @@ class YangParser:
         # has after the 'top level' container
         # 'table' container goes after the 'top level' container
         self.yang_2_dict['tables'] += list_handler(self.y_table_containers,
-                lambda e: on_table_container(self.y_module, e, self.conf_mgmt))
+                lambda e: on_table_container(self.y_module, e, self.yang_index))
 
         return self.yang_2_dict
 
@@ -152,15 +269,15 @@ def list_handler(y_entity, callback) -> List[Dict]:
 
 def on_table_container(y_module: OrderedDict,
                        tbl_container: OrderedDict,
-                       conf_mgmt: ConfigMgmt) -> dict:
+                       yang_index: YangIndex) -> dict:
     """ Parse 'table' container,
         'table' container goes after 'top level' container
 
         Args:
             y_module: reference to 'module'
             tbl_container: reference to 'table' container
-            conf_mgmt: reference to ConfigMgmt class instance,
-                       it have yJson object which contain all parsed YANG models
+            yang_index: reference to YangIndex class instance,
+                       it indexes all parsed YANG models
         Returns:
             element for self.yang_2_dict['tables']
     """
@@ -177,13 +294,13 @@ def on_table_container(y_module: OrderedDict,
         # 'object' container have 2 types - list (like sonic-flex_counter.yang)
         # and NOT list (like sonic-device_metadata.yang)
         y2d_elem['static-objects'] += list_handler(tbl_container.get('container'),
-                lambda e: on_object_entity(y_module, e, conf_mgmt, is_list=False))
+                lambda e: on_object_entity(y_module, e, yang_index, is_list=False))
     else:
         y2d_elem['dynamic-objects'] = list()
 
         # 'container' can have more than 1 'list' entity
         y2d_elem['dynamic-objects'] += list_handler(tbl_container.get('list'),
-                lambda e: on_object_entity(y_module, e, conf_mgmt, is_list=True))
+                lambda e: on_object_entity(y_module, e, yang_index, is_list=True))
 
         # move 'keys' elements from 'attrs' to 'keys'
         change_dyn_obj_struct(y2d_elem['dynamic-objects'])
@@ -193,7 +310,7 @@ def on_table_container(y_module: OrderedDict,
 
 def on_object_entity(y_module: OrderedDict,
                      y_entity: OrderedDict,
-                     conf_mgmt: ConfigMgmt,
+                     yang_index: YangIndex,
                      is_list: bool) -> dict:
     """ Parse a 'object' entity, it could be a 'container' or a 'list'
         'Object' entity represent OBJECT in Config DB schema:
@@ -208,8 +325,8 @@ def on_object_entity(y_module: OrderedDict,
         Args:
             y_module: reference to 'module'
             y_entity: reference to 'object' entity
-            conf_mgmt: reference to ConfigMgmt class instance,
-                       it have yJson object which contain all parsed YANG models
+            yang_index: reference to YangIndex class instance,
+                       it indexes all parsed YANG models
             is_list: boolean flag to determine if a 'list' was passed
         Returns:
             element for y2d_elem['static-objects'] OR y2d_elem['dynamic-objects']
@@ -231,8 +348,8 @@ def on_object_entity(y_module: OrderedDict,
     # grouping_name is empty because 'grouping' is not used so far
     attrs_list.extend(get_leafs(y_entity, grouping_name=''))
     attrs_list.extend(get_leaf_lists(y_entity, grouping_name=''))
-    attrs_list.extend(get_choices(y_module, y_entity, conf_mgmt, grouping_name=''))
-    attrs_list.extend(get_uses(y_module, y_entity, conf_mgmt))
+    attrs_list.extend(get_choices(y_module, y_entity, yang_index, grouping_name=''))
+    attrs_list.extend(get_uses(y_module, y_entity, yang_index))
 
     obj_elem['attrs'] = attrs_list
 
@@ -241,23 +358,23 @@ def on_object_entity(y_module: OrderedDict,
 
 def on_uses(y_module: OrderedDict,
             y_uses,
-            conf_mgmt: ConfigMgmt) -> list:
+            yang_index: YangIndex) -> list:
     """ Parse a YANG 'uses' entities
         'uses' referring to 'grouping' YANG entity
 
         Args:
             y_module: reference to 'module'
             y_uses: reference to 'uses'
-            conf_mgmt: reference to ConfigMgmt class instance,
-                       it have yJson object which contain all parsed YANG model
+            yang_index: reference to YangIndex class instance,
+                       it indexes all parsed YANG models
         Returns:
             element for obj_elem['attrs'], 'attrs' contain a parsed 'leafs'
     """
 
     ret_attrs = list()
-    y_grouping = get_all_grouping(y_module, y_uses, conf_mgmt)
+    y_grouping = get_all_grouping(y_module, y_uses, yang_index)
     # trim prefixes in order to the next checks
-    trim_uses_prefixes(y_uses)
+    y_uses = trim_uses_prefixes(y_uses)
 
     # TODO: 'refine' support
     for group in y_grouping:
@@ -266,27 +383,27 @@ def on_uses(y_module: OrderedDict,
                 if group.get('@name') == use.get('@name'):
                     ret_attrs.extend(get_leafs(group, group.get('@name')))
                     ret_attrs.extend(get_leaf_lists(group, group.get('@name')))
-                    ret_attrs.extend(get_choices(y_module, group, conf_mgmt, group.get('@name')))
+                    ret_attrs.extend(get_choices(y_module, group, yang_index, group.get('@name')))
         else:
             if group.get('@name') == y_uses.get('@name'):
                 ret_attrs.extend(get_leafs(group, group.get('@name')))
                 ret_attrs.extend(get_leaf_lists(group, group.get('@name')))
-                ret_attrs.extend(get_choices(y_module, group, conf_mgmt, group.get('@name')))
+                ret_attrs.extend(get_choices(y_module, group, yang_index, group.get('@name')))
 
     return ret_attrs
 
 
 def on_choices(y_module: OrderedDict,
                y_choices,
-               conf_mgmt: ConfigMgmt,
+               yang_index: YangIndex,
                grouping_name: str) -> list:
     """ Parse a YANG 'choice' entities
 
         Args:
             y_module: reference to 'module'
             y_choices: reference to 'choice' element
-            conf_mgmt: reference to ConfigMgmt class instance,
-                       it have yJson object which contain all parsed YANG model
+            yang_index: reference to YangIndex class instance,
+                       it indexes all parsed YANG models
             grouping_name: if YANG entity contain 'uses', this arg represent 'grouping' name
         Returns:
             element for obj_elem['attrs'], 'attrs' contain a parsed 'leafs'
@@ -299,18 +416,18 @@ def on_choices(y_module: OrderedDict,
     if isinstance(y_choices, list):
         for choice in y_choices:
             attrs = on_choice_cases(y_module, choice.get('case'),
-                                    conf_mgmt, grouping_name)
+                                    yang_index, grouping_name)
             ret_attrs.extend(attrs)
     else:
         ret_attrs = on_choice_cases(y_module, y_choices.get('case'),
-                                    conf_mgmt, grouping_name)
+                                    yang_index, grouping_name)
 
     return ret_attrs
 
 
 def on_choice_cases(y_module: OrderedDict,
                     y_cases,
-                    conf_mgmt: ConfigMgmt,
+                    yang_index: YangIndex,
                     grouping_name: str) -> list:
     """ Parse a single YANG 'case' entity from the 'choice' entity.
         The 'case' element can has inside - 'leaf', 'leaf-list', 'uses'
@@ -318,9 +435,8 @@ def on_choice_cases(y_module: OrderedDict,
         Args:
             y_module: reference to 'module'
             y_cases: reference to 'case'
-            conf_mgmt: reference to ConfigMgmt class instance,
-                it have yJson object which contain all
-                parsed YANG model
+            yang_index: reference to YangIndex class instance,
+                it indexes all parsed YANG models
             grouping_name: if YANG entity contain 'uses',
                 this argument represent 'grouping' name
         Returns:
@@ -334,11 +450,11 @@ def on_choice_cases(y_module: OrderedDict,
         for case in y_cases:
             ret_attrs.extend(get_leafs(case, grouping_name))
             ret_attrs.extend(get_leaf_lists(case, grouping_name))
-            ret_attrs.extend(get_uses(y_module, case, conf_mgmt))
+            ret_attrs.extend(get_uses(y_module, case, yang_index))
     else:
         ret_attrs.extend(get_leafs(y_cases, grouping_name))
         ret_attrs.extend(get_leaf_lists(y_cases, grouping_name))
-        ret_attrs.extend(get_uses(y_module, y_cases, conf_mgmt))
+        ret_attrs.extend(get_uses(y_module, y_cases, yang_index))
 
     return ret_attrs
 
@@ -462,7 +578,7 @@ def get_leaf_lists(y_entity: OrderedDict,
 
 def get_choices(y_module: OrderedDict,
                 y_entity: OrderedDict,
-                conf_mgmt: ConfigMgmt,
+                yang_index: YangIndex,
                 grouping_name: str) -> list:
     """ Check if the YANG entity have 'choice', if so call handler
 
@@ -470,8 +586,8 @@ def get_choices(y_module: OrderedDict,
             y_module: reference to 'module'
             y_entity: reference YANG 'container' or 'list'
                 or 'choice' or 'uses'
-            conf_mgmt: reference to ConfigMgmt class instance,
-                it have yJson object which contain all parsed YANG model
+            yang_index: reference to YangIndex class instance,
+                it indexes all parsed YANG models
             grouping_name: if YANG entity contain 'uses',
                 this argument represent 'grouping' name
         Returns:
@@ -479,44 +595,44 @@ def get_choices(y_module: OrderedDict,
     """
 
     if y_entity.get('choice') is not None:
-        return on_choices(y_module, y_entity.get('choice'), conf_mgmt, grouping_name)
+        return on_choices(y_module, y_entity.get('choice'), yang_index, grouping_name)
 
     return []
 
 
 def get_uses(y_module: OrderedDict,
              y_entity: OrderedDict,
-             conf_mgmt: ConfigMgmt) -> list:
+             yang_index: YangIndex) -> list:
     """ Check if the YANG entity have 'uses', if so call handler
 
         Args:
             y_module: reference to 'module'
             y_entity: reference YANG 'container' or 'list'
                 or 'choice' or 'uses'
-            conf_mgmt: reference to ConfigMgmt class instance,
-                it have yJson object which contain all parsed YANG model
+            yang_index: reference to YangIndex class instance,
+                it indexes all parsed YANG models
         Returns:
             list of parsed elements inside 'grouping'
                 that referenced by 'uses'
     """
 
     if y_entity.get('uses') is not None:
-        return on_uses(y_module, y_entity.get('uses'), conf_mgmt)
+        return on_uses(y_module, y_entity.get('uses'), yang_index)
 
     return []
 
 
 def get_all_grouping(y_module: OrderedDict,
                      y_uses: OrderedDict,
-                     conf_mgmt: ConfigMgmt) -> list:
+                     yang_index: YangIndex) -> list:
     """ Get all the 'grouping' entities that was referenced
         by 'uses' in current YANG model
 
         Args:
             y_module: reference to 'module'
             y_entity: reference to 'uses'
-            conf_mgmt: reference to ConfigMgmt class instance,
-                it have yJson object which contain all parsed YANG model
+            yang_index: reference to YangIndex class instance,
+                it indexes all parsed YANG models
         Returns:
             list of 'grouping' elements
     """
@@ -541,38 +657,28 @@ def get_all_grouping(y_module: OrderedDict,
             if isinstance(y_import, list):
                 for _import in y_import:
                     if _import.get('prefix').get('@value') == prefix:
-                        ret_grouping.extend(get_grouping_from_another_yang_model(_import.get('@module'), conf_mgmt))
+                        ret_grouping.extend(get_grouping_from_another_yang_model(_import.get('@module'), yang_index))
             else:
                 if y_import.get('prefix').get('@value') == prefix:
-                    ret_grouping.extend(get_grouping_from_another_yang_model(y_import.get('@module'), conf_mgmt))
+                    ret_grouping.extend(get_grouping_from_another_yang_model(y_import.get('@module'), yang_index))
 
     return ret_grouping
 
 
 def get_grouping_from_another_yang_model(yang_model_name: str,
-                                         conf_mgmt) -> list:
+                                         yang_index) -> list:
     """ Get the YANG 'grouping' entity
 
         Args:
             yang_model_name - YANG model to search
-            conf_mgmt - reference to ConfigMgmt class instance,
-                it have yJson object which contain all parsed YANG models
+            yang_index - reference to YangIndex class instance,
+                it indexes all parsed YANG models
 
         Returns:
             list of 'grouping' entities
     """
 
-    ret_grouping = list()
-
-    for yang_model in conf_mgmt.sy.yJson:
-        if (yang_model.get('module').get('@name') == yang_model_name):
-            grouping = yang_model.get('module').get('grouping')
-            if isinstance(grouping, list):
-                ret_grouping.extend(grouping)
-            else:
-                ret_grouping.append(grouping)
-
-    return ret_grouping
+    return yang_index.get_groupings(yang_model_name)
 
 
 def get_import_prefixes(y_uses: OrderedDict) -> list:
@@ -621,16 +727,19 @@ def trim_uses_prefixes(y_uses) -> list:
             list of 'uses' without 'prefixes'
     """
 
-    prefixes = get_import_prefixes(y_uses)
+    def trim_prefix(use):
+        # the parsed YANG models can be shared by several parsers,
+        # so a trimmed copy of 'uses' is returned
+        if ':' not in use.get('@name'):
+            return use
+        use = OrderedDict(use)
+        use['@name'] = use.get('@name').split(':')[1]
+        return use
 
-    for prefix in prefixes:
-        if isinstance(y_uses, list):
-            for use in y_uses:
-                if prefix in use.get('@name'):
-                    use['@name'] = use.get('@name').split(':')[1]
-        else:
-            if prefix in y_uses.get('@name'):
-                y_uses['@name'] = y_uses.get('@name').split(':')[1]
+    if isinstance(y_uses, list):
+        return [trim_prefix(use) for use in y_uses]
+    else:
+        return trim_prefix(y_uses)
 
 
 def get_list_keys(y_list: OrderedDict) -> list:
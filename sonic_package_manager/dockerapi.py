@@ -8,8 +8,11 @@ import tarfile
 import re
 from typing import Optional
 
+import docker
+
 from sonic_package_manager.logger import log
 from sonic_package_manager.progress import ProgressManager
+from sonic_package_manager.tarindex import TarIndex
 
 
 def is_digest(ref: str):
@@ -86,6 +89,12 @@ class DockerApi:
         self.client = client
         self.progress_manager = progress_manager
 
+    def without_progress(self) -> 'DockerApi':
+        """ Returns DockerApi for the same client that reports no progress,
+        for operations running concurrently. """
+
+        return DockerApi(self.client)
+
     def pull(self, repository: str,
              reference: Optional[str] = None):
         """ Docker 'pull' command.
@@ -123,14 +132,47 @@ class DockerApi:
 
         return self.get_image(f'{repository}@{digest}')
 
-    def load(self, imgpath: str):
+    def load(self, imgpath: str, index: Optional[TarIndex] = None):
         """ Docker 'load' command.
         Args:
-
+            imgpath: path to image tarball
+            index: index of the image tarball, if already built. The image
+                   is not loaded again if it is in the library with all its
+                   tags, otherwise the tarball is streamed from the index.
         """
 
         log.debug(f'loading image from {imgpath}')
 
+        if index is not None:
+            image = self._get_loaded_image(index)
+            if image is not None:
+                log.debug(f'image {image.id} from {imgpath} is already loaded')
+                return image
+            return self.load_data(index.stream())
+
+        with open(imgpath, 'rb') as imagefile:
+            return self.load_data(imagefile)
+
+    def _get_loaded_image(self, index: TarIndex):
+        """ Returns the image of the tarball if it is
+        in the library with all its tags, None otherwise. """
+
+        try:
+            image = self.get_image(index.image_id)
+        except docker.errors.ImageNotFound:
+            return None
+        if not set(index.repotags).issubset(image.tags):
+            return None
+        return image
+
+    def load_data(self, data):
+        """ Docker 'load' command reading the image tarball from data.
+        Args:
+            data: file object or iterable of bytes chunks, e.g. the output
+                  of save() on another docker daemon, streamed without
+                  an intermediate file.
+        """
+
         api = self.client.api
         progress_manager = self.progress_manager
 
@@ -138,29 +180,40 @@ class DockerApi:
         repotag = None
 
         with progress_manager or contextlib.nullcontext():
-            with open(imgpath, 'rb') as imagefile:
-                for line in api.load_image(imagefile, quiet=False):
-                    log.debug(f'pull status: {line}')
+            for line in api.load_image(data, quiet=False):
+                log.debug(f'pull status: {line}')
 
-                    if progress_manager:
-                        process_progress(progress_manager, line)
+                if progress_manager:
+                    process_progress(progress_manager, line)
 
-                    if 'stream' not in line:
-                        continue
+                if 'stream' not in line:
+                    continue
 
-                    stream = line['stream']
-                    repotag_match = re.match(r'Loaded image: (?P<repotag>.*)\n', stream)
-                    if repotag_match:
-                        repotag = repotag_match.groupdict()['repotag']
-                    imageid_match = re.match(r'Loaded image ID: sha256:(?P<id>.*)\n', stream)
-                    if imageid_match:
-                        imageid = imageid_match.groupdict()['id']
+                stream = line['stream']
+                repotag_match = re.match(r'Loaded image: (?P<repotag>.*)\n', stream)
+                if repotag_match:
+                    repotag = repotag_match.groupdict()['repotag']
+                imageid_match = re.match(r'Loaded image ID: sha256:(?P<id>.*)\n', stream)
+                if imageid_match:
+                    imageid = imageid_match.groupdict()['id']
 
         imagename = repotag if repotag else imageid
         log.debug(f'Loaded image {imagename}')
 
         return self.get_image(imagename)
 
+    def save(self, image: str):
+        """ Docker 'save' command.
+        Args:
+            image: image to save
+        Returns:
+            Generator of image tarball chunks.
+        """
+
+        log.debug(f'saving image {image}')
+
+        return self.get_image(image).save(named=True)
+
     def rmi(self, image: str, **kwargs):
         """ Docker 'rmi -f' command. """
 
@@ -14,7 +14,7 @@ from natsort import natsorted
 from sonic_package_manager.database import PackageEntry, PackageDatabase
 from sonic_package_manager.errors import PackageManagerError
 from sonic_package_manager.logger import log
-from sonic_package_manager.manager import PackageManager
+from sonic_package_manager.manager import MIGRATION_JOBS, PackageManager
 
 BULLET_UC = '\u2022'
 
@@ -443,10 +443,12 @@ def uninstall(ctx, name, force, yes, keep_config):
 @cli.command()
 @add_options(PACKAGE_COMMON_OPERATION_OPTIONS)
 @click.option('--dockerd-socket', type=click.Path())
+@click.option('--jobs', type=click.IntRange(min=1), default=MIGRATION_JOBS, show_default=True,
+              help='Number of package images to transfer concurrently')
 @click.argument('database', type=click.Path())
 @click.pass_context
 @root_privileges_required
-def migrate(ctx, database, force, yes, dockerd_socket):
+def migrate(ctx, database, force, yes, dockerd_socket, jobs):
     """ Migrate packages from the given database file. """
 
     manager: PackageManager = ctx.obj
@@ -455,7 +457,7 @@ def migrate(ctx, database, force, yes, dockerd_socket):
         click.confirm('Continue with package migration?', abort=True, show_default=True)
 
     try:
-        manager.migrate_packages(PackageDatabase.from_file(database), dockerd_socket)
+        manager.migrate_packages(PackageDatabase.from_file(database), dockerd_socket, jobs)
     except Exception as err:
         exit_cli(f'Failed to migrate packages {err}', fg='red')
     except KeyboardInterrupt:
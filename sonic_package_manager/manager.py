@@ -4,13 +4,16 @@ import contextlib
 import functools
 import os
 import pkgutil
-import tempfile
+import time
 import yang as ly
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from inspect import signature
 from typing import Any, Iterable, List, Callable, Dict, Optional
 
 import docker
 import filelock
+from toposort import toposort, CircularDependencyError
 from config import config_mgmt
 from sonic_py_common import device_info
 
@@ -53,6 +56,7 @@ from sonic_package_manager.service_creator.sonic_db import (
 from sonic_package_manager.service_creator.utils import in_chroot
 from sonic_package_manager.source import (
     PackageSource,
+    DockerdSource,
     LocalSource,
     RegistrySource,
     TarballSource
@@ -64,6 +68,18 @@ from sonic_package_manager.version import (
 )
 
 
+# Number of package images transferred concurrently during migration
+MIGRATION_JOBS = 4
+
+
+@dataclass
+class MigrationTiming:
+    """ Time spent migrating a package, in seconds. """
+
+    transfer: float
+    install: float
+
+
 @contextlib.contextmanager
 def failure_ignore(ignore: bool):
     """ Ignores failures based on parameter passed. """
@@ -351,6 +367,18 @@ class PackageManager:
         """
 
         source = self.get_package_source(expression, repotag, tarball)
+        self._install_or_upgrade(source, **kwargs)
+
+    def _install_or_upgrade(self, source: PackageSource, **kwargs):
+        """ Install SONiC Package from source, or upgrade it if installed.
+
+        Args:
+            source: SONiC Package source.
+            kwargs: Install/Upgrade options for self.install_from_source
+        Raises:
+            PackageManagerError
+        """
+
         package = source.get_package()
 
         if self.is_installed(package.name):
@@ -657,7 +685,8 @@ class PackageManager:
     @under_lock
     def migrate_packages(self,
                          old_package_database: PackageDatabase,
-                         dockerd_sock: Optional[str] = None):
+                         dockerd_sock: Optional[str] = None,
+                         jobs: int = MIGRATION_JOBS) -> Dict[str, 'MigrationTiming']:
         """
         Migrate packages from old database. This function can do a comparison between
         current database and the database passed in as argument. If the package is
@@ -669,17 +698,32 @@ class PackageManager:
         is installed in the passed database and in the current it is installed but with
         never version - no actions are taken. If dockerd_sock parameter is passed, the
         migration process will use loaded images from docker library of the currently
-        installed image.
+        installed image, streamed into the new docker library without an intermediate file.
+
+        Packages are migrated in dependency order. The images of up to jobs packages
+        are transferred concurrently, ahead of their installation, which is done one
+        package at a time as it updates the package database and system configuration.
 
         Args:
             old_package_database: SONiC Package Database to migrate packages from.
             dockerd_sock: Path to dockerd socket.
+            jobs: Number of images to transfer concurrently.
+        Returns:
+            Dictionary of migration timing by package name.
         Raises:
             PackageManagerError
         """
 
         self._migrate_package_database(old_package_database)
 
+        old_docker = None
+        old_metadata_resolver = None
+        if dockerd_sock:
+            # dockerd_sock is defined, so use docked_sock to connect to
+            # dockerd and fetch package image from it.
+            old_docker = DockerApi(docker.DockerClient(base_url=f'unix://{dockerd_sock}'))
+            old_metadata_resolver = MetadataResolver(old_docker, self.registry_resolver)
+
         def migrate_package(old_package_entry,
                             new_package_entry):
             """ Migrate package routine
@@ -687,31 +731,26 @@ class PackageManager:
             Args:
                 old_package_entry: Entry in old package database.
                 new_package_entry: Entry in new package database.
+            Returns:
+                Package source or package expression to install.
             """
 
             name = new_package_entry.name
             version = new_package_entry.version
 
-            if dockerd_sock:
-                # dockerd_sock is defined, so use docked_sock to connect to
-                # dockerd and fetch package image from it.
+            if old_docker:
                 log.info(f'installing {name} from old docker library')
-                docker_api = DockerApi(docker.DockerClient(base_url=f'unix://{dockerd_sock}'))
-
-                image = docker_api.get_image(old_package_entry.image_id)
-
-                with tempfile.NamedTemporaryFile('wb') as file:
-                    for chunk in image.save(named=True):
-                        file.write(chunk)
-                    file.flush()
-
-                    self.install(tarball=file.name)
+                return DockerdSource(old_package_entry.image_id,
+                                     old_docker,
+                                     self.database,
+                                     self.docker,
+                                     old_metadata_resolver)
             else:
                 log.info(f'installing {name} version {version}')
+                return f'{name}={version}'
 
-                self.install(f'{name}={version}')
+        migrations = {}
 
-        # TODO: Topological sort packages by their dependencies first.
         for old_package in old_package_database:
             if not old_package.installed or old_package.built_in:
                 continue
@@ -727,7 +766,7 @@ class PackageManager:
                              f'{old_package.version} > {new_package.version}')
                     log.info(f'upgrading {new_package.name} to {old_package.version}')
                     new_package.version = old_package.version
-                    migrate_package(old_package, new_package)
+                    migrations[new_package.name] = migrate_package(old_package, new_package)
                 else:
                     log.info(f'skipping {new_package.name} as installed version is newer')
             elif new_package.default_reference is not None:
@@ -740,16 +779,92 @@ class PackageManager:
                              f'then the default in new image: '
                              f'{old_package.version} > {new_package_default_version}')
                     new_package.version = old_package.version
-                    migrate_package(old_package, new_package)
+                    migrations[new_package.name] = migrate_package(old_package, new_package)
                 else:
-                    self.install(f'{new_package.name}={new_package_default_version}')
+                    migrations[new_package.name] = f'{new_package.name}={new_package_default_version}'
             else:
                 # No default version and package is not installed.
                 # Migrate old package same version.
                 new_package.version = old_package.version
-                migrate_package(old_package, new_package)
+                migrations[new_package.name] = migrate_package(old_package, new_package)
+
+        # Save the entries added from the old database, even if no package is installed
+        self.database.commit()
+
+        return self._run_migrations(migrations, jobs)
+
+    def _run_migrations(self,
+                        migrations: Dict[str, Any],
+                        jobs: int) -> Dict[str, 'MigrationTiming']:
+        """ Install packages in dependency order, transferring their images
+        concurrently ahead of installation.
+
+        Args:
+            migrations: Package source or package expression by package name.
+            jobs: Number of packages to fetch metadata and images for concurrently.
+        Returns:
+            Dictionary of migration timing by package name.
+        Raises:
+            PackageManagerError
+        """
+
+        def resolve(migration):
+            if isinstance(migration, str):
+                source = self.get_package_source(migration)
+            else:
+                source = migration
+            return source, source.get_package()
 
-            self.database.commit()
+        # Package metadata is fetched concurrently, e.g. from the registry
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            resolved = dict(zip(migrations, executor.map(resolve, migrations.values())))
+
+        sources = {}
+        dependencies = {}
+        for name, (source, package) in resolved.items():
+            sources[name] = source
+            dependencies[name] = {dependency.name for dependency in package.manifest['package']['depends']
+                                  if dependency.name in migrations}
+
+        try:
+            order = [name for level in toposort(dependencies) for name in sorted(level)]
+        except CircularDependencyError as err:
+            raise PackageManagerError(f'Circular dependency between migrated packages: {err}')
+
+        def prefetch(source):
+            start = time.monotonic()
+            source.prefetch(docker)
+            return time.monotonic() - start
+
+        # Progress is not reported for concurrent transfers
+        docker = self.docker.without_progress()
+        timings = {}
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # Dependencies are transferred first
+            transfers = {name: executor.submit(prefetch, sources[name]) for name in order}
+            try:
+                for name in order:
+                    transfer_time = transfers[name].result()
+
+                    log.info(f'installing migrated package {name}')
+                    start = time.monotonic()
+                    migration = migrations[name]
+                    if isinstance(migration, str):
+                        self.install(migration)
+                    else:
+                        self._install_or_upgrade(migration)
+                    self.database.commit()
+
+                    timings[name] = MigrationTiming(transfer_time, time.monotonic() - start)
+                    log.info(f'migrated package {name}: image transferred in {transfer_time:.2f}s, '
+                             f'installed in {timings[name].install:.2f}s')
+            except BaseException:
+                for transfer in transfers.values():
+                    transfer.cancel()
+                raise
+
+        return timings
 
     def get_installed_package(self, name: str) -> Package:
         """ Get installed package by name.
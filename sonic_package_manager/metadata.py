@@ -3,12 +3,12 @@
 from dataclasses import dataclass, field
 
 import json
-import tarfile
 from typing import Dict, Optional
 
 from sonic_package_manager import utils
 from sonic_package_manager.errors import MetadataError
 from sonic_package_manager.manifest import Manifest
+from sonic_package_manager.tarindex import TarIndex
 from sonic_package_manager.version import Version
 
 
@@ -107,26 +107,29 @@ class MetadataResolver:
 
         return self.from_labels(labels)
 
-    def from_tarball(self, image_path: str) -> Metadata:
+    def from_tarball(self,
+                     image_path: str,
+                     index: Optional[TarIndex] = None) -> Metadata:
         """ Reads manifest image tarball.
         Args:
             image_path: Path to image tarball.
+            index: Index of the image tarball, to share with other
+                   readers of the tarball, e.g. the image load.
         Returns:
             Manifest
         Raises:
             MetadataError
         """
 
-        with tarfile.open(image_path) as image:
-            manifest = json.loads(image.extractfile('manifest.json').read())
+        if index is None:
+            with TarIndex(image_path) as index:
+                return self.from_tarball(image_path, index)
 
-            blob = manifest[0]['Config']
-            image_config = json.loads(image.extractfile(blob).read())
-            labels = image_config['config']['Labels']
-            if labels is None:
-                raise MetadataError('No manifest found in image labels')
+        labels = index.image_config['config']['Labels']
+        if labels is None:
+            raise MetadataError('No manifest found in image labels')
 
-            return self.from_labels(labels)
+        return self.from_labels(labels)
 
     @classmethod
     def from_labels(cls, labels: Dict[str, str]) -> Metadata:
@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 
 import json
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 import requests
+import requests.adapters
 import www_authenticate
 from docker_image import reference
 from prettyprinter import pformat
@@ -20,10 +23,70 @@ class AuthenticationServiceError(Exception):
 
 
 class AuthenticationService:
-    """ AuthenticationService provides an authentication tokens. """
+    """ AuthenticationService provides authentication tokens.
+
+    Tokens are cached by realm, service and scope until they expire,
+    so that a token is requested once for all the requests made to
+    a repository rather than once per request. """
+
+    # Lifetime of a token whose response does not tell,
+    # as defined by the Docker token authentication specification.
+    DEFAULT_TOKEN_LIFETIME = 60
+
+    # Tokens are renewed this many seconds before they expire
+    # so that they do not expire while a request is in flight.
+    TOKEN_EXPIRY_MARGIN = 5
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        """ Initialize AuthenticationService.
+
+        Args:
+            session: HTTP session to request tokens with.
+        """
+
+        self.session = session or requests.Session()
+        self.tokens = {}
+        self.lock = threading.Lock()
 
     @staticmethod
-    def get_token(bearer: Dict) -> str:
+    def _cache_key(bearer: Dict):
+        return bearer.get('realm'), bearer.get('service'), bearer.get('scope')
+
+    def get_cached_token(self, bearer: Dict) -> Optional[str]:
+        """ Returns a cached token that has not expired.
+
+        Args:
+            bearer: Bearer token.
+        Returns:
+            token value as a string or None if no valid token is cached.
+        """
+
+        with self.lock:
+            cached = self.tokens.get(self._cache_key(bearer))
+        if cached is None:
+            return None
+        token, expiry = cached
+        if time.monotonic() >= expiry:
+            return None
+        return token
+
+    def invalidate(self, bearer: Dict, token: Optional[str] = None):
+        """ Evict the cached token of a bearer, e.g. after the registry
+        rejected it.
+
+        Args:
+            bearer: Bearer token.
+            token: Evict the cached token only if it is this one, so that
+                   a token renewed meanwhile by another request is kept.
+        """
+
+        with self.lock:
+            key = self._cache_key(bearer)
+            cached = self.tokens.get(key)
+            if cached is not None and (token is None or cached[0] == token):
+                del self.tokens[key]
+
+    def get_token(self, bearer: Dict) -> str:
         """ Retrieve an authentication token.
 
         Args:
@@ -32,20 +95,33 @@ class AuthenticationService:
             token value as a string.
         """
 
+        token = self.get_cached_token(bearer)
+        if token is not None:
+            return token
+
         log.debug(f'getting authentication token {bearer}')
         if 'realm' not in bearer:
             raise AuthenticationServiceError(f'Realm is required in bearer')
 
-        url = bearer.pop('realm')
-        response = requests.get(url, params=bearer)
+        params = dict(bearer)
+        url = params.pop('realm')
+        requested = time.monotonic()
+        response = self.session.get(url, params=params)
         if response.status_code != requests.codes.ok:
             raise AuthenticationServiceError('Failed to retrieve token')
 
         content = json.loads(response.content)
-        token = content['token']
+        token = content.get('token') or content['access_token']
+        try:
+            lifetime = int(content.get('expires_in', self.DEFAULT_TOKEN_LIFETIME))
+        except ValueError:
+            lifetime = self.DEFAULT_TOKEN_LIFETIME
 
         log.debug(f'authentication token for bearer={bearer}: '
-                  f'token={token}')
+                  f'token={token} expires_in={lifetime}')
+
+        with self.lock:
+            self.tokens[self._cache_key(bearer)] = (token, requested + lifetime - self.TOKEN_EXPIRY_MARGIN)
 
         return token
 
@@ -68,16 +144,57 @@ class RegistryApiError(Exception):
 
 
 class Registry:
-    """ Provides a Docker registry interface. """
+    """ Provides a Docker registry interface.
+
+    Requests share a pooled HTTP session and authentication tokens.
+    Tag lists and manifests are revalidated with their ETag, blobs and
+    manifests referenced by digest are immutable and read once. The
+    interface is thread safe, so that the metadata of several packages
+    can be fetched concurrently. """
 
     MIME_DOCKER_MANIFEST = 'application/vnd.docker.distribution.manifest.v2+json'
 
+    # Maximum number of connections kept open to the registry
+    POOL_SIZE = 8
+
     def __init__(self, host: str):
         self.url = host
-
-    @staticmethod
-    def _execute_get_request(url, headers):
-        response = requests.get(url, headers=headers)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.auth = AuthenticationService(self.session)
+        # Realm and service of the registry authentication service,
+        # learnt from the first authentication challenge, and the bearers
+        # the registry asked for by repository.
+        self.auth_challenge = None
+        self.bearers = {}
+        self.etag_cache = {}
+        self.digest_cache = {}
+        self.lock = threading.Lock()
+
+    def _get_bearer(self, repository: str) -> Optional[Dict]:
+        """ Returns the bearer expected by the registry for pulling
+        from repository, or None before the registry asked for one. """
+
+        with self.lock:
+            if repository in self.bearers:
+                return self.bearers[repository]
+            challenge = self.auth_challenge
+        if challenge is None:
+            return None
+        return dict(challenge, scope=f'repository:{repository}:pull')
+
+    def _execute_get_request(self, url, headers, repository=None):
+        headers = dict(headers)
+        token = None
+        if repository is not None:
+            bearer = self._get_bearer(repository)
+            token = bearer and self.auth.get_cached_token(bearer)
+            if token is not None:
+                headers['Authorization'] = f'Bearer {token}'
+
+        response = self.session.get(url, headers=headers)
         if response.status_code == requests.codes.unauthorized:
             # Get authentication details from headers
             # Registry should tell how to authenticate
@@ -85,12 +202,44 @@ class Registry:
             log.debug(f'unauthorized: retrieving authentication details '
                       f'from response headers {www_authenticate_details}')
             bearer = www_authenticate.parse(www_authenticate_details)['bearer']
-            token = AuthenticationService.get_token(bearer)
+            with self.lock:
+                self.auth_challenge = {key: value for key, value in bearer.items()
+                                       if key in ('realm', 'service')}
+                if repository is not None:
+                    self.bearers[repository] = bearer
+            if token is not None:
+                # The cached token was rejected, e.g. revoked: do not reuse it
+                self.auth.invalidate(bearer, token)
+            token = self.auth.get_token(bearer)
             headers['Authorization'] = f'Bearer {token}'
             # Repeat request
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
         return response
 
+    def _get_cached(self, url, headers, repository, error):
+        """ GET url and return its JSON content, revalidating the
+        previously returned content with its ETag. """
+
+        headers = dict(headers)
+        with self.lock:
+            cached = self.etag_cache.get(url)
+        if cached is not None:
+            headers['If-None-Match'] = cached[0]
+
+        response = self._execute_get_request(url, headers, repository)
+        if cached is not None and response.status_code == requests.codes.not_modified:
+            log.debug(f'{url} not modified')
+            return cached[1]
+        if response.status_code != requests.codes.ok:
+            raise RegistryApiError(error, response)
+
+        content = json.loads(response.content)
+        etag = response.headers.get('ETag')
+        if etag:
+            with self.lock:
+                self.etag_cache[url] = (etag, content)
+        return content
+
     def _get_base_url(self, repository: str):
         return f'{self.url}/v2/{repository}'
 
@@ -100,11 +249,8 @@ class Registry:
         _, repository = reference.Reference.split_docker_domain(repository)
         headers = {'Accept': 'application/json'}
         url = f'{self._get_base_url(repository)}/tags/list'
-        response = self._execute_get_request(url, headers)
-        if response.status_code != requests.codes.ok:
-            raise RegistryApiError(f'Failed to retrieve tags from {repository}', response)
-
-        content = json.loads(response.content)
+        content = self._get_cached(url, headers, repository,
+                                   f'Failed to retrieve tags from {repository}')
         log.debug(f'tags list api response: f{content}')
 
         return content['tags']
@@ -113,14 +259,14 @@ class Registry:
         log.debug(f'getting manifest for {repository}:{ref}')
 
         _, repository = reference.Reference.split_docker_domain(repository)
-        headers = {'Accept': self.MIME_DOCKER_MANIFEST}
         url = f'{self._get_base_url(repository)}/manifests/{ref}'
-        response = self._execute_get_request(url, headers)
-
-        if response.status_code != requests.codes.ok:
-            raise RegistryApiError(f'Failed to retrieve manifest for {repository}:{ref}', response)
+        if is_digest(ref):
+            return self._get_immutable(url, repository,
+                                       f'Failed to retrieve manifest for {repository}:{ref}')
 
-        content = json.loads(response.content)
+        headers = {'Accept': self.MIME_DOCKER_MANIFEST}
+        content = self._get_cached(url, headers, repository,
+                                   f'Failed to retrieve manifest for {repository}:{ref}')
         log.debug(f'manifest content for {repository}:{ref}: {content}')
 
         return content
@@ -129,17 +275,38 @@ class Registry:
         log.debug(f'retrieving blob for {repository}:{digest}')
 
         _, repository = reference.Reference.split_docker_domain(repository)
-        headers = {'Accept': self.MIME_DOCKER_MANIFEST}
         url = f'{self._get_base_url(repository)}/blobs/{digest}'
-        response = self._execute_get_request(url, headers)
+        content = self._get_immutable(url, repository,
+                                      f'Failed to retrieve blobs for {repository}:{digest}')
+
+        log.debug(f'retrieved blob for {repository}:{digest}: {content}')
+        return content
+
+    def _get_immutable(self, url, repository, error):
+        """ GET url and return its JSON content. The content of url is
+        addressed by its digest, so it is fetched once. """
+
+        with self.lock:
+            if url in self.digest_cache:
+                return self.digest_cache[url]
+
+        headers = {'Accept': self.MIME_DOCKER_MANIFEST}
+        response = self._execute_get_request(url, headers, repository)
         if response.status_code != requests.codes.ok:
-            raise RegistryApiError(f'Failed to retrieve blobs for {repository}:{digest}', response)
+            raise RegistryApiError(error, response)
         content = json.loads(response.content)
 
-        log.debug(f'retrieved blob for {repository}:{digest}: {content}')
+        with self.lock:
+            self.digest_cache[url] = content
         return content
 
 
+def is_digest(ref: str) -> bool:
+    """ Returns True if ref is a content digest rather than a tag. """
+
+    return ':' in ref
+
+
 class RegistryResolver:
     """ Returns a registry object based on the input repository reference
      string. """
@@ -147,11 +314,17 @@ class RegistryResolver:
     DockerHubRegistry = Registry('https://index.docker.io')
 
     def __init__(self):
-        pass
+        # Registries are kept, with their connections, tokens and caches,
+        # for all the lookups of the same domain.
+        self.registries = {}
+        self.lock = threading.Lock()
 
     def get_registry_for(self, ref: str) -> Registry:
         domain, _ = DockerReference.split_docker_domain(ref)
         if domain == reference.DEFAULT_DOMAIN:
             return self.DockerHubRegistry
-        # TODO: support insecure registries
-        return Registry(f'https://{domain}')
+        with self.lock:
+            if domain not in self.registries:
+                # TODO: support insecure registries
+                self.registries[domain] = Registry(f'https://{domain}')
+            return self.registries[domain]
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
+from typing import Optional
+
 from sonic_package_manager.database import PackageDatabase, PackageEntry
 from sonic_package_manager.dockerapi import DockerApi, get_repository_from_image
 from sonic_package_manager.metadata import Metadata, MetadataResolver
 from sonic_package_manager.package import Package
+from sonic_package_manager.tarindex import TarIndex
 
 
 class PackageSource(object):
@@ -41,6 +44,17 @@ class PackageSource(object):
 
         raise NotImplementedError
 
+    def prefetch(self, docker: Optional[DockerApi] = None):
+        """ Fetch the image into the docker library ahead of install(),
+        so that the images of several packages can be transferred
+        concurrently. Does nothing by default.
+
+        Args:
+            docker: DockerApi to fetch with, the source's one by default.
+        """
+
+        pass
+
     def install(self, package: Package):
         """ Install image based on package source,
         record installation infromation in PackageEntry..
@@ -110,16 +124,22 @@ class TarballSource(PackageSource):
                          docker,
                          metadata_resolver)
         self.tarball_path = tarball_path
+        # Index shared by the metadata reads and the image load,
+        # so that the tarball is indexed once and read once.
+        self.index = TarIndex(tarball_path)
 
     def get_metadata(self) -> Metadata:
         """ Returns manifest read from tarball. """
 
-        return self.metadata_resolver.from_tarball(self.tarball_path)
+        return self.metadata_resolver.from_tarball(self.tarball_path, self.index)
 
     def install_image(self, package: Package):
         """ Installs image from local tarball source. """
 
-        return self.docker.load(self.tarball_path)
+        try:
+            return self.docker.load(self.tarball_path, self.index)
+        finally:
+            self.index.close()
 
 
 class RegistrySource(PackageSource):
@@ -152,6 +172,60 @@ class RegistrySource(PackageSource):
             package.entry.default_reference = self.reference
         return image_id
 
+    def prefetch(self, docker: Optional[DockerApi] = None):
+        """ Pulls image from registry. The pull in install_image()
+        then finds all layers already present. """
+
+        (docker or self.docker).pull(self.repository, self.reference)
+
+
+class DockerdSource(PackageSource):
+    """ DockerdSource implements PackageSource for an image
+    in the library of another docker daemon, e.g. the one of the SONiC
+    image packages are migrated from. The image is streamed from that
+    daemon into the local one without an intermediate tarball. """
+
+    def __init__(self,
+                 image_id: str,
+                 source_docker: DockerApi,
+                 database: PackageDatabase,
+                 docker: DockerApi,
+                 metadata_resolver: MetadataResolver):
+        """ Initialize DockerdSource.
+
+        Args:
+            image_id: Image in the library of source_docker.
+            source_docker: DockerApi of the daemon to stream image from.
+            database: Package database.
+            docker: DockerApi of the daemon to stream image into.
+            metadata_resolver: Metadata resolver reading from source_docker.
+        """
+
+        super().__init__(database,
+                         docker,
+                         metadata_resolver)
+        self.image_id = image_id
+        self.source_docker = source_docker
+        self.image = None
+
+    def get_metadata(self) -> Metadata:
+        """ Returns manifest read from the image in source daemon. """
+
+        return self.metadata_resolver.from_local(self.image_id)
+
+    def install_image(self, package: Package):
+        """ Streams image from source daemon unless already prefetched. """
+
+        if self.image is None:
+            self.prefetch()
+        return self.image
+
+    def prefetch(self, docker: Optional[DockerApi] = None):
+        """ Streams image from source daemon. """
+
+        docker = docker or self.docker
+        self.image = docker.load_data(self.source_docker.save(self.image_id))
+
 
 class LocalSource(PackageSource):
     """ LocalSource accesses local docker library to retrieve manifest
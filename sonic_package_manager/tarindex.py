@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+""" Module provides random access to image tarballs. """
+
+import json
+import os
+import tarfile
+from typing import Dict, List, Optional
+
+from sonic_package_manager.errors import MetadataError
+from sonic_package_manager.logger import log
+
+
+class TarIndex:
+    """ TarIndex indexes the members of a tar archive, e.g. an image
+    tarball written by 'docker save', in a single pass over the member
+    headers. Member bodies, like image layers, are seeked over rather
+    than read, and members are then read directly from their offset.
+
+    The index is built on first use and keeps the tarball open, so that
+    the same file can be streamed to 'docker load' afterwards. """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, path: str):
+        """ Initialize TarIndex.
+
+        Args:
+            path: Path to tarball.
+        """
+
+        self.path = path
+        self.file = None
+        self.tar = None
+        self._members = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def members(self) -> Dict[str, tarfile.TarInfo]:
+        """ Returns regular file members by name. """
+
+        if self._members is None:
+            self._build()
+        return self._members
+
+    def _build(self):
+        log.debug(f'indexing tarball {self.path}')
+
+        self.file = open(self.path, 'rb')
+        try:
+            try:
+                # Plain tarballs, as written by 'docker save', are read
+                # header by header, seeking past member bodies.
+                self.tar = tarfile.open(fileobj=self.file, mode='r:')
+            except tarfile.ReadError:
+                self.file.seek(0)
+                self.tar = tarfile.open(fileobj=self.file, mode='r:*')
+            self._members = {member.name: member for member in self.tar if member.isfile()}
+        except tarfile.TarError as err:
+            self.close()
+            raise MetadataError(f'Failed to read tarball {self.path}: {err}')
+
+        log.debug(f'indexed {len(self._members)} members of {self.path}')
+
+    def read(self, name: str) -> bytes:
+        """ Read member.
+
+        Args:
+            name: Member name.
+        Returns:
+            Member content.
+        Raises:
+            MetadataError
+        """
+
+        try:
+            member = self.members[name]
+        except KeyError:
+            raise MetadataError(f'No {name} found in tarball {self.path}')
+        return self.tar.extractfile(member).read()
+
+    def read_json(self, name: str):
+        """ Read member as JSON. """
+
+        try:
+            return json.loads(self.read(name))
+        except ValueError as err:
+            raise MetadataError(f'Failed to parse {name} in tarball {self.path}: {err}')
+
+    @property
+    def image_manifest(self) -> Dict:
+        """ Returns the 'docker save' manifest of the image. """
+
+        manifest = self.read_json(self.MANIFEST)
+        if not manifest:
+            raise MetadataError(f'No image found in tarball {self.path}')
+        return manifest[0]
+
+    @property
+    def image_config(self) -> Dict:
+        """ Returns the image configuration. """
+
+        return self.read_json(self.image_manifest['Config'])
+
+    @property
+    def image_id(self) -> str:
+        """ Returns the image ID, the digest of the image configuration. """
+
+        config = os.path.basename(self.image_manifest['Config'])
+        if config.endswith('.json'):
+            config = config[:-len('.json')]
+        return f'sha256:{config}'
+
+    @property
+    def repotags(self) -> List[str]:
+        """ Returns the repository tags of the image. """
+
+        return self.image_manifest.get('RepoTags') or []
+
+    def stream(self):
+        """ Returns the tarball file, rewound, to stream it as a whole. """
+
+        if self.file is None:
+            self._build()
+        self.file.seek(0)
+        return self.file
+
+    def close(self):
+        """ Close the tarball. The index is built again on next use. """
+
+        if self.tar is not None:
+            self.tar.close()
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.tar = None
+        self._members = None
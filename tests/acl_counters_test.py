@@ -0,0 +1,81 @@
+import json
+from unittest import mock
+
+from utilities_common import db_pipeline
+from utilities_common.acl_counters import (AclCounter, AclCounterReader, filter_rule_keys,
+                                           get_counter_delta, load_snapshot, save_snapshot)
+
+from .mock_tables import dbconnector
+
+rule_keys = [
+    ('DATAACL', 'RULE_1'),
+    ('DATAACL', 'RULE_2'),
+    ('DATAACL', 'RULE_05'),
+    ('DATAACL_NO_COUNTER', 'RULE_NO_COUNTER'),
+    ('EVERFLOW', 'RULE_6'),
+]
+
+
+class TestAclCounterReader(object):
+    def setup_method(self):
+        self.db = dbconnector.SonicV2Connector()
+        self.db.connect(self.db.COUNTERS_DB)
+
+    def test_read(self):
+        counters = AclCounterReader(self.db).read(rule_keys)
+        assert counters == {
+            ('DATAACL', 'RULE_1'): AclCounter(101, 100),
+            ('DATAACL', 'RULE_2'): AclCounter(201, 200),
+            ('DATAACL', 'RULE_05'): AclCounter(0, 0),
+            ('EVERFLOW', 'RULE_6'): AclCounter(601, 600),
+        }
+
+    def test_read_filters_before_fetching(self):
+        reader = AclCounterReader(self.db)
+        with mock.patch('utilities_common.acl_counters.hgetall_batched',
+                        wraps=db_pipeline.hgetall_batched) as mock_fetch:
+            counters = reader.read(rule_keys, tables=['DATAACL'], rules=['RULE_2', 'RULE_6'])
+            fetched_keys = list(mock_fetch.call_args[0][1])
+
+        assert counters == {('DATAACL', 'RULE_2'): AclCounter(201, 200)}
+        assert len(fetched_keys) == 1
+
+    def test_read_resolves_counter_map_once(self):
+        reader = AclCounterReader(self.db)
+        with mock.patch.object(self.db, 'get_all', wraps=self.db.get_all) as mock_get_all:
+            reader.read(rule_keys[:2])
+            reader.read(rule_keys[2:])
+            assert mock_get_all.call_count == 1
+
+    def test_filter_rule_keys(self):
+        assert filter_rule_keys(rule_keys) == rule_keys
+        assert filter_rule_keys(rule_keys, tables=['EVERFLOW']) == [('EVERFLOW', 'RULE_6')]
+        assert filter_rule_keys(rule_keys, rules=['RULE_1', 'RULE_6']) == [('DATAACL', 'RULE_1'), ('EVERFLOW', 'RULE_6')]
+
+
+class TestAclCounterSnapshot(object):
+    def test_round_trip(self, tmpdir):
+        path = str(tmpdir.join('snapshot'))
+        counters = {('DATAACL', 'RULE_1'): AclCounter(101, 100), ('EVERFLOW', 'RULE_6'): AclCounter(601, 600)}
+        save_snapshot(path, counters)
+
+        with open(path) as fp:
+            assert json.load(fp) == {'DATAACL|RULE_1': [101, 100], 'EVERFLOW|RULE_6': [601, 600]}
+        assert load_snapshot(path) == counters
+
+    def test_load_legacy_format(self, tmpdir):
+        path = tmpdir.join('snapshot')
+        path.write(json.dumps([{
+            'key': ['DATAACL', 'RULE_1'],
+            'value': {'SAI_ACL_COUNTER_ATTR_PACKETS': '101', 'SAI_ACL_COUNTER_ATTR_BYTES': '100'}
+        }]))
+        assert load_snapshot(str(path)) == {('DATAACL', 'RULE_1'): AclCounter(101, 100)}
+
+    def test_counter_delta(self):
+        counters = {('DATAACL', 'RULE_1'): AclCounter(101, 100), ('DATAACL', 'RULE_2'): AclCounter(5, 5)}
+        snapshot = {('DATAACL', 'RULE_1'): AclCounter(100, 50), ('DATAACL', 'RULE_2'): AclCounter(10, 10)}
+        assert get_counter_delta(counters, snapshot, ('DATAACL', 'RULE_1'), 'packets') == 1
+        assert get_counter_delta(counters, snapshot, ('DATAACL', 'RULE_1'), 'bytes') == 50
+        # counters went backwards, e.g. after a reboot
+        assert get_counter_delta(counters, snapshot, ('DATAACL', 'RULE_2'), 'packets') == 5
+        assert get_counter_delta(counters, {}, ('DATAACL', 'RULE_1'), 'packets') == 101
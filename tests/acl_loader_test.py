@@ -1,3 +1,4 @@
+import json
 import sys
 import os
 import pytest
@@ -217,3 +218,100 @@ class TestAclLoader(object):
         acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/incremental_2.json'))
         acl_loader.incremental_update()
         assert acl_loader.rules_info[(('NTP_ACL', 'RULE_1'))]["PACKET_ACTION"] == "DROP"
+
+    @pytest.mark.parametrize('filename', sorted(os.listdir(os.path.join(test_path, 'acl_input'))))
+    def test_fast_loader_matches_pyangbind(self, acl_loader, filename):
+        pytest.importorskip('openconfig_acl')
+        filename = os.path.join(test_path, 'acl_input', filename)
+
+        def load(use_pyangbind):
+            acl_loader.rules_info = {}
+            try:
+                acl_loader.load_rules_from_file(filename, use_pyangbind=use_pyangbind)
+            except (ValueError, AclLoaderException) as e:
+                return type(e)
+            return acl_loader.rules_info
+
+        assert load(use_pyangbind=False) == load(use_pyangbind=True)
+
+    def test_fast_loader_records(self):
+        yang_acl = AclLoader.parse_acl_json(os.path.join(test_path, 'acl_input/acl1.json'))
+        acl_entry = yang_acl.acl.acl_sets.acl_set['DATAACL'].acl_entries.acl_entry['2']
+        assert acl_entry.config.sequence_id == 2
+        assert acl_entry.l2.config.vlan_id == 369
+        assert acl_entry.ip.config.protocol == 'IP_TCP'
+        # leaves missing from the file read as unset like in the binding
+        assert acl_entry.icmp.config.type == ''
+        assert acl_entry.transport.config.tcp_flags == ()
+
+    def test_fast_loader_unknown_field(self, tmp_path):
+        acl = {'acl': {'acl-sets': {'acl-set': {'DATAACL': {'acl-entries': {'acl-entry': {
+            '1': {'config': {'sequence-id': 1}, 'ip': {'config': {'source-address': '10.0.0.1/32'}}}
+        }}}}}}}
+        filename = str(tmp_path / 'acl.json')
+        with open(filename, 'w') as f:
+            json.dump(acl, f)
+        with pytest.raises(AclLoaderException, match='ip/config/source-address'):
+            AclLoader.parse_acl_json(filename)
+
+    def test_capabilities_read_once(self, acl_loader):
+        acl_loader.capabilities = {}
+        with mock.patch.object(acl_loader.statedb, 'get_all', wraps=acl_loader.statedb.get_all) as mock_get_all:
+            acl_loader.rules_info = {}
+            acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/acl1.json'))
+        # ACL stage and switch capability of the INGRESS stage
+        assert mock_get_all.call_count == 2
+
+    def test_incremental_update_diff(self):
+        acl_loader = AclLoader()
+        acl_loader.load_rules_from_file(os.path.join(test_path, 'acl_input/acl1.json'))
+        acl_loader.full_update()
+        acl_loader.read_rules_info()
+
+        rules_info = dict(acl_loader.rules_info)
+        del rules_info[('DATAACL', 'RULE_2')]
+        rules_info[('DATAACL', 'RULE_3')] = dict(rules_info[('DATAACL', 'RULE_3')])
+        del rules_info[('DATAACL', 'RULE_3')]['VLAN_ID']
+        rules_info[('DATAACL', 'RULE_4')] = {'PRIORITY': '9996', 'PACKET_ACTION': 'FORWARD', 'ETHER_TYPE': '2048'}
+        rules_info[('DATAACL', 'RULE_5')] = {'PRIORITY': '9995', 'PACKET_ACTION': 'FORWARD', 'ETHER_TYPE': '2048'}
+        acl_loader.rules_info = rules_info
+
+        diff = acl_loader.get_rule_diff()
+        # make-before-break: the highest priority is added first, the lowest removed first
+        assert diff.added == [('DATAACL', 'RULE_4'), ('DATAACL', 'RULE_5')]
+        assert diff.changed == [('DATAACL', 'RULE_3')]
+        assert diff.removed[-1] == ('DATAACL', 'RULE_2')
+        assert diff.unchanged == len(rules_info) - 3
+
+        report = acl_loader.incremental_update()
+        assert list(report) == ['']
+        assert report[''] == AclUpdateReport(added=2, changed=1, removed=len(diff.removed),
+                                            unchanged=diff.unchanged,
+                                            writes=2 + 2 + len(diff.removed), round_trips=3)
+
+        acl_loader.read_rules_info()
+        assert {key: acl_loader.configdb.typed_to_raw(rule) for key, rule in acl_loader.rules_db_info.items()} == \
+            {key: acl_loader.configdb.typed_to_raw(rule) for key, rule in rules_info.items()}
+
+        # nothing left to write
+        assert acl_loader.incremental_update()[''] == AclUpdateReport(0, 0, 0, len(rules_info), 0, 0)
+
+    def test_incremental_update_batches(self):
+        acl_loader = AclLoader()
+        acl_loader.incremental_batch_size = 2
+        acl_loader.rules_db_info = {}
+        acl_loader.rules_info = {
+            ('DATAACL', 'TEST_RULE_{}'.format(i)): {'PRIORITY': str(9999 - i), 'PACKET_ACTION': 'FORWARD'} for i in range(5)
+        }
+        acl_loader.per_npu_configdb = {}
+        for namespace in ['asic0', 'asic1']:
+            acl_loader.per_npu_configdb[namespace] = ConfigDBConnector()
+            acl_loader.per_npu_configdb[namespace].connect()
+
+        report = acl_loader.incremental_update()
+        assert sorted(report) == ['', 'asic0', 'asic1']
+        for namespace, configdb in [('', acl_loader.configdb)] + list(acl_loader.per_npu_configdb.items()):
+            assert report[namespace].writes == 5
+            assert report[namespace].round_trips == 3
+            for key, rule in acl_loader.rules_info.items():
+                assert configdb.get_entry('ACL_RULE', key) == rule
@@ -0,0 +1,83 @@
+import os
+from unittest import mock
+
+import click
+from click.testing import CliRunner
+
+import utilities_common.cli as clicommon
+
+port_table = {
+    'Ethernet0': {'alias': 'etp1'},
+    'Ethernet1': {'alias': 'etp1b'},
+    'Ethernet10': {'alias': 'etp3'},
+    'Ethernet4': {'alias': 'Ethernet0'},
+}
+
+
+def get_converter():
+    with mock.patch('sonic_py_common.multi_asic.get_port_table', mock.MagicMock(return_value=port_table)):
+        return clicommon.InterfaceAliasConverter()
+
+
+class TestInterfaceAliasConverter(object):
+    def test_name_alias_lookup(self):
+        converter = get_converter()
+        assert converter.alias_max_length == 9
+        assert converter.name_to_alias('Ethernet10') == 'etp3'
+        assert converter.name_to_alias('Ethernet10.20') == 'etp3.20'
+        assert converter.name_to_alias('Ethernet99') == 'Ethernet99'
+        assert converter.alias_to_name('etp1b') == 'Ethernet1'
+        assert converter.alias_to_name('etp1.5') == 'Ethernet0.5'
+        assert converter.alias_to_name('etp9') == 'etp9'
+
+    def test_translate(self):
+        converter = get_converter()
+        assert converter.translate('Ethernet0 Ethernet1 Ethernet10\n') == 'etp1 etp1b etp3\n'
+        assert converter.translate('Ethernet1, Ethernet10,Ethernet0') == 'etp1b, Ethernet10,Ethernet0'
+        assert converter.translate('Ethernet0.10 xEthernet0 Ethernet100') == 'Ethernet0.10 xEthernet0 Ethernet100'
+        # every name is replaced once, an alias that is also a port name is not translated again
+        assert converter.translate('  Ethernet4\tEthernet0') == '  Ethernet0\tetp1'
+
+    def test_translate_compiles_once(self):
+        converter = get_converter()
+        with mock.patch('re.compile', wraps=clicommon.re.compile) as mock_compile:
+            for _ in range(3):
+                converter.translate('Ethernet0')
+            assert mock_compile.call_count == 1
+
+
+class TestAliasModeOutput(object):
+    def run_in_alias_mode(self, command):
+        @click.command()
+        def cmd():
+            clicommon.run_command_in_alias_mode(command)
+
+        with mock.patch.object(clicommon, 'iface_alias_converter', get_converter()):
+            return CliRunner().invoke(cmd, [])
+
+    def test_default_conversion(self):
+        result = self.run_in_alias_mode('printf "Ethernet0 up\\nmembers: Ethernet1, Ethernet10\\n"')
+        assert result.exit_code == 0
+        assert result.output == 'etp1 up\nmembers: etp1b, etp3\n'
+
+    def test_column_conversion(self):
+        @click.command()
+        def cmd():
+            clicommon.print_output_in_alias_mode('Ethernet10  U\n', 0)
+            clicommon.print_output_in_alias_mode('Ethernet99  D\n', 0)
+
+        with mock.patch.object(clicommon, 'iface_alias_converter', get_converter()):
+            result = CliRunner().invoke(cmd, [])
+        assert result.exit_code == 0
+        assert result.output == '     etp3  U\nEthernet99  D\n'
+
+    def test_display_name_func(self):
+        with mock.patch.dict(os.environ, {'SONIC_CLI_IFACE_MODE': 'default'}):
+            display_name = clicommon.get_interface_display_name_func()
+        assert display_name('Ethernet0') == 'Ethernet0'
+
+        with mock.patch.dict(os.environ, {'SONIC_CLI_IFACE_MODE': 'alias'}), \
+                mock.patch('sonic_py_common.multi_asic.get_port_table', mock.MagicMock(return_value=port_table)):
+            display_name = clicommon.get_interface_display_name_func()
+        assert display_name('Ethernet0') == 'etp1'
+        assert display_name('Ethernet0.10') == 'etp1.10'
@@ -2,7 +2,7 @@ import os
 import logging
 import pprint
 
-from sonic_cli_gen.yang_parser import YangParser
+from sonic_cli_gen.yang_parser import YangIndex, YangParser, get_yang_dir_signature
 from .cli_autogen_input.yang_parser_test import assert_dictionaries
 from .cli_autogen_input.cli_autogen_common import move_yang_models, remove_yang_models
 
@@ -149,6 +149,29 @@ class TestYangParser:
         base_test('sonic-grouping-complex',
                  assert_dictionaries.grouping_complex)
 
+    def test_yang_only_shared_index(self):
+        """ Test for several YANG models parsed in one run
+            with YANG models loaded once and no config data
+        """
+
+        yang_index = YangIndex.load()
+        assert yang_index.signature == get_yang_dir_signature()
+        assert yang_index.get_module('sonic-grouping-1') is not None
+        assert yang_index.get_groupings('sonic-grouping-1')
+        assert yang_index.get_groupings('sonic-not-exist') == []
+
+        # parsing does not modify the shared YANG models,
+        # a YANG model parsed twice gives the same result
+        for _ in range(2):
+            for yang_model_name, correct_dict in [
+                    ('sonic-1-list', assert_dictionaries.one_list),
+                    ('sonic-choice-complex', assert_dictionaries.choice_complex),
+                    ('sonic-grouping-complex', assert_dictionaries.grouping_complex)]:
+                parser = YangParser(yang_model_name=yang_model_name,
+                                    yang_index=yang_index)
+                assert parser.conf_mgmt is None
+                assert parser.parse_yang_model() == correct_dict
+
 
 def base_test(yang_model_name, correct_dict):
     """ General logic for each test case """
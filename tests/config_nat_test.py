@@ -0,0 +1,247 @@
+import os
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+import config.main as config
+import config.nat as nat
+
+
+class MockPipeline(object):
+    def __init__(self, config_db):
+        self.config_db = config_db
+        self.commands = []
+
+    def hset(self, key, mapping):
+        self.commands.append(('hset', key, mapping))
+
+    def hdel(self, key, *fields):
+        self.commands.append(('hdel', key, fields))
+
+    def execute(self):
+        self.config_db.round_trips += 1
+        self.config_db.commands.extend(self.commands)
+        for command, key, args in self.commands:
+            if command == 'hset':
+                self.config_db.redis.setdefault(key, {}).update(args)
+            else:
+                for field in args:
+                    self.config_db.redis[key].pop(field, None)
+            table, entry_key = key.split('|', 1)
+            self.config_db.written.setdefault(table, {})[entry_key] = self.config_db.redis.get(key)
+
+
+class MockConfigDb(object):
+    CONFIG_DB = 'CONFIG_DB'
+    TABLE_NAME_SEPARATOR = '|'
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.redis = {}
+        for table, entries in tables.items():
+            for key, values in entries.items():
+                self.redis['{}|{}'.format(table, self.serialize_key(key))] = dict(values)
+        self.written = {}
+        self.commands = []
+        self.round_trips = 0
+
+    def connect(self):
+        pass
+
+    def get_table(self, table):
+        return self.tables.get(table, {})
+
+    def get_redis_client(self, db_name):
+        return self
+
+    def pipeline(self, transaction=True):
+        return MockPipeline(self)
+
+    def serialize_key(self, key):
+        return '|'.join(key) if isinstance(key, tuple) else key
+
+    def typed_to_raw(self, data):
+        return dict(data)
+
+
+def run_bulk(config_db, lines, counters=None, args=()):
+    if counters is None:
+        counters = {'SNAT_ENTRIES': '0', 'MAX_NAT_ENTRIES': '1024'}
+    runner = CliRunner()
+    with mock.patch('config.nat.ConfigDBPipeConnector', return_value=config_db), \
+            mock.patch('config.nat.SonicV2Connector') as mock_counters_db, \
+            runner.isolated_filesystem():
+        with open('mappings.txt', 'w') as f:
+            f.write('\n'.join(lines))
+        mock_counters_db.return_value.get_all.return_value = counters
+        result = runner.invoke(config.config.commands['nat'].commands['add'].commands['static'].commands['bulk'],
+                               ['mappings.txt'] + list(args))
+    print(result.output)
+    return result
+
+
+existing_tables = {
+    'STATIC_NAT': {
+        '65.55.45.5': {'local_ip': '10.0.0.1'},
+        '65.55.45.6': {'local_ip': '10.0.0.2', 'nat_type': 'snat', 'twice_nat_id': '7'},
+    },
+    'STATIC_NAPT': {
+        ('65.55.45.7', 'TCP', '2000'): {'local_ip': '20.0.0.1', 'local_port': '4500'},
+    },
+    'NAT_POOL': {
+        'pool1': {'nat_ip': '65.56.0.1-65.56.0.10', 'nat_port': '1024-65535'},
+        'pool2': {'nat_ip': '65.57.0.1'},
+    },
+    'NAT_BINDINGS': {
+        'bind1': {'nat_pool': 'pool1', 'twice_nat_id': '9'},
+        'bind2': {'nat_pool': 'pool2', 'twice_nat_id': 'NULL'},
+    },
+}
+
+
+class TestStaticNatIndex(object):
+    def test_static_overlap(self):
+        index = nat.StaticNatIndex(MockConfigDb(existing_tables))
+        assert index.isIpOverlappingWithAnyStaticEntry('65.55.45.5', 'STATIC_NAT')
+        # snat entries overlap on the local ip
+        assert index.isIpOverlappingWithAnyStaticEntry('10.0.0.2', 'STATIC_NAT')
+        assert not index.isIpOverlappingWithAnyStaticEntry('65.55.45.6', 'STATIC_NAT')
+        assert index.isIpOverlappingWithAnyStaticEntry('65.55.45.7', 'STATIC_NAPT')
+
+    def test_dynamic_overlap(self):
+        index = nat.StaticNatIndex(MockConfigDb(existing_tables))
+        assert index.isOverlappingWithAnyDynamicEntry('65.56.0.1')
+        assert index.isOverlappingWithAnyDynamicEntry('65.56.0.10')
+        assert index.isOverlappingWithAnyDynamicEntry('65.57.0.1')
+        assert not index.isOverlappingWithAnyDynamicEntry('65.56.0.11')
+        assert not index.isOverlappingWithAnyDynamicEntry('65.55.0.1')
+
+    def test_twice_nat_id_count(self):
+        index = nat.StaticNatIndex(MockConfigDb(existing_tables))
+        assert index.getTwiceNatIdCount(7, 'STATIC_NAT') == 1
+        assert index.getTwiceNatIdCount(7, 'STATIC_NAPT') == 0
+        assert index.getTwiceNatIdCount(9, 'STATIC_NAPT') == 1
+
+    def test_set_entry_updates_index(self):
+        index = nat.StaticNatIndex(MockConfigDb(existing_tables))
+        index.set_entry('STATIC_NAT', '65.55.45.5', {'local_ip': '10.0.0.3', 'nat_type': 'snat'})
+        assert not index.isIpOverlappingWithAnyStaticEntry('65.55.45.5', 'STATIC_NAT')
+        assert index.isIpOverlappingWithAnyStaticEntry('10.0.0.3', 'STATIC_NAT')
+
+
+class TestStaticNatBulkParse(object):
+    def test_parse_basic(self):
+        assert nat.parseStaticNatBulkLine('basic 65.55.45.1 10.0.0.9 -nat_type snat') == \
+            ('STATIC_NAT', '65.55.45.1', {'local_ip': '10.0.0.9', 'nat_type': 'snat'})
+
+    def test_parse_napt(self):
+        assert nat.parseStaticNatBulkLine('udp 65.55.45.1 100 10.0.0.9 200 -twice_nat_id 3') == \
+            ('STATIC_NAPT', '65.55.45.1|UDP|100', {'local_ip': '10.0.0.9', 'local_port': '200', 'twice_nat_id': '3'})
+
+    @pytest.mark.parametrize('line', [
+        'icmp 65.55.45.1 10.0.0.9',
+        'basic 65.55.45.1',
+        'basic 65.55.45.1 0.0.0.0',
+        'basic 65.55.45.1 10.0.0.9 -nat_type xnat',
+        'basic 65.55.45.1 10.0.0.9 -twice_nat_id 0',
+        'basic 65.55.45.1 10.0.0.9 -zone 1',
+        'tcp 65.55.45.1 70000 10.0.0.9 200',
+    ])
+    def test_parse_invalid(self, line):
+        with pytest.raises(ValueError):
+            nat.parseStaticNatBulkLine(line)
+
+
+class TestStaticNatBulkCommand(object):
+    def test_bulk_import(self, tmpdir):
+        mapping_file = tmpdir.join('mappings.txt')
+        mapping_file.write('\n'.join([
+            '# new entries',
+            'basic 65.55.45.1 10.0.0.9',
+            'basic 65.55.45.5 10.0.0.1',
+            'basic 65.56.0.5 10.0.0.10',
+            'tcp 65.55.45.1 100 10.0.0.9 200',
+            'tcp 65.55.45.8 100 10.0.0.9 200 -twice_nat_id 7',
+            'tcp 65.55.45.9 100 10.0.0.9 200 -twice_nat_id 7',
+            'udp 65.55.45.9 100 10.0.0.9 200 -twice_nat_id 7',
+            'basic bad 10.0.0.1',
+        ]))
+
+        config_db = MockConfigDb(existing_tables)
+        counters = {'SNAT_ENTRIES': '0', 'MAX_NAT_ENTRIES': '1024'}
+        runner = CliRunner()
+        with mock.patch('config.nat.ConfigDBPipeConnector', return_value=config_db), \
+                mock.patch('config.nat.SonicV2Connector') as mock_counters_db:
+            mock_counters_db.return_value.get_all.return_value = counters
+            result = runner.invoke(config.config.commands['nat'].commands['add'].commands['static'].commands['bulk'],
+                                   [str(mapping_file), '--batch-size', '2'])
+
+        print(result.output)
+        assert result.exit_code == 1
+        assert 'Line 4: Given entry is overlapping with existing Dynamic entry' in result.output
+        assert 'Line 5: Given entry is overlapping with existing NAT entry' in result.output
+        assert 'Line 8: Same Twice nat id is not allowed for more than 2 entries' in result.output
+        assert 'Line 9: Given global ip address bad is invalid' in result.output
+        assert 'Added 3 entries, 1 already present, 4 failed.' in result.output
+        assert config_db.written == {
+            'STATIC_NAT': {'65.55.45.1': {'local_ip': '10.0.0.9'}},
+            'STATIC_NAPT': {
+                '65.55.45.8|TCP|100': {'local_ip': '10.0.0.9', 'local_port': '200', 'twice_nat_id': '7'},
+                '65.55.45.9|TCP|100': {'local_ip': '10.0.0.9', 'local_port': '200', 'twice_nat_id': '7'},
+            },
+        }
+
+    def test_bulk_import_max_entries(self, tmpdir):
+        mapping_file = tmpdir.join('mappings.txt')
+        mapping_file.write('basic 65.55.45.1 10.0.0.9\nbasic 65.55.45.2 10.0.0.9\n')
+
+        config_db = MockConfigDb({})
+        counters = {'SNAT_ENTRIES': '9', 'MAX_NAT_ENTRIES': '10'}
+        runner = CliRunner()
+        with mock.patch('config.nat.ConfigDBPipeConnector', return_value=config_db), \
+                mock.patch('config.nat.SonicV2Connector') as mock_counters_db:
+            mock_counters_db.return_value.get_all.return_value = counters
+            result = runner.invoke(config.config.commands['nat'].commands['add'].commands['static'].commands['bulk'],
+                                   [str(mapping_file)])
+
+        print(result.output)
+        assert 'Line 2: Max limit is reached for NAT entries' in result.output
+        assert config_db.written == {'STATIC_NAT': {'65.55.45.1': {'local_ip': '10.0.0.9'}}}
+
+    def test_bulk_import_replaces_entry(self):
+        config_db = MockConfigDb(existing_tables)
+        result = run_bulk(config_db, ['basic 65.55.45.6 10.0.0.5', 'tcp 65.55.45.7 2000 20.0.0.2 4501'])
+
+        assert result.exit_code == 0
+        # fields of the previous entries do not remain, as with 'config nat add static'
+        assert config_db.redis['STATIC_NAT|65.55.45.6'] == {'local_ip': '10.0.0.5'}
+        assert config_db.redis['STATIC_NAPT|65.55.45.7|TCP|2000'] == {'local_ip': '20.0.0.2', 'local_port': '4501'}
+        assert config_db.round_trips == 1
+        # the keys are updated with one HSET each, never deleted
+        assert config_db.commands == [
+            ('hset', 'STATIC_NAT|65.55.45.6', {'local_ip': '10.0.0.5'}),
+            ('hdel', 'STATIC_NAT|65.55.45.6', ('nat_type', 'twice_nat_id')),
+            ('hset', 'STATIC_NAPT|65.55.45.7|TCP|2000', {'local_ip': '20.0.0.2', 'local_port': '4501'}),
+        ]
+
+    def test_bulk_import_check_order(self):
+        tables = {
+            'STATIC_NAT': {'65.55.45.5': {'local_ip': '10.0.0.1'}},
+            'STATIC_NAPT': {('65.55.45.5', 'TCP', '100'): {'local_ip': '20.0.0.1', 'local_port': '4500'}},
+            'NAT_BINDINGS': {},
+        }
+        config_db = MockConfigDb(tables)
+        counters = {'SNAT_ENTRIES': '10', 'MAX_NAT_ENTRIES': '10'}
+        result = run_bulk(config_db, [
+            'basic 65.55.45.5 10.0.0.1',
+            'tcp 65.55.45.5 100 20.0.0.1 4500',
+            'basic 65.55.45.6 10.0.0.2 -twice_nat_id 7',
+        ], counters)
+
+        # the overlap checks run before the entry is reported as present, then the max limit
+        assert 'Line 1: Given entry is overlapping with existing NAPT entry' in result.output
+        assert 'Line 2: Given entry is overlapping with existing NAT entry' in result.output
+        assert 'Line 3: Max limit is reached for NAT entries' in result.output
+        assert 'Added 0 entries, 0 already present, 3 failed.' in result.output
+        assert config_db.written == {}
@@ -0,0 +1,174 @@
+import os
+import sys
+from io import StringIO
+from unittest import mock
+
+from utilities_common.general import load_module_from_source
+
+from .mock_tables import dbconnector
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+configlet_path = os.path.join(scripts_path, 'configlet')
+configlet = load_module_from_source('configlet', configlet_path)
+
+update_data = [
+    {
+        "PORT": {
+            "Ethernet0": {"mtu": "4242", "description": "uplink"},
+            "Ethernet999": {"mtu": "1500"}
+        }
+    },
+    {
+        "ACL_RULE": {
+            "DATAACL": {
+                "RULE_1": {"PRIORITY": "1"}
+            }
+        }
+    },
+    {
+        "PORT": {
+            "Ethernet999": {"speed": "1000"}
+        }
+    }
+]
+
+delete_data = [
+    {
+        "PORT": {
+            "Ethernet4": {}
+        }
+    },
+    {
+        "PORT": {
+            "Ethernet0": {"description": ""}
+        }
+    }
+]
+
+touched_tables = ["PORT", "ACL_RULE"]
+
+flat_key_update = {
+    "VLAN_MEMBER": {
+        "Vlan1000|Ethernet4": {"tagging_mode": "tagged"}
+    }
+}
+
+flat_key_delete = {
+    "VLAN_MEMBER": {
+        "Vlan1000|Ethernet8": {}
+    }
+}
+
+
+class TestConfiglet(object):
+    def setup_method(self):
+        configlet.db = configlet.ConfigDBConnector()
+        configlet.connected = False
+        configlet.test_only = False
+        configlet.init()
+
+    def dump(self):
+        return {t: configlet.db.get_table(t) for t in touched_tables}
+
+    def apply_sequential(self):
+        for i in update_data:
+            configlet.process_entry(True, i)
+        for i in delete_data:
+            configlet.process_entry(False, i)
+        return self.dump()
+
+    def apply_batch(self):
+        batch = configlet.BatchApply(chunk_size=2)
+        for i in update_data:
+            batch.process_entry(True, i)
+        for i in delete_data:
+            batch.process_entry(False, i)
+        batch.apply()
+        return self.dump()
+
+    def test_batch_matches_sequential(self):
+        expected = self.apply_sequential()
+
+        self.setup_method()
+        assert self.apply_batch() == expected
+
+        assert expected["PORT"]["Ethernet0"]["mtu"] == "4242"
+        assert "description" not in expected["PORT"]["Ethernet0"]
+        assert expected["PORT"]["Ethernet999"] == {"mtu": "1500", "speed": "1000"}
+        assert "Ethernet4" not in expected["PORT"]
+        assert expected["ACL_RULE"]["DATAACL", "RULE_1"]["PRIORITY"] == "1"
+
+    def test_batch_reads_each_table_once(self):
+        with mock.patch.object(configlet.db, 'get_table', wraps=configlet.db.get_table) as mock_get_table, \
+                mock.patch.object(configlet.db, 'get_keys') as mock_get_keys, \
+                mock.patch.object(configlet.db, 'get_entry') as mock_get_entry, \
+                mock.patch('sys.stdout', new_callable=StringIO):
+            batch = configlet.BatchApply(chunk_size=2)
+            for i in update_data:
+                batch.process_entry(True, i)
+            for i in delete_data:
+                batch.process_entry(False, i)
+            batch.apply()
+            mock_get_keys.assert_not_called()
+            mock_get_entry.assert_not_called()
+            assert sorted(c[0][0] for c in mock_get_table.call_args_list) == sorted(touched_tables)
+
+    def test_batch_writes_each_key_once(self):
+        client = configlet.get_pipelined_client(configlet.db, configlet.db.CONFIG_DB)
+        dbconnector.reset_db_stats()
+        with mock.patch('sys.stdout', new_callable=StringIO):
+            self.apply_batch()
+
+        # one HSET of all the fields of a new or changed key, never one per field
+        stats = dbconnector.db_stats['CONFIG_DB']
+        assert stats.commands['hset'] == 3
+        assert stats.commands['hdel'] == 1
+        assert stats.commands['delete'] == 1
+        assert client.hgetall('PORT|Ethernet999') == {'mtu': '1500', 'speed': '1000'}
+
+    def test_batch_dry_run(self):
+        before = self.dump()
+        configlet.test_only = True
+        with mock.patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            after = self.apply_batch()
+        output = mock_stdout.getvalue()
+        print(output)
+
+        assert after == before
+        assert "  + Ethernet999 {'mtu': '1500', 'speed': '1000'}" in output
+        assert "  - Ethernet4" in output
+        assert "  ~ Ethernet0 set: {'mtu': '4242'} del: ['description']" in output
+        assert "PORT: 3 keys changed" in output
+
+    def test_batch_flat_keys(self):
+        configlet.process_entry(True, flat_key_update)
+        configlet.process_entry(False, flat_key_delete)
+        expected = configlet.db.get_table("VLAN_MEMBER")
+        assert expected["Vlan1000", "Ethernet4"] == {"tagging_mode": "tagged"}
+        assert ("Vlan1000", "Ethernet8") not in expected
+
+        self.setup_method()
+        configlet.test_only = True
+        batch = configlet.BatchApply(chunk_size=2)
+        batch.process_entry(True, flat_key_update)
+        batch.process_entry(False, flat_key_delete)
+        with mock.patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            batch.apply()
+        output = mock_stdout.getvalue()
+        print(output)
+        # the existing keys are changed, not added next to them
+        assert "  ~ ('Vlan1000', 'Ethernet4') set: {'tagging_mode': 'tagged'} del: []" in output
+        assert "  - ('Vlan1000', 'Ethernet8')" in output
+        assert "  + " not in output
+
+        configlet.test_only = False
+        batch.apply()
+        assert configlet.db.get_table("VLAN_MEMBER") == expected
+
+    def teardown_method(self):
+        configlet.test_only = False
@@ -1,6 +1,7 @@
 import os
 import sys
 import subprocess
+import time
 import pexpect
 from unittest import mock
 
@@ -14,6 +15,7 @@ from click.testing import CliRunner
 from utilities_common.db import Db
 from consutil.lib import *
 from sonic_py_common import device_info
+from swsscommon import swsscommon
 
 class TestConfigConsoleCommands(object):
     @classmethod
@@ -444,44 +446,106 @@ class TestConsutilLib(object):
             assert SysInfoProvider.DEVICE_PREFIX == "/dev/C0-"
             SysInfoProvider.DEVICE_PREFIX = "/dev/ttyUSB"
 
-    @mock.patch('consutil.lib.SysInfoProvider.run_command', mock.MagicMock(return_value=("/dev/ttyUSB0\n/dev/ttyACM1", "")))
+    @mock.patch('glob.glob', mock.MagicMock(return_value=["/dev/ttyUSB0", "/dev/ttyACM1", "/dev/ttyUSB1.lock"]))
     def test_sys_info_provider_list_console_ttys(self):
         SysInfoProvider.DEVICE_PREFIX == "/dev/ttyUSB"
         ttys = SysInfoProvider.list_console_ttys()
         print(SysInfoProvider.DEVICE_PREFIX)
-        assert len(ttys) == 1
+        assert ttys == ["/dev/ttyUSB0"]
 
-    @mock.patch('consutil.lib.SysInfoProvider.run_command', mock.MagicMock(return_value=("", "ls: cannot access '/dev/ttyUSB*': No such file or directory")))
+    @mock.patch('glob.glob', mock.MagicMock(return_value=[]))
     def test_sys_info_provider_list_console_ttys_device_not_exists(self):
         ttys = SysInfoProvider.list_console_ttys()
         assert len(ttys) == 0
 
-    all_active_processes_output = ''+ \
-        """    PID                  STARTED CMD
-      8 Mon Nov  2 04:29:41 2020 picocom /dev/ttyUSB0 
-        """
-    @mock.patch('consutil.lib.SysInfoProvider.run_command', mock.MagicMock(return_value=all_active_processes_output))
-    def test_sys_info_provider_list_active_console_processes(self):
-        SysInfoProvider.DEVICE_PREFIX == "/dev/ttyUSB"
-        procs = SysInfoProvider.list_active_console_processes()
-        assert len(procs) == 1
-        assert "0" in procs
-        assert procs["0"] == ("8", "Mon Nov  2 04:29:41 2020")
-
-    active_process_output = "13751 Wed Mar  6 08:31:35 2019 /usr/bin/sudo picocom -b 9600 -f n /dev/ttyUSB1"
-    @mock.patch('consutil.lib.SysInfoProvider.run_command', mock.MagicMock(return_value=active_process_output))
-    def test_sys_info_provider_get_active_console_process_info_exists(self):
-        SysInfoProvider.DEVICE_PREFIX == "/dev/ttyUSB"
-        proc = SysInfoProvider.get_active_console_process_info("13751")
-        assert proc is not None
-        assert proc == ("1", "13751",  "Wed Mar  6 08:31:35 2019")
+    @staticmethod
+    def _make_proc(tmpdir, processes, btime=1604291300, ticks=8100):
+        proc = tmpdir.mkdir("proc")
+        proc.join("stat").write("cpu  1 2 3 4\nbtime {}\nprocesses 100\n".format(btime))
+        for pid, cmdline in processes.items():
+            pid_dir = proc.mkdir(pid)
+            pid_dir.join("cmdline").write_binary(b"\0".join(arg.encode() for arg in cmdline) + b"\0")
+            # the command name contains spaces and parentheses on purpose
+            pid_dir.join("stat").write("{} (my (com) m) S 1 {} 0\n".format(pid, " ".join(["0"] * 17 + [str(ticks)] + ["0"] * 10)))
+        return str(proc)
+
+    def test_sys_info_provider_list_active_console_processes(self, tmpdir):
+        proc_path = self._make_proc(tmpdir, {
+            "1": ["/sbin/init"],
+            "8": ["picocom", "/dev/ttyUSB0"],
+            "13750": ["/usr/bin/sudo", "picocom", "-b", "9600", "-f", "n", "/dev/ttyUSB1"],
+            "13751": ["picocom", "-b", "9600", "-f", "n", "/dev/ttyUSB1"],
+            "42": [],
+        })
+        expected_date = time.ctime(1604291300 + 8100 // os.sysconf("SC_CLK_TCK"))
+        with mock.patch.object(SysInfoProvider, 'PROC_PATH', proc_path):
+            procs = SysInfoProvider.list_active_console_processes()
+        assert procs == { "0" : ("8", expected_date), "1" : ("13751", expected_date) }
+
+    def test_sys_info_provider_get_active_console_process_info_exists(self, tmpdir):
+        proc_path = self._make_proc(tmpdir, { "13751": ["/usr/bin/sudo", "picocom", "-b", "9600", "-f", "n", "/dev/ttyUSB1"] })
+        expected_date = time.ctime(1604291300 + 8100 // os.sysconf("SC_CLK_TCK"))
+        with mock.patch.object(SysInfoProvider, 'PROC_PATH', proc_path):
+            proc = SysInfoProvider.get_active_console_process_info(13751)
+        assert proc == ("1", "13751", expected_date)
+
+    def test_sys_info_provider_get_active_console_process_info_nonexists(self, tmpdir):
+        proc_path = self._make_proc(tmpdir, { "3": ["bash"] })
+        with mock.patch.object(SysInfoProvider, 'PROC_PATH', proc_path):
+            assert SysInfoProvider.get_active_console_process_info("2") is None
+            assert SysInfoProvider.get_active_console_process_info("3") is None
+
+    def test_db_utils_update_and_get_states(self):
+        db = Db()
+        db_utils = DbUtils(db)
+        states = db_utils.update_states({ "1" : (BUSY_FLAG, "223", "2020/11/2"), "2" : (IDLE_FLAG, "", "") })
+        assert states["1"] == { "state" : "busy", "pid" : "223", "start_time" : "2020/11/2" }
+        assert db.db.get_all(db.db.STATE_DB, "CONSOLE_PORT|1") == states["1"]
+
+        assert db_utils.get_states(["1", "2", "3"]) == {
+            "1" : { "state" : "busy", "pid" : "223", "start_time" : "2020/11/2" },
+            "2" : { "state" : "idle", "pid" : "", "start_time" : "" },
+            "3" : {},
+        }
 
-    active_process_empty_output = ""
-    @mock.patch('consutil.lib.SysInfoProvider.run_command', mock.MagicMock(return_value=active_process_empty_output))
-    def test_sys_info_provider_get_active_console_process_info_nonexists(self):
-        SysInfoProvider.DEVICE_PREFIX == "/dev/ttyUSB"
-        proc = SysInfoProvider.get_active_console_process_info("2")
-        assert proc is None
+    @mock.patch('consutil.lib.SysInfoProvider.list_active_console_processes', mock.MagicMock(return_value={ "2" : ("223", "2020/11/2")}))
+    def test_console_port_provider_refresh_single_pass(self):
+        db = Db()
+        db.cfgdb.set_entry("CONSOLE_PORT", 1, { "baud_rate" : "9600" })
+        db.cfgdb.set_entry("CONSOLE_PORT", 2, { "baud_rate" : "9600" })
+
+        with mock.patch.object(db.cfgdb, 'get_entry') as mock_get_entry, \
+                mock.patch.object(db.db, 'set') as mock_set:
+            provider = ConsolePortProvider(db, configured_only=True, refresh=True)
+            mock_get_entry.assert_not_called()
+            mock_set.assert_not_called()
+
+        ports = { port.line_num : port for port in provider.get_all() }
+        assert not ports["1"].busy
+        assert ports["2"].busy and ports["2"].session_pid == "223"
+        assert db.db.get(db.db.STATE_DB, "CONSOLE_PORT|2", "state") == "busy"
+
+    def test_console_port_provider_watch(self):
+        db = Db()
+        db.cfgdb.set_entry("CONSOLE_PORT", 1, { "baud_rate" : "9600" })
+        provider = ConsolePortProvider(db, configured_only=True)
+
+        mock_tbl = mock.MagicMock()
+        mock_tbl.pop.side_effect = [
+            ("5", "SET", (("state", "busy"),)),
+            ("1", "SET", (("state", "busy"), ("pid", "223"), ("start_time", "2020/11/2"))),
+            ("1", "DEL", ()),
+        ]
+        mock_sel = mock.MagicMock()
+        mock_sel.select.side_effect = [(swsscommon.Select.TIMEOUT, None)] + [(swsscommon.Select.OBJECT, None)] * 3
+        with mock.patch('consutil.lib.swsscommon.DBConnector'), \
+                mock.patch('consutil.lib.swsscommon.SubscriberStateTable', return_value=mock_tbl), \
+                mock.patch('consutil.lib.swsscommon.Select', mock.MagicMock(return_value=mock_sel, TIMEOUT=swsscommon.Select.TIMEOUT, ERROR=swsscommon.Select.ERROR)):
+            updates = provider.watch()
+            port = next(updates)
+            assert port.line_num == "1" and port.busy and port.session_pid == "223"
+            port = next(updates)
+            assert not port.busy
 
 class TestConsutil(object):
     @classmethod
@@ -597,6 +661,22 @@ class TestConsutilShow(object):
         assert result.exit_code == 0
         assert result.output == TestConsutilShow.expect_show_output
 
+    @mock.patch('show.main.run_command')
+    @mock.patch('subprocess.call', mock.MagicMock(return_value=0))
+    def test_show_line_watch(self, mock_run_command):
+        import show.main as show
+        runner = CliRunner()
+
+        result = runner.invoke(show.cli.commands["line"], ['--brief'])
+        assert result.exit_code == 0
+        mock_run_command.assert_called_once_with("consutil show -b", display_cmd=False)
+
+        # the table is redrawn in place, so consutil is given the terminal
+        result = runner.invoke(show.cli.commands["line"], ['--brief', '--watch'])
+        assert result.exit_code == 0
+        subprocess.call.assert_called_once_with("consutil show -b -w", shell=True)
+        mock_run_command.assert_called_once()
+
 class TestConsutilConnect(object):
     @classmethod
     def setup_class(cls):
@@ -5,6 +5,7 @@ import pytest
 import sys
 from click.testing import CliRunner
 from shutil import copyfile
+from unittest import mock
 from utilities_common.db import Db
 
 test_path = os.path.dirname(os.path.abspath(__file__))
@@ -31,6 +32,23 @@ FLOW_CNT_TRAP_STAT    10000               enable
 FLOW_CNT_ROUTE_STAT   10000               enable
 """
 
+expected_counterpoll_plan = """\
+Type                  Status      Objects    Stats/Object    Interval (in ms)    Reads/s
+--------------------  --------  ---------  --------------  ------------------  ---------
+QUEUE_STAT            enable           90               5               10000         45
+PORT_STAT             enable            3              58                1000        174
+PORT_BUFFER_DROP      enable            3               2               60000          0
+QUEUE_WATERMARK_STAT  enable           90               1               60000          2
+PG_WATERMARK_STAT     enable           24               2               60000          1
+PG_DROP_STAT          enable           24               1               10000          2
+ACL                   enable           12               2                5000          5
+TUNNEL_STAT           enable            1               4                3000          1
+FLOW_CNT_TRAP_STAT    enable            1               2               10000          0
+FLOW_CNT_ROUTE_STAT   enable            4               2               10000          1
+
+Total: 231 reads/s, budget: 50000 reads/s
+"""
+
 class TestCounterpoll(object):
     @classmethod
     def setup_class(cls):
@@ -44,6 +62,43 @@ class TestCounterpoll(object):
         print(result.output)
         assert result.output == expected_counterpoll_show
 
+    def test_plan(self):
+        runner = CliRunner()
+        result = runner.invoke(counterpoll.cli.commands["plan"], [])
+        print(result.output)
+        assert result.exit_code == 0
+        assert result.output == expected_counterpoll_plan
+
+    def test_plan_over_budget(self):
+        runner = CliRunner()
+        result = runner.invoke(counterpoll.cli.commands["plan"], ["--budget", "100", "--suggest"])
+        print(result.output)
+        assert result.exit_code == 0
+        assert "Total: 231 reads/s, budget: 100 reads/s" in result.output
+        assert "Warning: the enabled counter groups exceed the polling budget" in result.output
+        assert "Suggested (in ms)" in result.output
+        suggested_total = int(result.output.split("Suggested total: ")[1].split()[0])
+        assert suggested_total <= 100
+
+        result = runner.invoke(counterpoll.cli.commands["plan"], ["--budget", "1", "--suggest"])
+        print(result.output)
+        assert result.exit_code == 1
+        assert "Error: the budget cannot be met even with the longest poll intervals" in result.output
+
+    def test_plan_apply(self):
+        runner = CliRunner()
+        db = Db()
+        with mock.patch("counterpoll.main.ConfigDBConnector", return_value=db.cfgdb):
+            result = runner.invoke(counterpoll.cli.commands["plan"], ["--budget", "100", "--apply"])
+        print(result.output)
+        assert result.exit_code == 0
+
+        table = db.cfgdb.get_table("FLEX_COUNTER_TABLE")
+        assert int(table["PORT"]["POLL_INTERVAL"]) > 1000
+        assert int(table["QUEUE"]["POLL_INTERVAL"]) > 10000
+        assert int(table["PORT_BUFFER_DROP"]["POLL_INTERVAL"]) <= 300000
+        assert "Set PORT_STAT poll interval to {} ms".format(table["PORT"]["POLL_INTERVAL"]) in result.output
+
     def test_port_buffer_drop_interval(self):
         runner = CliRunner()
         result = runner.invoke(counterpoll.cli.commands["port-buffer-drop"].commands["interval"], ["30000"])
@@ -410,3 +410,43 @@ class TestGlobalDscpToTcMapMigrator(object):
         resulting_table = dbmgtr_mlnx.configDB.get_table('PORT_QOS_MAP')
         assert resulting_table == {}
 
+
+class TestStagedMigrator(object):
+    @classmethod
+    def setup_class(cls):
+        os.environ['UTILITIES_UNIT_TESTING'] = "2"
+
+    @classmethod
+    def teardown_class(cls):
+        os.environ['UTILITIES_UNIT_TESTING'] = "0"
+        dbconnector.dedicated_dbs['CONFIG_DB'] = None
+
+    def test_staged_migration_matches_direct(self):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'feature-input')
+        import db_migrator
+        dbmgtr = db_migrator.DBMigrator(None)
+        dbmgtr.migrate()
+
+        staged_dbmgtr = db_migrator.DBMigrator(None, staged=True)
+        staged_dbmgtr.migrate()
+
+        # nothing is written until the staged changes are flushed
+        assert staged_dbmgtr.configDB.connector.get_table('CONTAINER_FEATURE')
+        staged_dbmgtr.flush()
+
+        for table in ['FEATURE', 'CONTAINER_FEATURE', 'VERSIONS']:
+            diff = DeepDiff(staged_dbmgtr.configDB.connector.get_table(table), dbmgtr.configDB.get_table(table), ignore_order=True)
+            assert not diff
+        assert [name for name, _ in staged_dbmgtr.step_timing][-3:] == ['common_migration_ops', 'flush_CONFIG_DB', 'flush_APPL_DB']
+
+    def test_staged_dry_run_report(self):
+        dbconnector.dedicated_dbs['CONFIG_DB'] = os.path.join(mock_db_path, 'config_db', 'feature-input')
+        import db_migrator
+        dbmgtr = db_migrator.DBMigrator(None, staged=True)
+        dbmgtr.migrate()
+        report = dbmgtr.diff_report()
+
+        assert "  - CONTAINER_FEATURE|" in report
+        assert "  ~ VERSIONS|DATABASE set: {'VERSION': '" + dbmgtr.CURRENT_VERSION + "'} del: []" in report
+        assert "  common_migration_ops: " in report
+        assert dbmgtr.configDB.connector.get_table('CONTAINER_FEATURE')
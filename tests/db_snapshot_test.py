@@ -0,0 +1,136 @@
+import gzip
+import json
+import os
+import sys
+import time
+from unittest import mock
+
+from utilities_common.general import load_module_from_source
+
+from .mock_tables import dbconnector
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+db_snapshot = load_module_from_source('db_snapshot', os.path.join(scripts_path, 'db_snapshot.py'))
+
+
+def write_base(path, entries):
+    with gzip.open(path, 'wt') as f:
+        db_snapshot.write_snapshot(f, entries)
+
+
+class TestDbSnapshot(object):
+    def setup_method(self):
+        dbconnector.reset_db_stats()
+
+    def test_save_db(self, tmp_path):
+        path = str(tmp_path / 'APPL_DB.json.gz')
+        start = time.time()
+        db_snapshot.save_db('APPL_DB', '', path)
+
+        with gzip.open(path, 'rt') as f:
+            snapshot = json.load(f)
+        with open(os.path.join(test_path, 'mock_tables', 'appl_db.json')) as f:
+            expected = json.load(f)
+        assert list(snapshot) == sorted(expected)
+        for key, entry in snapshot.items():
+            # the entries of sonic-db-dump
+            assert start - 0.001 <= entry.pop('expireat') <= time.time()
+            assert entry == {'ttl': -0.001, 'type': 'hash', 'value': expected[key]}
+        assert {key: db_snapshot.without_expireat(entry)
+                for key, entry in db_snapshot.read_snapshot(path)} == snapshot
+
+        # a SCAN, then a round trip for the types and one for the values and TTLs of every batch
+        stats = dbconnector.db_stats['APPL_DB']
+        assert stats.commands['type'] == len(expected)
+        assert stats.commands['hgetall'] == len(expected)
+        assert stats.commands['pttl'] == len(expected)
+        assert stats.round_trips <= stats.commands['scan'] + 2 * (len(expected) // 512 + 1)
+
+    def test_to_entry(self):
+        with mock.patch('time.time', return_value=1000):
+            assert db_snapshot.to_entry('set', {'b', 'a'}, 1500) == \
+                {'expireat': 1001.5, 'ttl': 1.5, 'type': 'set', 'value': ['a', 'b']}
+            # no expiry
+            assert db_snapshot.to_entry('string', 'a', -1) == \
+                {'expireat': 999.999, 'ttl': -0.001, 'type': 'string', 'value': 'a'}
+
+    def test_mask_secrets(self, tmp_path):
+        path = str(tmp_path / 'CONFIG_DB.json.gz')
+        entries = [('SNMP_COMMUNITY|msft', {'type': 'hash', 'value': {'TYPE': 'RO'}}),
+                   ('TACPLUS_SERVER|10.0.0.8', {'type': 'hash', 'value': {'passkey': 'secret', 'priority': '1'}})]
+
+        masked = dict(db_snapshot.remove_secrets(entries))
+        assert list(masked) == ['TACPLUS_SERVER|10.0.0.8']
+        assert masked['TACPLUS_SERVER|10.0.0.8']['value'] == {'passkey': '****', 'priority': '1'}
+
+        db_snapshot.save_db('CONFIG_DB', '', path, mask_secrets=True)
+        snapshot = dict(db_snapshot.read_snapshot(path))
+        with open(os.path.join(test_path, 'mock_tables', 'config_db.json')) as f:
+            assert 'SNMP_COMMUNITY|msft' in json.load(f)
+        assert not [key for key in snapshot if key.startswith('SNMP_COMMUNITY|')]
+        assert 'PORT|Ethernet0' in snapshot
+
+    def test_delta(self, tmp_path):
+        full_path = str(tmp_path / 'COUNTERS_DB_2.json.gz')
+        db_snapshot.save_db('COUNTERS_DB', '', full_path)
+        current = list(db_snapshot.read_snapshot(full_path))
+
+        # the first snapshot, before a counter changed, a key was added and a field and a key were removed
+        base = [(key, json.loads(json.dumps(entry))) for key, entry in current]
+        changed_key, changed_entry = base[0]
+        counter = sorted(changed_entry['value'])[0]
+        changed_entry['value'][counter] = 'old'
+        changed_entry['value']['REMOVED_COUNTER'] = '1'
+        base.insert(1, (changed_key + 'removed', {'type': 'hash', 'value': {'a': 'b'}}))
+        added_key = current[-1][0]
+        base = [(key, entry) for key, entry in base if key != added_key]
+        base.append(('zzz', {'type': 'string', 'value': 'removed'}))
+        base_path = str(tmp_path / 'COUNTERS_DB_1.json.gz')
+        write_base(base_path, base)
+
+        delta_path = str(tmp_path / 'COUNTERS_DB_2.delta.json.gz')
+        db_snapshot.save_db('COUNTERS_DB', '', delta_path, base=base_path)
+        delta = {key: entry and db_snapshot.without_expireat(entry)
+                 for key, entry in db_snapshot.read_snapshot(delta_path)}
+        assert delta == {
+            changed_key: {'ttl': -0.001, 'type': 'hash', 'value': {counter: current[0][1]['value'][counter]},
+                          'deleted': ['REMOVED_COUNTER']},
+            changed_key + 'removed': None,
+            added_key: db_snapshot.without_expireat(current[-1][1]),
+            'zzz': None,
+        }
+        assert os.path.getsize(delta_path) < os.path.getsize(full_path)
+
+        expanded = list(db_snapshot.expand(db_snapshot.read_snapshot(base_path),
+                                           db_snapshot.read_snapshot(delta_path)))
+        assert [(key, db_snapshot.without_expireat(entry)) for key, entry in expanded] == \
+            [(key, db_snapshot.without_expireat(entry)) for key, entry in current]
+
+    def test_delta_ttl(self):
+        base = {'expireat': 1010, 'ttl': 10, 'type': 'hash', 'value': {'a': '1'}}
+
+        # a new expireat alone is not a change
+        assert db_snapshot.diff_entry(base, dict(base, expireat=1020)) is None
+        assert db_snapshot.diff_entry(dict(base, type='string', value='1'),
+                                      dict(base, type='string', value='1', expireat=1020)) is None
+
+        entry = dict(base, expireat=1015, ttl=5)
+        delta = db_snapshot.diff_entry(base, entry)
+        assert delta == {'expireat': 1015, 'ttl': 5, 'type': 'hash', 'value': {}}
+        assert db_snapshot.apply_delta(base, delta) == entry
+
+    def test_main(self, tmp_path, capsys):
+        sys.argv = ['db_snapshot.py', '-o', str(tmp_path), '--name', '{db}.json.0', 'APPL_DB', 'STATE_DB']
+        assert db_snapshot.main() == 0
+        assert sorted(os.listdir(str(tmp_path))) == ['APPL_DB.json.0.gz', 'STATE_DB.json.0.gz']
+
+        sys.argv = ['db_snapshot.py', '--expand', str(tmp_path / 'APPL_DB.json.0.gz'),
+                    str(tmp_path / 'APPL_DB.json.0.gz')]
+        capsys.readouterr()
+        assert db_snapshot.main() == 0
+        expanded = json.loads(capsys.readouterr().out)
+        assert expanded == dict(db_snapshot.read_snapshot(str(tmp_path / 'APPL_DB.json.0.gz')))
@@ -2,6 +2,7 @@ import json
 import os
 from deepdiff import DeepDiff
 from utilities_common.db import Db
+from fdbutil.entries_file import EntriesWriter, iter_entries
 import importlib
 fast_reboot_dump = importlib.import_module("scripts.fast-reboot-dump")
 
@@ -36,7 +37,22 @@ class TestFastRebootDump(object):
 
         expectd_map_mac_ip_per_vlan = {'Vlan2': {'52:54:00:5d:fc:b7': 'PortChannel0001'}}
         assert not DeepDiff(map_mac_ip_per_vlan, expectd_map_mac_ip_per_vlan, ignore_order=True)
-    
+
+    #Test fast-reboot-dump script to stream the fdb entries to a ndjson file as they are generated.
+    def test_generate_fdb_entries_streamed_ndjson(self, tmp_path):
+        vlan_ifaces = ['Vlan2']
+        filename = str(tmp_path / 'fdb.json')
+
+        with EntriesWriter(filename, 'ndjson') as writer:
+            fast_reboot_dump.generate_fdb_entries_logic(self.asic_db, self.app_db, vlan_ifaces, writer)
+            assert writer.count == 1
+
+        with open(filename) as fp:
+            lines = fp.read().splitlines()
+        assert len(lines) == 1
+        expectd_fdb_entries = [{'FDB_TABLE:Vlan2:52-54-00-5D-FC-B7': {'type': 'dynamic', 'port': 'PortChannel0001'}, 'OP': 'SET'}]
+        assert list(iter_entries(filename)) == expectd_fdb_entries
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
@@ -6,7 +6,10 @@ import shutil
 import subprocess
 
 from collections import defaultdict
+from unittest import mock
 from .filter_fdb_input.test_vectors import filterFdbEntriesTestVector
+from fdbutil import entries_file
+from fdbutil.entries_file import EntriesWriter, get_format, iter_entries
 from fdbutil.filter_fdb_entries import main as filterFdbMain
 
 class TestFilterFdbEntries(object):
@@ -112,11 +115,8 @@ class TestFilterFdbEntries(object):
             Returns:
                 fdbMap(defaultdict) map of FDB entries using MAC as key.
         """
-        with open(filename, 'r') as fp:
-            fdbEntries = json.load(fp)
-
         fdbMap = defaultdict()
-        for fdb in fdbEntries:
+        for fdb in iter_entries(filename):
             for key, config in fdb.items():
                 if "FDB_TABLE" in key:
                     fdbMap[key] = fdb
@@ -178,3 +178,116 @@ class TestFilterFdbEntries(object):
             assert self.__verifyOutput(), "Test failed for test data: {0}".format(testData)
         finally:
             self.__tearDown()
+
+    @pytest.mark.parametrize("testData", filterFdbEntriesTestVector)
+    def testFilterFdbEntriesNdjson(self, testData):
+        """
+            Test Filter FDB entries script with ndjson ARP and FDB entries files
+
+            The filtered FDB entries file is expected to keep the ndjson format
+
+            Args:
+                testData(dict): Map containing ARP entries, FDB entries, and expected FDB entries
+        """
+        try:
+            self.__setUp(testData)
+            for filename in [self.ARP_FILENAME, self.FDB_FILENAME]:
+                entries = list(iter_entries(filename))
+                with EntriesWriter(filename, 'ndjson') as writer:
+                    writer.extend(entries)
+            argv = [
+                "filter_fdb_entries",
+                "-a",
+                self.ARP_FILENAME,
+                "-f",
+                self.FDB_FILENAME,
+                "-c",
+                self.CONFIG_DB_FILENAME,
+            ]
+            rc = filterFdbMain(argv)
+            assert rc == 0
+            assert get_format(self.FDB_FILENAME) == 'ndjson'
+            assert self.__verifyOutput(), "Test failed for test data: {0}".format(testData)
+            assert not os.path.exists(self.FDB_FILENAME + '.tmp')
+        finally:
+            self.__tearDown()
+
+    def testFilterFdbEntriesConvertToJson(self):
+        """
+            Test Filter FDB entries script converting an ndjson FDB entries file to a JSON array
+        """
+        testData = filterFdbEntriesTestVector[-4]
+        try:
+            self.__setUp(testData)
+            entries = list(iter_entries(self.FDB_FILENAME))
+            with EntriesWriter(self.FDB_FILENAME, 'ndjson') as writer:
+                writer.extend(entries)
+            argv = [
+                "filter_fdb_entries",
+                "-a",
+                self.ARP_FILENAME,
+                "-f",
+                self.FDB_FILENAME,
+                "-c",
+                self.CONFIG_DB_FILENAME,
+                "--format",
+                "json",
+            ]
+            rc = filterFdbMain(argv)
+            assert rc == 0
+            with open(self.FDB_FILENAME) as fp:
+                assert isinstance(json.load(fp), list)
+            assert self.__verifyOutput(), "Test failed for test data: {0}".format(testData)
+        finally:
+            self.__tearDown()
+
+
+class TestEntriesFile(object):
+    """
+        Test streaming entries file reader and writer
+    """
+    FILENAME = "/tmp/entries.json"
+
+    entries = [
+        {"FDB_TABLE:Vlan1000:72-06-00-01-00-01": {"type": "dynamic", "port": "Ethernet0"}, "OP": "SET"},
+        {"NEIGH_TABLE:Vlan1000:fc00::72": {"neigh": "72:06:00:01:00:01", "family": "IPv6"}, "OP": "SET"},
+        {"ROUTE_TABLE:0.0.0.0/0": {"nexthop": "10.0.0.1,10.0.0.3", "ifname": "PortChannel0001,PortChannel0002"},
+         "OP": "SET"},
+        {"NUMBERS": {"list": [1, 2.5, -3e10], "nested": {"x": None, "y": True}}, "OP": "SET"},
+    ]
+
+    def teardown_method(self):
+        if os.path.exists(self.FILENAME):
+            os.remove(self.FILENAME)
+
+    @pytest.mark.parametrize("entries", [entries, entries[:1], []])
+    def testJsonMatchesJsonDump(self, entries):
+        with EntriesWriter(self.FILENAME) as writer:
+            writer.extend(entries)
+        with open(self.FILENAME) as fp:
+            output = fp.read()
+        assert output == json.dumps(entries, indent=2, separators=(',', ': '))
+        assert get_format(self.FILENAME) == 'json'
+
+    @pytest.mark.parametrize("fmt", ['json', 'ndjson'])
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+    def testRoundTrip(self, fmt, chunk_size):
+        with EntriesWriter(self.FILENAME, fmt) as writer:
+            writer.extend(self.entries)
+        assert get_format(self.FILENAME) == fmt
+        with mock.patch.object(entries_file, 'READ_CHUNK_SIZE', chunk_size):
+            assert list(iter_entries(self.FILENAME)) == self.entries
+
+    def testEmptyFile(self):
+        open(self.FILENAME, 'w').close()
+        assert list(iter_entries(self.FILENAME)) == []
+
+    def testTruncatedJson(self):
+        with EntriesWriter(self.FILENAME) as writer:
+            writer.extend(self.entries)
+        with open(self.FILENAME) as fp:
+            output = fp.read()
+        with open(self.FILENAME, 'w') as fp:
+            fp.write(output[:-10])
+        with pytest.raises(ValueError):
+            list(iter_entries(self.FILENAME))
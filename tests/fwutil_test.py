@@ -0,0 +1,209 @@
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+sys.path.insert(0, modules_path)
+
+sys.modules['sonic_platform'] = mock.MagicMock()
+sys.modules['sonic_platform.platform'] = mock.MagicMock()
+
+from fwutil import lib as fwutil_lib
+
+
+class Component(object):
+    def __init__(self, version, delay=0, hang=None, name=None):
+        self.name = name
+        self.version = version
+        self.delay = delay
+        self.hang = hang
+        self.calls = 0
+
+    def get_name(self):
+        return self.name
+
+    def get_firmware_version(self):
+        self.calls += 1
+        if self.hang is not None:
+            self.hang.wait()
+        time.sleep(self.delay)
+        return self.version
+
+    def get_available_firmware_version(self, firmware_path):
+        return '{}-new'.format(self.version)
+
+
+class TestFirmwareVersionCache(object):
+    def test_get_set(self, tmp_path):
+        filename = str(tmp_path / 'cache' / 'fw_version_cache')
+        cache = fwutil_lib.FirmwareVersionCache(filename=filename, ttl=60)
+        assert cache.get('Chassis1/BIOS') is None
+
+        cache.set('Chassis1/BIOS', '1.0')
+        assert cache.get('Chassis1/BIOS') == '1.0'
+        # the cache is shared with the next fwutil run
+        assert fwutil_lib.FirmwareVersionCache(filename=filename, ttl=60).get('Chassis1/BIOS') == '1.0'
+
+    def test_ttl(self, tmp_path):
+        cache = fwutil_lib.FirmwareVersionCache(filename=str(tmp_path / 'fw_version_cache'), ttl=60)
+        with mock.patch('time.time', return_value=1000):
+            cache.set('Chassis1/BIOS', '1.0')
+        with mock.patch('time.time', return_value=1059):
+            assert cache.get('Chassis1/BIOS') == '1.0'
+        with mock.patch('time.time', return_value=1060):
+            assert cache.get('Chassis1/BIOS') is None
+        # a clock going backwards does not keep an entry forever
+        with mock.patch('time.time', return_value=999):
+            assert cache.get('Chassis1/BIOS') is None
+
+    def test_invalidate(self, tmp_path):
+        filename = str(tmp_path / 'fw_version_cache')
+        cache = fwutil_lib.FirmwareVersionCache(filename=filename, ttl=60)
+        cache.set('Chassis1/BIOS', '1.0')
+        cache.set('Chassis1/CPLD', '2.0')
+
+        cache.invalidate('Chassis1/BIOS')
+        assert cache.get('Chassis1/BIOS') is None
+        assert cache.get('Chassis1/CPLD') == '2.0'
+        assert fwutil_lib.FirmwareVersionCache(filename=filename, ttl=60).get('Chassis1/BIOS') is None
+
+        cache.invalidate()
+        assert cache.get('Chassis1/CPLD') is None
+        assert fwutil_lib.FirmwareVersionCache(filename=filename, ttl=60).get('Chassis1/CPLD') is None
+
+    def test_corrupted_file(self, tmp_path):
+        filename = str(tmp_path / 'fw_version_cache')
+        with open(filename, 'w') as f:
+            f.write('{not json')
+        cache = fwutil_lib.FirmwareVersionCache(filename=filename, ttl=60)
+        assert cache.get('Chassis1/BIOS') is None
+        cache.set('Chassis1/BIOS', '1.0')
+        assert cache.get('Chassis1/BIOS') == '1.0'
+
+
+class TestComponentVersionProber(object):
+    def test_probe_order(self):
+        components = [('Chassis1/C{}'.format(i), Component(str(i), delay=0.01 * (5 - i)), None)
+                      for i in range(5)]
+        components.append(('Chassis1/FW', Component('fw'), '/tmp/fw.bin'))
+        prober = fwutil_lib.ComponentVersionProber(max_workers=3, timeout=10)
+
+        versions = prober.probe(components)
+        assert list(versions) == [component_path for component_path, _, _ in components]
+        assert versions['Chassis1/C0'] == ('0', None)
+        assert versions['Chassis1/FW'] == ('fw', 'fw-new')
+
+    def test_probe_timeout(self):
+        hang = threading.Event()
+        components = [('Chassis1/HUNG1', Component('1', hang=hang), None),
+                      ('Chassis1/OK', Component('2'), None),
+                      ('Chassis1/HUNG2', Component('3', hang=hang), None)]
+        prober = fwutil_lib.ComponentVersionProber(max_workers=8, timeout=0.5)
+
+        try:
+            start = time.time()
+            with mock.patch.object(fwutil_lib.log_helper, 'print_warning') as mock_warning, \
+                    mock.patch.object(fwutil_lib.threading, 'Thread', wraps=threading.Thread) as mock_thread:
+                versions = prober.probe(components)
+            elapsed = time.time() - start
+
+            # a single deadline, not one per hung component
+            assert elapsed < 1
+            assert versions == {'Chassis1/HUNG1': (None, None),
+                                'Chassis1/OK': ('2', None),
+                                'Chassis1/HUNG2': (None, None)}
+            assert mock_warning.call_count == 2
+            # the hung workers do not keep the interpreter from exiting
+            assert mock_thread.call_count == len(components)
+            assert all(call[1]['daemon'] for call in mock_thread.call_args_list)
+        finally:
+            hang.set()
+
+    def test_probe_queued_timeout(self):
+        hang = threading.Event()
+        components = [('Chassis1/HUNG', Component('1', hang=hang), None),
+                      ('Chassis1/SLOW', Component('2', delay=0.3), None)]
+        prober = fwutil_lib.ComponentVersionProber(max_workers=1, timeout=0.5)
+
+        try:
+            with mock.patch.object(fwutil_lib.log_helper, 'print_warning'):
+                versions = prober.probe(components)
+        finally:
+            hang.set()
+
+        # the timeout of a queued component starts with its probe, not with the first one
+        assert versions == {'Chassis1/HUNG': (None, None),
+                            'Chassis1/SLOW': ('2', None)}
+
+    def test_probe_error(self):
+        component = Component('1')
+        component.get_firmware_version = mock.Mock(side_effect=RuntimeError('no access'))
+        prober = fwutil_lib.ComponentVersionProber(timeout=10)
+
+        with pytest.raises(RuntimeError):
+            prober.probe([('Chassis1/BIOS', component, None)])
+
+    def test_probe_cache(self, tmp_path):
+        cache = fwutil_lib.FirmwareVersionCache(filename=str(tmp_path / 'fw_version_cache'), ttl=60)
+        component = Component('1')
+        prober = fwutil_lib.ComponentVersionProber(cache, timeout=10)
+
+        assert prober.probe([('Chassis1/BIOS', component, None)]) == {'Chassis1/BIOS': ('1', None)}
+        assert prober.probe([('Chassis1/BIOS', component, None)]) == {'Chassis1/BIOS': ('1', None)}
+        assert component.calls == 1
+
+        cache.invalidate('Chassis1/BIOS')
+        prober.probe([('Chassis1/BIOS', component, None)])
+        assert component.calls == 2
+
+
+class TestComponentUpdateProvider(object):
+    def get_provider(self, tmp_path, components, versions):
+        chassis = mock.MagicMock()
+        chassis.get_name.return_value = 'Chassis1'
+        chassis.get_num_components.return_value = len(components)
+        chassis.get_all_components.return_value = components
+        chassis.get_all_modules.return_value = []
+        platform = mock.MagicMock()
+        platform.get_chassis.return_value = chassis
+
+        pcp = mock.MagicMock()
+        pcp.VERSION_KEY = 'version'
+        pcp.FIRMWARE_KEY = 'firmware'
+        pcp.UTILITY_KEY = 'utility'
+        pcp.chassis_component_map = {'Chassis1': {
+            component.get_name(): {'firmware': '/fw/{}.bin'.format(component.get_name()),
+                                   'version': versions[component.get_name()]}
+            for component in components
+        }}
+        pcp.module_component_map = {}
+
+        with mock.patch.object(fwutil_lib, 'Platform', return_value=platform), \
+                mock.patch.object(fwutil_lib, 'PlatformComponentsParser', return_value=pcp), \
+                mock.patch.object(fwutil_lib, 'FIRMWARE_UPDATE_DIR', str(tmp_path)), \
+                mock.patch.object(fwutil_lib, 'FIRMWARE_AU_STATUS_DIR', str(tmp_path)):
+            cup = fwutil_lib.ComponentUpdateProvider()
+        cup.version_prober = fwutil_lib.ComponentVersionProber(timeout=0.2)
+        return cup
+
+    def test_timed_out_component(self, tmp_path):
+        hang = threading.Event()
+        components = [Component('1', name='BIOS'), Component('2', hang=hang, name='CPLD')]
+        cup = self.get_provider(tmp_path, components, {'BIOS': '2', 'CPLD': '3'})
+
+        try:
+            with mock.patch.object(fwutil_lib.log_helper, 'print_warning'):
+                status_table, _ = cup.get_updates_status()
+                update_available_components = cup.get_update_available_components()
+        finally:
+            hang.set()
+
+        assert [row[-2:] for row in status_table] == [['1 / 2', cup.FW_STATUS_UPDATE_REQUIRED],
+                                                      ['N/A / 3', cup.FW_STATUS_UNKNOWN]]
+        # a component whose version was not read is never updated
+        assert [row[3] for row in update_available_components] == ['BIOS']
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import tarfile
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+generate_dump_path = os.path.join(scripts_path, "generate_dump")
+
+EXT_TAR_FAILED = 5
+BASE = 'sonic_dump_test'
+
+
+def get_definitions():
+    """ Globals and functions of generate_dump, without its option parsing and locking """
+    with open(generate_dump_path) as f:
+        script = f.read()
+    return script[:script.index('while getopts')]
+
+
+def run_generate_dump(tmp_path, commands):
+    """ Run <commands> between the start and the end of the archive, as main does """
+    script = get_definitions() + """
+DUMPDIR={dumpdir}
+BASE={base}
+TARDIR=$DUMPDIR/$BASE
+TARFILE=$DUMPDIR/$BASE.tar
+LOGDIR=$TARDIR/dump
+ARCHIVE_FIFO=$TARDIR/.archive
+SNAPSHOTDIR=$TARDIR/.snapshots
+GENERATE_DUMP={generate_dump}
+TECHSUPPORT_TIME_INFO={dumpdir}/time_info
+COLLECTOR_JOBS=4
+
+trap 'handle_error $? $LINENO' ERR
+$MKDIR -p $TARDIR
+start_archive_writer
+save_generate_dump
+{commands}
+wait_collectors
+stop_archive_writer
+exit $RETURN_CODE
+""".format(dumpdir=str(tmp_path), base=BASE, generate_dump=generate_dump_path, commands=commands)
+    return subprocess.run(['bash', '-c', script], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+
+
+class TestGenerateDump(object):
+    def test_archive(self, tmp_path):
+        result = run_generate_dump(tmp_path, """
+for i in $(seq 20); do
+    save_cmd "echo output$i" file$i
+done
+""")
+        print(result.stdout, result.stderr)
+        assert result.returncode == 0
+
+        with tarfile.open(str(tmp_path / (BASE + '.tar'))) as tar:
+            members = {member.name: member for member in tar}
+            # the script itself, dereferenced
+            with open(generate_dump_path, 'rb') as f:
+                assert tar.extractfile(members[BASE + '/generate_dump']).read() == f.read()
+            for i in range(1, 21):
+                member = members['{}/dump/file{}'.format(BASE, i)]
+                assert member.isfile()
+                assert tar.extractfile(member).read() == 'output{}\n'.format(i).encode()
+
+        # archived files are removed from the staging directory
+        assert not [name for _, _, names in os.walk(str(tmp_path / BASE)) for name in names]
+
+    def test_archive_failure(self, tmp_path):
+        result = run_generate_dump(tmp_path, "archive_add $BASE/missing")
+        print(result.stdout, result.stderr)
+        assert result.returncode == EXT_TAR_FAILED
+        assert 'tar operation failed' in result.stderr
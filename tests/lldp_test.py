@@ -1,8 +1,11 @@
 import os
+from unittest import mock
 
 from click.testing import CliRunner
 from utilities_common.general import load_module_from_source
 
+from .mock_tables import dbconnector
+
 test_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(test_path)
 scripts_path = os.path.join(modules_path, "scripts")
@@ -11,6 +14,8 @@ scripts_path = os.path.join(modules_path, "scripts")
 lldpshow_path = os.path.join(scripts_path, 'lldpshow')
 lldpshow = load_module_from_source('lldpshow', lldpshow_path)
 
+mock_db_path = os.path.join(test_path, 'lldp_input', 'appl_db')
+
 # Expected output for 2 remote MACs on same physical interface
 expected_2MACs_Ethernet0_output = \
 ('Capability codes: (R) Router, (B) Bridge, (O) Other\n'
@@ -23,6 +28,16 @@ expected_2MACs_Ethernet0_output = \
  '--------------------------------------------------\n'
  'Total entries displayed:  2')
 
+expected_appl_db_output = \
+('Capability codes: (R) Router, (B) Bridge, (O) Other\n'
+ 'LocalPort    RemoteDevice    RemotePortID       Capability    RemotePortDescr\n'
+ '-----------  --------------  -----------------  ------------  ------------------\n'
+ 'Ethernet0    ARISTA01T2      Ethernet1/51       BR            sonic:fortyGigE0/0\n'
+ 'Ethernet4    dummy           00:00:00:00:00:02  OR            Second MAC\n'
+ 'eth0         mgmt-switch     Ethernet1/25       B             Ethernet1/25\n'
+ '--------------------------------------------------\n'
+ 'Total entries displayed:  3')
+
 expected_lldpctl_xml_output = \
 ['<?xml version="1.0" encoding="UTF-8"?>\n\
         <lldp label="LLDP neighbors">\n\
@@ -74,6 +89,52 @@ class TestLldp(object):
         output_summary = lldp.get_summary_output(lldp_detail_info=False)
         assert output_summary == expected_2MACs_Ethernet0_output
 
+    def test_show_lldp_table_from_appl_db(self):
+        dbconnector.dedicated_dbs['APPL_DB'] = mock_db_path
+        try:
+            lldp = lldpshow.Lldpshow()
+            with mock.patch.object(lldp, 'run_lldpctl') as mock_lldpctl:
+                lldp.get_info(lldp_detail_info=False, lldp_port=None)
+                mock_lldpctl.assert_not_called()
+        finally:
+            dbconnector.dedicated_dbs['APPL_DB'] = None
+        lldp.parse_info(lldp_detail_info=False)
+        output_summary = lldp.get_summary_output(lldp_detail_info=False)
+        assert output_summary == expected_appl_db_output
+
+    def test_show_lldp_table_empty_appl_db(self):
+        lldp = lldpshow.Lldpshow()
+        lldp.get_info(lldp_detail_info=False, lldp_port=None)
+        output_summary = lldp.get_summary_output(lldp_detail_info=False)
+        assert output_summary.endswith('Total entries displayed:  0')
+
+    def test_show_lldp_table_lldpctl_fallback(self):
+        lldp = lldpshow.Lldpshow()
+        with mock.patch.object(lldp, 'get_info_from_db', side_effect=Exception('no db')), \
+                mock.patch.object(lldp, 'run_lldpctl', return_value=(0, expected_lldpctl_xml_output[0], None)):
+            lldp.get_info(lldp_detail_info=False, lldp_port=None)
+        lldp.parse_info(lldp_detail_info=False)
+        output_summary = lldp.get_summary_output(lldp_detail_info=False)
+        assert output_summary == expected_2MACs_Ethernet0_output
+
+    def test_show_lldp_detail_runs_lldpctl_per_instance(self):
+        lldp = lldpshow.Lldpshow()
+        lldp.lldp_instance = [0, 1, '']
+        lldp.lldp_interface = ['Ethernet0 ', 'Ethernet4 ', '']
+        outputs = {0: 'Interface: Ethernet0\n', 1: 'Interface: Ethernet4\n', '': 'Interface: eth0\n'}
+        with mock.patch('subprocess.Popen') as mock_popen:
+            def popen(cmd, **kwargs):
+                proc = mock.MagicMock()
+                instance = cmd.split()[4][len('lldp'):]
+                proc.communicate.return_value = (outputs[int(instance) if instance else ''], None)
+                proc.wait.return_value = 0
+                return proc
+            mock_popen.side_effect = popen
+            lldp.get_info(lldp_detail_info=True, lldp_port='Ethernet4')
+            assert mock_popen.call_count == 3
+
+        assert lldp.lldpraw == ['Interface: Ethernet4\n']
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
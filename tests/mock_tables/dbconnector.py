@@ -1,4 +1,6 @@
 # MONKEY PATCH!!!
+import collections
+import functools
 import json
 import os
 import sys
@@ -7,6 +9,7 @@ from unittest import mock
 
 import mockredis
 import redis
+from mockredis.pipeline import MockRedisPipeline
 import swsssdk
 from sonic_py_common import multi_asic
 from swsssdk import SonicDBConfig, SonicV2Connector, ConfigDBConnector, ConfigDBPipeConnector
@@ -16,6 +19,34 @@ from swsscommon import swsscommon
 topo = None
 dedicated_dbs = {}
 
+# Commands and round trips issued to each DB, see reset_db_stats()
+db_stats = {}
+
+
+class DBStats(object):
+    def __init__(self):
+        self.commands = collections.Counter()
+        self.round_trips = 0
+
+    @property
+    def total_commands(self):
+        return sum(self.commands.values())
+
+    def __repr__(self):
+        return 'DBStats(round_trips={}, commands={})'.format(self.round_trips, dict(self.commands))
+
+
+def reset_db_stats():
+    db_stats.clear()
+
+
+def get_db_stats(db_name):
+    return db_stats.setdefault(db_name, DBStats())
+
+
+def total_round_trips():
+    return sum(stats.round_trips for stats in db_stats.values())
+
 def clean_up_config():
     # Set SonicDBConfig variables to initial state
     # so that it can be loaded with single or multiple
@@ -54,6 +85,8 @@ def connect_SonicV2Connector(self, db_name, retry_on=True):
         self.dbintf.redis_kwargs['db_name'] = dedicated_dbs[db_name]
     else:
         self.dbintf.redis_kwargs['db_name'] = db_name
+    # Commands are counted against the DB name, even for dedicated DB files
+    self.dbintf.redis_kwargs['stats_db_name'] = db_name
     self.dbintf.redis_kwargs['decode_responses'] = True
     _old_connect_SonicV2Connector(self, db_name, retry_on)
 
@@ -88,8 +121,38 @@ class MockPubSub:
 
 INPUT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Hashes loaded from the DB files, by file name, modification time and size
+_loaded_db_cache = {}
+
+
+# Client methods that do not send a command to the DB by themselves
+UNCOUNTED_METHODS = {
+    'call', 'do_expire', 'execute', 'from_url', 'hscan_iter', 'lock', 'multi', 'pipeline',
+    'register_script', 'scan_iter', 'sscan_iter', 'transaction', 'unwatch', 'watch', 'zscan_iter'
+}
+
+
+class CountingPipeline(MockRedisPipeline):
+    """
+    Pipeline that accounts all its queued commands as a single round trip.
+    """
+    def execute(self):
+        client = self.mock_redis
+        if self.commands and client.counting:
+            get_db_stats(client.stats_db_name).round_trips += 1
+        client.pipelined = True
+        try:
+            return super(CountingPipeline, self).execute()
+        finally:
+            client.pipelined = False
+
 
 class SwssSyncClient(mockredis.MockRedis):
+    # Commands are only counted once the DB content is loaded
+    counting = False
+    pipelined = False
+    nested = 0
+
     def __init__(self, *args, **kwargs):
         super(SwssSyncClient, self).__init__(strict=True, *args, **kwargs)
         # Namespace is added in kwargs specifically for unit-test
@@ -97,30 +160,48 @@ class SwssSyncClient(mockredis.MockRedis):
         topo = kwargs.pop('topo')
         namespace = kwargs.pop('namespace')
         db_name = kwargs.pop('db_name')
+        self.stats_db_name = kwargs.pop('stats_db_name', db_name)
         self.decode_responses = kwargs.pop('decode_responses', False) == True
         fname = db_name.lower() + ".json"
         self.pubsub = MockPubSub()
 
         if namespace is not None and namespace is not multi_asic.DEFAULT_NAMESPACE:
-            fname = os.path.join(INPUT_DIR, namespace, fname)
+            # A topology directory may hold its own namespace directories
+            if topo is not None and os.path.exists(os.path.join(INPUT_DIR, topo, namespace, fname)):
+                fname = os.path.join(INPUT_DIR, topo, namespace, fname)
+            else:
+                fname = os.path.join(INPUT_DIR, namespace, fname)
         elif topo is not None:
             fname = os.path.join(INPUT_DIR, topo, fname)
         else:
             fname = os.path.join(INPUT_DIR, fname)
 
         if os.path.exists(fname):
-            with open(fname) as f:
-                js = json.load(f)
-                for k, v in js.items():
-                    if 'expireat' in v and 'ttl' in v and 'type' in v and 'value' in v:
-                        # database is in redis-dump format
-                        if v['type'] == 'hash':
-                            # ignore other types for now since sonic has hset keys only in the db
-                            for attr, value in v['value'].items():
+            # Large generated DBs are loaded once and copied for every connection
+            stat = os.stat(fname)
+            cache_key = (fname, stat.st_mtime_ns, stat.st_size, self.decode_responses)
+            if cache_key not in _loaded_db_cache:
+                with open(fname) as f:
+                    js = json.load(f)
+                    for k, v in js.items():
+                        if 'expireat' in v and 'ttl' in v and 'type' in v and 'value' in v:
+                            # database is in redis-dump format
+                            if v['type'] == 'hash':
+                                # ignore other types for now since sonic has hset keys only in the db
+                                for attr, value in v['value'].items():
+                                    self.hset(k, attr, value)
+                        else:
+                            for attr, value in v.items():
                                 self.hset(k, attr, value)
-                    else:
-                        for attr, value in v.items():
-                            self.hset(k, attr, value)
+                _loaded_db_cache[cache_key] = {k: dict(v) for k, v in self.redis.items()}
+            else:
+                for k, v in _loaded_db_cache[cache_key].items():
+                    self.redis[k] = dict(v)
+
+        self.counting = True
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return CountingPipeline(self, transaction, shard_hint)
 
     # Patch mockredis/mockredis/client.py
     # The offical implementation assume decode_responses=False
@@ -168,6 +249,15 @@ class SwssSyncClient(mockredis.MockRedis):
         if self.decode_responses:
             return value.decode('utf-8')
 
+    # Patch mockredis/mockredis/client.py
+    # redis-py >= 3.5 also takes the fields of a hash as a mapping
+    def hset(self, hashkey, attribute=None, value=None, mapping=None):
+        """Emulate hset."""
+        fields = dict(mapping or {})
+        if attribute is not None:
+            fields[attribute] = value
+        return sum(super(SwssSyncClient, self).hset(hashkey, field, data) for field, data in fields.items())
+
     # Patch mockredis/mockredis/client.py
     # The official implementation will filter out keys with a slash '/'
     # ref: https://github.com/locationlabs/mockredis/blob/master/mockredis/client.py
@@ -184,6 +274,29 @@ class SwssSyncClient(mockredis.MockRedis):
         return [key for key in self.redis if regex.match(key)]
 
 
+def _counted(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Commands issued by the client implementation itself are not counted
+        if self.counting and not self.nested:
+            stats = get_db_stats(self.stats_db_name)
+            stats.commands[method.__name__] += 1
+            if not self.pipelined:
+                stats.round_trips += 1
+        self.nested += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.nested -= 1
+    return wrapper
+
+
+for _name in dir(SwssSyncClient):
+    if _name.startswith('_') or _name in UNCOUNTED_METHODS or not callable(getattr(SwssSyncClient, _name)):
+        continue
+    setattr(SwssSyncClient, _name, _counted(getattr(SwssSyncClient, _name)))
+
+
 class PortCounter:
     pass
 
@@ -0,0 +1,240 @@
+"""
+Synthetic scale fixtures for the mock DB connector.
+
+generate_dbs() builds a consistent set of CONFIG_DB, APPL_DB, STATE_DB,
+ASIC_DB and COUNTERS_DB contents for a ScaleSpec: every port has its
+CONFIG_DB/APPL_DB/STATE_DB entries, ASIC_DB port, host interface and
+bridge port objects, COUNTERS_DB name map entry, counters and rates, and
+so on for queues, VLANs, FDB entries, routes and ACL rules. write_dbs()
+writes them as <db>.json files in a directory that the mock connector can
+load through dbconnector.topo, one sub directory per namespace:
+
+    path = scale_fixture.write_dbs(ScaleSpec(ports=512), str(tmp_path))
+    dbconnector.topo = path
+"""
+
+import json
+import os
+from collections import namedtuple
+
+ScaleSpec = namedtuple('ScaleSpec', [
+    'ports',              # front panel ports per namespace
+    'queues',             # unicast queues per port
+    'vlans',              # VLANs, ports are spread round robin over them
+    'fdb',                # FDB entries per namespace
+    'routes',             # IPv4 routes per namespace
+    'acl_rules',          # rules of the DATAACL table
+    'namespaces',         # 0 for a single ASIC device, asic0..asicN-1 otherwise
+])
+ScaleSpec.__new__.__defaults__ = (32, 8, 1, 0, 0, 0, 0)
+
+PORT_STATS = [
+    'SAI_PORT_STAT_IF_IN_UCAST_PKTS', 'SAI_PORT_STAT_IF_IN_NON_UCAST_PKTS', 'SAI_PORT_STAT_IF_IN_ERRORS',
+    'SAI_PORT_STAT_IF_IN_DISCARDS', 'SAI_PORT_STAT_ETHER_RX_OVERSIZE_PKTS', 'SAI_PORT_STAT_IF_OUT_UCAST_PKTS',
+    'SAI_PORT_STAT_IF_OUT_NON_UCAST_PKTS', 'SAI_PORT_STAT_IF_OUT_ERRORS', 'SAI_PORT_STAT_IF_OUT_DISCARDS',
+    'SAI_PORT_STAT_ETHER_TX_OVERSIZE_PKTS', 'SAI_PORT_STAT_IF_IN_OCTETS', 'SAI_PORT_STAT_IF_OUT_OCTETS',
+    'SAI_PORT_STAT_IF_IN_MULTICAST_PKTS', 'SAI_PORT_STAT_IF_IN_BROADCAST_PKTS',
+    'SAI_PORT_STAT_IF_OUT_MULTICAST_PKTS', 'SAI_PORT_STAT_IF_OUT_BROADCAST_PKTS',
+    'SAI_PORT_STAT_ETHER_STATS_JABBERS', 'SAI_PORT_STAT_ETHER_STATS_FRAGMENTS',
+    'SAI_PORT_STAT_ETHER_STATS_UNDERSIZE_PKTS', 'SAI_PORT_STAT_IP_IN_RECEIVES',
+    'SAI_PORT_STAT_IF_IN_FEC_CORRECTABLE_FRAMES', 'SAI_PORT_STAT_IF_IN_FEC_NOT_CORRECTABLE_FRAMES',
+    'SAI_PORT_STAT_IF_IN_FEC_SYMBOL_ERRORS', 'SAI_PORT_STAT_PFC_0_RX_PKTS', 'SAI_PORT_STAT_PFC_0_TX_PKTS',
+] + ['SAI_PORT_STAT_ETHER_{}_PKTS_{}_OCTETS'.format(direction, size)
+     for direction in ['IN', 'OUT']
+     for size in ['64', '65_TO_127', '128_TO_255', '256_TO_511', '512_TO_1023', '1024_TO_1518',
+                  '1519_TO_2047', '2048_TO_4095', '4096_TO_9216', '9217_TO_16383']]
+
+QUEUE_STATS = [
+    'SAI_QUEUE_STAT_PACKETS', 'SAI_QUEUE_STAT_BYTES', 'SAI_QUEUE_STAT_DROPPED_PACKETS', 'SAI_QUEUE_STAT_DROPPED_BYTES'
+]
+
+PORT_RATES = ['RX_BPS', 'RX_PPS', 'RX_UTIL', 'TX_BPS', 'TX_PPS', 'TX_UTIL']
+
+DB_NAMES = ['CONFIG_DB', 'APPL_DB', 'STATE_DB', 'ASIC_DB', 'COUNTERS_DB']
+
+SWITCH_OID = 'oid:0x21000000000000'
+VR_OID = 'oid:0x3000000000022'
+PORT_SPEED = '100000'
+LANES_PER_PORT = 4
+
+# OID type prefixes, the low bits are the object index
+OID_PORT = 0x1000000000000
+OID_QUEUE = 0x15000000000000
+OID_HOSTIF = 0xd000000000000
+OID_BRIDGE_PORT = 0x3a000000000000
+OID_VLAN = 0x26000000000000
+OID_NEXT_HOP = 0x40000000000000
+OID_ACL_COUNTER = 0x9000000000000
+
+
+def namespace_list(spec):
+    if not spec.namespaces:
+        return ['']
+    return ['asic{}'.format(i) for i in range(spec.namespaces)]
+
+
+def oid(prefix, index):
+    return 'oid:0x{:x}'.format(prefix + index)
+
+
+def port_name(index):
+    return 'Ethernet{}'.format(index * LANES_PER_PORT)
+
+
+def mac_address(index):
+    return '00:{:02X}:{:02X}:{:02X}:{:02X}:{:02X}'.format(
+        (index >> 32) & 0xff, (index >> 24) & 0xff, (index >> 16) & 0xff, (index >> 8) & 0xff, index & 0xff)
+
+
+def route_prefix(index):
+    return '10.{}.{}.0/24'.format((index >> 8) & 0xff, index & 0xff) if index < 0x10000 else \
+        '11.{}.{}.{}/32'.format((index >> 16) & 0xff, (index >> 8) & 0xff, index & 0xff)
+
+
+def counter_value(index, stat):
+    # Arbitrary but stable and different for every object and stat
+    return str((index + 1) * 1000 + stat)
+
+
+def generate_dbs(spec, ns_index=0):
+    """
+    Return {db name: {key: {field: value}}} for namespace number <ns_index>
+    of <spec>. Ports are numbered across namespaces so that every namespace
+    has its own port names.
+    """
+    dbs = {db_name: {} for db_name in DB_NAMES}
+    config_db = dbs['CONFIG_DB']
+    appl_db = dbs['APPL_DB']
+    state_db = dbs['STATE_DB']
+    asic_db = dbs['ASIC_DB']
+    counters_db = dbs['COUNTERS_DB']
+
+    first_port = ns_index * spec.ports
+    ports = [port_name(first_port + i) for i in range(spec.ports)]
+    vlans = ['Vlan{}'.format(1000 + i) for i in range(spec.vlans)]
+
+    port_name_map = {}
+    queue_name_map = {}
+    queue_port_map = {}
+    queue_index_map = {}
+    queue_type_map = {}
+    for i, port in enumerate(ports):
+        index = first_port + i
+        port_oid = oid(OID_PORT, index)
+        lanes = ','.join(str(index * LANES_PER_PORT + lane) for lane in range(LANES_PER_PORT))
+        alias = 'etp{}'.format(index + 1)
+
+        config_db['PORT|' + port] = {
+            'admin_status': 'up', 'alias': alias, 'index': str(index), 'lanes': lanes,
+            'mtu': '9100', 'speed': PORT_SPEED, 'description': 'ARISTA{:02d}T1:Ethernet1'.format(index + 1)
+        }
+        appl_db['PORT_TABLE:' + port] = {
+            'admin_status': 'up', 'oper_status': 'up', 'alias': alias, 'index': str(index), 'lanes': lanes,
+            'mtu': '9100', 'speed': PORT_SPEED, 'fec': 'rs', 'description': 'ARISTA{:02d}T1:Ethernet1'.format(index + 1)
+        }
+        state_db['PORT_TABLE|' + port] = {'state': 'ok', 'netdev_oper_status': 'up', 'speed': PORT_SPEED}
+
+        asic_db['ASIC_STATE:SAI_OBJECT_TYPE_PORT:' + port_oid] = {
+            'SAI_PORT_ATTR_ADMIN_STATE': 'true', 'SAI_PORT_ATTR_MTU': '9122', 'SAI_PORT_ATTR_SPEED': PORT_SPEED
+        }
+        asic_db['ASIC_STATE:SAI_OBJECT_TYPE_HOSTIF:' + oid(OID_HOSTIF, index)] = {
+            'SAI_HOSTIF_ATTR_NAME': port, 'SAI_HOSTIF_ATTR_OBJ_ID': port_oid,
+            'SAI_HOSTIF_ATTR_OPER_STATUS': 'true', 'SAI_HOSTIF_ATTR_TYPE': 'SAI_HOSTIF_TYPE_NETDEV'
+        }
+        asic_db['ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:' + oid(OID_BRIDGE_PORT, index)] = {
+            'SAI_BRIDGE_PORT_ATTR_ADMIN_STATE': 'true', 'SAI_BRIDGE_PORT_ATTR_PORT_ID': port_oid,
+            'SAI_BRIDGE_PORT_ATTR_TYPE': 'SAI_BRIDGE_PORT_TYPE_PORT'
+        }
+
+        port_name_map[port] = port_oid
+        counters_db['COUNTERS:' + port_oid] = {stat: counter_value(index, s) for s, stat in enumerate(PORT_STATS)}
+        counters_db['RATES:' + port_oid] = {rate: str(float(index + r)) for r, rate in enumerate(PORT_RATES)}
+
+        for q in range(spec.queues):
+            queue_oid = oid(OID_QUEUE, index * spec.queues + q)
+            queue_name_map['{}:{}'.format(port, q)] = queue_oid
+            queue_port_map[queue_oid] = port_oid
+            queue_index_map[queue_oid] = str(q)
+            queue_type_map[queue_oid] = 'SAI_QUEUE_TYPE_UNICAST'
+            counters_db['COUNTERS:' + queue_oid] = {
+                stat: counter_value(index * spec.queues + q, s) for s, stat in enumerate(QUEUE_STATS)
+            }
+
+        if vlans:
+            vlan = vlans[i % len(vlans)]
+            config_db['VLAN_MEMBER|{}|{}'.format(vlan, port)] = {'tagging_mode': 'untagged'}
+
+    counters_db['COUNTERS_PORT_NAME_MAP'] = port_name_map
+    if queue_name_map:
+        counters_db['COUNTERS_QUEUE_NAME_MAP'] = queue_name_map
+        counters_db['COUNTERS_QUEUE_PORT_MAP'] = queue_port_map
+        counters_db['COUNTERS_QUEUE_INDEX_MAP'] = queue_index_map
+        counters_db['COUNTERS_QUEUE_TYPE_MAP'] = queue_type_map
+
+    for v, vlan in enumerate(vlans):
+        vlan_id = 1000 + v
+        config_db['VLAN|' + vlan] = {'vlanid': str(vlan_id)}
+        config_db['VLAN_INTERFACE|' + vlan] = {'NULL': 'NULL'}
+        config_db['VLAN_INTERFACE|{}|192.{}.{}.1/24'.format(vlan, 168 + (v >> 8), v & 0xff)] = {'NULL': 'NULL'}
+        asic_db['ASIC_STATE:SAI_OBJECT_TYPE_VLAN:' + oid(OID_VLAN, vlan_id)] = {'SAI_VLAN_ATTR_VLAN_ID': str(vlan_id)}
+
+    if ports and vlans:
+        for f in range(spec.fdb):
+            index = first_port + f % len(ports)
+            vlan_id = 1000 + (f % len(ports)) % len(vlans)
+            key = json.dumps({'bvid': oid(OID_VLAN, vlan_id), 'mac': mac_address(f),
+                              'switch_id': SWITCH_OID}, separators=(',', ':'))
+            asic_db['ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:' + key] = {
+                'SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID': oid(OID_BRIDGE_PORT, index),
+                'SAI_FDB_ENTRY_ATTR_TYPE': 'SAI_FDB_ENTRY_TYPE_DYNAMIC'
+            }
+
+    for r in range(spec.routes):
+        prefix = route_prefix(r)
+        nexthop = r % max(len(ports), 1)
+        appl_db['ROUTE_TABLE:' + prefix] = {
+            'nexthop': '10.0.{}.{}'.format(nexthop >> 7, (nexthop & 0x7f) * 2 + 1),
+            'ifname': ports[nexthop] if ports else 'eth0'
+        }
+        key = json.dumps({'dest': prefix, 'switch_id': SWITCH_OID, 'vr': VR_OID}, separators=(',', ':'))
+        asic_db['ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY:' + key] = {
+            'SAI_ROUTE_ENTRY_ATTR_NEXT_HOP_ID': oid(OID_NEXT_HOP, nexthop)
+        }
+
+    if spec.acl_rules:
+        config_db['ACL_TABLE|DATAACL'] = {
+            'policy_desc': 'DATAACL', 'ports@': ','.join(ports), 'stage': 'ingress', 'type': 'L3'
+        }
+        acl_counter_map = {}
+        for a in range(spec.acl_rules):
+            rule = 'RULE_{}'.format(a + 1)
+            config_db['ACL_RULE|DATAACL|' + rule] = {
+                'PACKET_ACTION': 'FORWARD', 'PRIORITY': str(9999 - a),
+                'SRC_IP': '20.{}.{}.0/24'.format((a >> 8) & 0xff, a & 0xff)
+            }
+            counter_oid = oid(OID_ACL_COUNTER, a)
+            acl_counter_map['DATAACL:' + rule] = counter_oid
+            counters_db['COUNTERS:' + counter_oid] = {
+                'SAI_ACL_COUNTER_ATTR_PACKETS': str(a * 2), 'SAI_ACL_COUNTER_ATTR_BYTES': str(a * 128)
+            }
+        counters_db['ACL_COUNTER_RULE_MAP'] = acl_counter_map
+
+    config_db['FLEX_COUNTER_TABLE|PORT'] = {'FLEX_COUNTER_STATUS': 'enable', 'POLL_INTERVAL': '1000'}
+    config_db['FLEX_COUNTER_TABLE|QUEUE'] = {'FLEX_COUNTER_STATUS': 'enable', 'POLL_INTERVAL': '10000'}
+
+    return dbs
+
+
+def write_dbs(spec, path):
+    """
+    Write the DBs of every namespace of <spec> as <db>.json files in <path>,
+    or in <path>/<namespace> for multi ASIC specs, and return <path>.
+    """
+    for ns_index, namespace in enumerate(namespace_list(spec)):
+        ns_path = os.path.join(path, namespace)
+        if not os.path.isdir(ns_path):
+            os.makedirs(ns_path)
+        for db_name, data in generate_dbs(spec, ns_index).items():
+            with open(os.path.join(ns_path, db_name.lower() + '.json'), 'w') as f:
+                json.dump(data, f)
+    return path
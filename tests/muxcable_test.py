@@ -1,3 +1,5 @@
+import itertools
+import json
 import os
 import sys
 import traceback
@@ -1197,6 +1199,9 @@ class TestMuxcable(object):
     @mock.patch('show.muxcable.get_hwmode_mux_direction_port', mock.MagicMock(return_value={0: 0,
                                                                                             1: "standby",
                                                                                             2: "True"}))
+    @mock.patch('show.muxcable.get_hwmode_mux_direction_ports', mock.MagicMock(side_effect=lambda db, ports: {port: {0: 0,
+                                                                                                              1: "active",
+                                                                                                              2: "True"} for port in ports}))
     @mock.patch('show.muxcable.check_port_in_mux_cable_table', mock.MagicMock(return_value=True))
     @mock.patch('utilities_common.platform_sfputil_helper.get_logical_list', mock.MagicMock(return_value=["Ethernet0", "Ethernet12"]))
     @mock.patch('utilities_common.platform_sfputil_helper.get_asic_id_for_logical_port', mock.MagicMock(return_value=0))
@@ -1269,6 +1274,9 @@ class TestMuxcable(object):
     @mock.patch('show.muxcable.get_hwmode_mux_direction_port', mock.MagicMock(return_value={0: 0,
                                                                                             1: "sucess",
                                                                                             2: "True"}))
+    @mock.patch('show.muxcable.get_hwmode_mux_direction_ports', mock.MagicMock(side_effect=lambda db, ports: {port: {0: 0,
+                                                                                                              1: "standby",
+                                                                                                              2: "True"} for port in ports}))
     @mock.patch('show.muxcable.check_port_in_mux_cable_table', mock.MagicMock(return_value=True))
     @mock.patch('utilities_common.platform_sfputil_helper.get_logical_list', mock.MagicMock(return_value=["Ethernet0", "Ethernet12"]))
     @mock.patch('utilities_common.platform_sfputil_helper.get_asic_id_for_logical_port', mock.MagicMock(return_value=0))
@@ -1284,6 +1292,7 @@ class TestMuxcable(object):
 
         result = runner.invoke(show.cli.commands["muxcable"].commands["hwmode"].commands["muxdirection"], obj=db)
         assert result.exit_code == 0
+        assert result.output == show_muxcable_hwmode_muxdirection_standby_expected_output
 
     @mock.patch('config.muxcable.delete_all_keys_in_db_table', mock.MagicMock(return_value=0))
     @mock.patch('config.muxcable.update_and_get_response_for_xcvr_cmd', mock.MagicMock(return_value={0: 0,
@@ -1765,6 +1774,9 @@ class TestMuxcable(object):
     @mock.patch('show.muxcable.get_hwmode_mux_direction_port', mock.MagicMock(return_value={0: 0,
                                                                                             1: "standby",
                                                                                             2: "True"}))
+    @mock.patch('show.muxcable.get_hwmode_mux_direction_ports', mock.MagicMock(side_effect=lambda db, ports: {port: {0: 0,
+                                                                                                              1: "active",
+                                                                                                              2: "True"} for port in ports}))
     @mock.patch('show.muxcable.check_port_in_mux_cable_table', mock.MagicMock(return_value=True))
     @mock.patch('utilities_common.platform_sfputil_helper.get_logical_list', mock.MagicMock(return_value=["Ethernet0", "Ethernet12"]))
     @mock.patch('utilities_common.platform_sfputil_helper.get_asic_id_for_logical_port', mock.MagicMock(return_value=0))
@@ -1837,6 +1849,9 @@ class TestMuxcable(object):
     @mock.patch('show.muxcable.get_hwmode_mux_direction_port', mock.MagicMock(return_value={0: 0,
                                                                                             1: "sucess",
                                                                                             2: "True"}))
+    @mock.patch('show.muxcable.get_hwmode_mux_direction_ports', mock.MagicMock(side_effect=lambda db, ports: {port: {0: 0,
+                                                                                                              1: "standby",
+                                                                                                              2: "True"} for port in ports}))
     @mock.patch('show.muxcable.check_port_in_mux_cable_table', mock.MagicMock(return_value=True))
     @mock.patch('utilities_common.platform_sfputil_helper.get_logical_list', mock.MagicMock(return_value=["Ethernet0", "Ethernet12"]))
     @mock.patch('utilities_common.platform_sfputil_helper.get_asic_id_for_logical_port', mock.MagicMock(return_value=0))
@@ -1852,6 +1867,7 @@ class TestMuxcable(object):
 
         result = runner.invoke(show.cli.commands["muxcable"].commands["hwmode"].commands["muxdirection"], obj=db)
         assert result.exit_code == 0
+        assert result.output == show_muxcable_hwmode_muxdirection_standby_expected_output
 
     @mock.patch('config.muxcable.delete_all_keys_in_db_table', mock.MagicMock(return_value=0))
     @mock.patch('config.muxcable.update_and_get_response_for_xcvr_cmd', mock.MagicMock(return_value={0: 0,
@@ -2243,6 +2259,92 @@ class TestMuxcable(object):
                                "enable"], obj=db)
         assert result.exit_code == 0
 
+    @mock.patch('show.muxcable.delete_all_keys_in_db_table', mock.MagicMock(return_value=0))
+    @mock.patch('show.muxcable.db_connect', mock.MagicMock(return_value=0))
+    @mock.patch('show.muxcable.swsscommon.Table', mock.MagicMock())
+    @mock.patch('show.muxcable.swsscommon.FieldValuePairs', mock.MagicMock())
+    @mock.patch('show.muxcable.swsscommon.CastSelectableToRedisSelectObj', mock.MagicMock())
+    @mock.patch('sonic_py_common.multi_asic.get_front_end_namespaces', mock.MagicMock(return_value=['']))
+    @mock.patch('sonic_py_common.multi_asic.get_asic_index_from_namespace', mock.MagicMock(return_value=0))
+    @mock.patch('utilities_common.platform_sfputil_helper.get_logical_list', mock.MagicMock(return_value=["Ethernet0", "Ethernet4", "Ethernet12"]))
+    @mock.patch('utilities_common.platform_sfputil_helper.get_asic_id_for_logical_port', mock.MagicMock(return_value=0))
+    @mock.patch('show.muxcable.platform_sfputil', mock.MagicMock(return_value={0: ["Ethernet12", "Ethernet0"]}))
+    def test_show_muxcable_xcvr_cmd_multiple_ports(self):
+        responses = [("Ethernet12", "SET", (("state", "standby"),)),
+                     ("Ethernet8", "SET", (("state", "active"),)),
+                     ("Ethernet0", "SET", (("state", "active"),))]
+        with mock.patch('show.muxcable.swsscommon.Select') as mock_select, \
+                mock.patch('show.muxcable.swsscommon.SubscriberStateTable') as mock_sub_table:
+            mock_select.TIMEOUT = 1
+            mock_select.OBJECT = 0
+            mock_select.return_value.select.side_effect = itertools.chain([(0, None)] * 3, itertools.repeat((1, None)))
+            mock_sub_table.return_value.pop.side_effect = responses
+
+            res_dicts = show.muxcable.update_and_get_response_for_xcvr_cmd_ports(
+                "state", "state", "True", "XCVRD_SHOW_HWMODE_DIR_CMD", None, "XCVRD_SHOW_HWMODE_DIR_RSP",
+                ["Ethernet0", "Ethernet4", "Ethernet12", "Ethernet16"], 0.1, None, "probe")
+
+        assert res_dicts["Ethernet0"] == {0: 0, 1: "active"}
+        assert res_dicts["Ethernet12"] == {0: 0, 1: "standby"}
+        # No response before the timeout
+        assert res_dicts["Ethernet4"] == {0: 1, 1: "unknown"}
+        # Not a valid logical port, no command sent
+        assert res_dicts["Ethernet16"] == {0: 1, 1: "unknown"}
+        assert "Ethernet8" not in res_dicts
+
+    @mock.patch('show.muxcable.delete_all_keys_in_db_table', mock.MagicMock(return_value=0))
+    @mock.patch('show.muxcable.db_connect', mock.MagicMock(return_value=0))
+    @mock.patch('show.muxcable.swsscommon.Table', mock.MagicMock())
+    @mock.patch('show.muxcable.swsscommon.FieldValuePairs', mock.MagicMock())
+    @mock.patch('show.muxcable.swsscommon.SubscriberStateTable', mock.MagicMock())
+    @mock.patch('sonic_py_common.multi_asic.get_front_end_namespaces', mock.MagicMock(return_value=['']))
+    @mock.patch('sonic_py_common.multi_asic.get_asic_index_from_namespace', mock.MagicMock(return_value=0))
+    @mock.patch('utilities_common.platform_sfputil_helper.get_logical_list', mock.MagicMock(return_value=["Ethernet0", "Ethernet4", "Ethernet12"]))
+    @mock.patch('utilities_common.platform_sfputil_helper.get_asic_id_for_logical_port', mock.MagicMock(return_value=0))
+    @mock.patch('show.muxcable.platform_sfputil', mock.MagicMock(return_value={0: ["Ethernet12", "Ethernet0"]}))
+    @mock.patch('show.muxcable.log')
+    @mock.patch('click.echo')
+    def test_show_muxcable_xcvr_cmd_port_timeout(self, mock_echo, mock_log):
+        with mock.patch('show.muxcable.swsscommon.Select') as mock_select:
+            mock_select.TIMEOUT = 1
+            mock_select.OBJECT = 0
+            mock_select.return_value.select.return_value = (1, None)
+
+            res_dict = show.muxcable.update_and_get_response_for_xcvr_cmd(
+                "state", "state", "True", "XCVRD_SHOW_HWMODE_DIR_CMD", None, "XCVRD_SHOW_HWMODE_DIR_RSP",
+                "Ethernet4", 0.1, None, "probe")
+
+        assert res_dict == {0: 1, 1: "unknown"}
+        # the timeout is logged, the output stays machine readable
+        mock_log.log_warning.assert_called_once_with("Did not receive a port response Ethernet4")
+        mock_echo.assert_not_called()
+
+    @mock.patch('show.muxcable.delete_all_keys_in_db_table', mock.MagicMock(return_value=0))
+    @mock.patch('show.muxcable.get_mux_cable_ports', mock.MagicMock(return_value=["Ethernet0", "Ethernet12"]))
+    @mock.patch('show.muxcable.update_and_get_response_for_xcvr_cmd_ports', mock.MagicMock(return_value={"Ethernet0": {0: 0, 1: "True"},
+                                                                                                           "Ethernet12": {0: 1, 1: "unknown"}}))
+    @mock.patch('show.muxcable.get_response_for_version', mock.MagicMock(return_value={"version_self_active": "0.6MS",
+                                                                                           "version_self_inactive": "0.6MS",
+                                                                                           "version_self_next": "0.6MS",
+                                                                                           "version_peer_active": "0.6MS",
+                                                                                           "version_peer_inactive": "0.6MS",
+                                                                                           "version_peer_next": "0.6MS",
+                                                                                           "version_nic_active": "0.6MS",
+                                                                                           "version_nic_inactive": "0.6MS",
+                                                                                           "version_nic_next": "0.6MS"}))
+    def test_show_muxcable_firmware_version_all(self):
+        runner = CliRunner()
+        db = Db()
+
+        result = runner.invoke(show.cli.commands["muxcable"].commands["firmware"].commands["version"], [
+                               "all", "--active"], obj=db)
+        assert result.exit_code == 0
+        assert json.loads(result.output) == {
+            "Ethernet0": {"version_self_active": "0.6MS", "version_peer_active": "0.6MS", "version_nic_active": "0.6MS"},
+            "Ethernet12": {"version_nic_active": "N/A", "version_peer_active": "N/A", "version_self_active": "N/A"},
+        }
+        show.muxcable.update_and_get_response_for_xcvr_cmd_ports.assert_called_once()
+
     @classmethod
     def teardown_class(cls):
         os.environ['UTILITIES_UNIT_TESTING'] = "0"
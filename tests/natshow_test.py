@@ -0,0 +1,90 @@
+import os
+import sys
+from io import StringIO
+from unittest import mock
+
+from utilities_common.general import load_module_from_source
+
+from .mock_tables import dbconnector
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+mock_db_path = os.path.join(test_path, "natshow_input")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+natshow_path = os.path.join(scripts_path, 'natshow')
+natshow = load_module_from_source('natshow', natshow_path)
+
+expected_translations = [
+    ('all', '10.0.0.1', '---', '65.55.45.5', '---'),
+    ('all', '---', '65.55.45.5', '---', '10.0.0.1'),
+    ('tcp', '20.0.0.1:4500', '---', '65.55.45.7:2000', '---'),
+    ('udp', '20.0.0.1:7000', '65.55.45.8:1200', '65.55.45.7:1100', '20.0.0.2:8000'),
+]
+
+expected_statistics = [
+    ('all', '10.0.0.1', '---', '802', '1009280'),
+    ('all', '---', '65.55.45.5', '23', '5590'),
+    ('tcp', '20.0.0.1:4500', '---', '110', '12460'),
+    ('udp', '20.0.0.1:7000', '65.55.45.8:1200', '128', '110204'),
+]
+
+expected_key_count_output = """
+Source NAT Entries         ..................... 2
+Destination NAT Entries    ..................... 1
+Double NAT Entries         ..................... 1
+Total Entries              ..................... 4
+
+"""
+
+
+class TestNatShow(object):
+    @classmethod
+    def setup_class(cls):
+        os.environ["UTILITIES_UNIT_TESTING"] = "1"
+        for db_name in ['APPL_DB', 'ASIC_DB', 'COUNTERS_DB']:
+            dbconnector.dedicated_dbs[db_name] = os.path.join(mock_db_path, db_name.lower())
+
+    def test_translations(self):
+        nat = natshow.NatShow()
+        nat.fetch_translations()
+        assert sorted(nat.nat_entries_list) == sorted(expected_translations)
+
+    def test_statistics(self):
+        nat = natshow.NatShow()
+        nat.fetch_statistics()
+        assert sorted(nat.nat_statistics_list) == sorted(expected_statistics)
+
+    def test_statistics_skip_entries_without_counters(self):
+        nat = natshow.NatShow()
+        rows = list(nat.iter_statistics())
+        # NAPT_TABLE:UDP:65.55.45.7:1030 has no counters
+        assert len(rows) == len(expected_statistics)
+        assert not [row for row in rows if '65.55.45.7:1030' in row]
+
+    def test_translations_key_count(self):
+        nat = natshow.NatShow()
+        with mock.patch.object(nat.asic_db, 'get_all') as mock_get_all:
+            nat.fetch_translations_key_count()
+            mock_get_all.assert_not_called()
+
+        with mock.patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            nat.display_translations_key_count()
+            assert mock_stdout.getvalue() == expected_key_count_output
+
+    def test_stream_output(self):
+        nat = natshow.NatShow()
+        with mock.patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            natshow.print_stream(natshow.STATISTICS_HEADER, nat.iter_statistics())
+            lines = mock_stdout.getvalue().splitlines()
+
+        assert lines[0].split() == ['Protocol', 'Source', 'Destination', 'Packets', 'Bytes']
+        assert sorted(tuple(line.split()) for line in lines[2:]) == sorted(expected_statistics)
+
+    @classmethod
+    def teardown_class(cls):
+        os.environ["UTILITIES_UNIT_TESTING"] = "0"
+        for db_name in ['APPL_DB', 'ASIC_DB', 'COUNTERS_DB']:
+            dbconnector.dedicated_dbs[db_name] = None
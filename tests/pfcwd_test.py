@@ -47,6 +47,43 @@ class TestPfcwd(object):
     def test_pfcwd_show_stats_invalid_queue(self):
         self.executor(testData['pfcwd_show_stats_invalid_queue'])
 
+    def test_pfcwd_show_stats_watch(self):
+        import pfcwd.main as pfcwd
+        runner = CliRunner()
+        db = Db()
+
+        def storm(interval):
+            db.db.set(db.db.COUNTERS_DB, 'COUNTERS:oid:0x1500000000035a', 'PFC_WD_QUEUE_STATS_DEADLOCK_DETECTED', '3')
+            db.db.set(db.db.COUNTERS_DB, 'COUNTERS:oid:0x1500000000035a', 'PFC_WD_QUEUE_STATS_TX_DROPPED_PACKETS', '350')
+
+        with patch('pfcwd.main.time') as mock_time:
+            mock_time.time.side_effect = [100.0, 102.0]
+            mock_time.sleep.side_effect = storm
+            result = runner.invoke(
+                pfcwd.cli.commands['show'].commands['stats'],
+                ['--watch', '--count', '2', 'Ethernet0:3', 'Ethernet4:3'], obj=db
+            )
+        print(result.output)
+        assert result.exit_code == 0
+        mock_time.sleep.assert_called_once_with(1)
+
+        first, last = result.output.split('Every 1s: ')[1:]
+        assert first.startswith('2 queues, 0 changed')
+        assert 'Ethernet0:3' not in first
+        assert last.startswith('2 queues, 1 changed')
+        assert last.splitlines()[-1].split() == ['Ethernet0:3', 'stormed', '3/0', '+2/+0', '1.00/0.00', '+50/+0']
+        assert 'Ethernet4:3' not in last
+
+        # all queues are listed with --empty
+        with patch('pfcwd.main.time') as mock_time:
+            mock_time.time.side_effect = [100.0]
+            result = runner.invoke(
+                pfcwd.cli.commands['show'].commands['stats'],
+                ['--watch', '--count', '1', '--empty', 'Ethernet0:3', 'Ethernet4:3'], obj=db
+            )
+        assert result.exit_code == 0
+        assert result.output.splitlines()[-1].split() == ['Ethernet4:3', 'operational', '2/2', '+0/+0', '0.00/0.00', '+0/+0']
+
     def executor(self, testcase):
         import pfcwd.main as pfcwd
         runner = CliRunner()
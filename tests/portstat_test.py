@@ -204,6 +204,13 @@ Broadcast Packets Transmitted.................. 0
 Time Since Counters Last Cleared............... None
 """
 
+intf_counters_watch = """\
+    IFACE    STATE        RX_BPS        RX_MIN        RX_AVG        RX_MAX    RX_UTIL    RX_ERR    RX_DRP        TX_BPS        TX_MIN        TX_AVG        TX_MAX    TX_UTIL    TX_ERR    TX_DRP
+---------  -------  ------------  ------------  ------------  ------------  ---------  --------  --------  ------------  ------------  ------------  ------------  ---------  --------  --------
+Ethernet0        D  2000.00 MB/s  2000.00 MB/s  2000.00 MB/s  2000.00 MB/s     64.00%         0         0  1500.00 MB/s  1500.00 MB/s  1500.00 MB/s  1500.00 MB/s     48.00%       N/A       N/A
+Ethernet8      N/A  1350.00 KB/s  1350.00 KB/s  1350.00 KB/s  1350.00 KB/s        N/A         0         0    13.37 MB/s    13.37 MB/s    13.37 MB/s    13.37 MB/s        N/A       N/A       N/A
+"""
+
 TEST_PERIOD = 3
 
 
@@ -339,6 +346,17 @@ class TestPortStat(object):
         assert return_code == 0
         assert result == intf_counters_detailed
 
+    def test_show_intf_counters_watch(self):
+        return_code, result = get_result_and_return_code(
+            'portstat -w 0.1 --iterations 1 --sort tx_bps --top 2')
+        print("return_code: {}".format(return_code))
+        print("result = {}".format(result))
+        assert return_code == 0
+        lines = result.splitlines()
+        # ignore the first line as it has time stamp and is diffcult to compare
+        assert lines[0].startswith('Every 0.1s, rates over the last 1 samples')
+        assert '\n'.join(lines[1:]) + '\n' == intf_counters_watch
+
     def test_clear_intf_counters(self):
         runner = CliRunner()
         result = runner.invoke(clear.cli.commands["counters"], [])
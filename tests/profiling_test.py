@@ -0,0 +1,111 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from utilities_common import profiling
+
+from .mock_tables import dbconnector
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+sys.path.insert(0, modules_path)
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    output = str(tmp_path / 'profile.json')
+    with mock.patch.dict(os.environ):
+        yield profiling.enable(output)
+        profiling.disable()
+
+
+class TestProfiling(object):
+    def test_sonic_v2_connector(self, profiler):
+        from swsscommon.swsscommon import SonicV2Connector
+
+        db = SonicV2Connector()
+        db.connect(db.APPL_DB)
+        keys = db.keys(db.APPL_DB, 'PORT_TABLE:*')
+        db.get_all(db.APPL_DB, keys[0])
+
+        pipe = db.get_redis_client(db.APPL_DB).pipeline()
+        for key in keys:
+            pipe.hgetall(key)
+        pipe.execute()
+
+        stats = profiler.summary()['db']['APPL_DB']
+        assert stats['round_trips'] == 3
+        assert stats['commands'] == len(keys) + 2
+        assert stats['ops'] == {'get_all': 1, 'keys': 1, 'pipeline': len(keys)}
+
+    def test_config_db_connector(self, profiler):
+        from swsscommon.swsscommon import ConfigDBConnector
+
+        config_db = ConfigDBConnector()
+        config_db.connect()
+        assert config_db.get_table('PORT')
+
+        # the reads get_table issues on its own are not counted again
+        stats = profiler.summary()['db']
+        assert list(stats) == ['CONFIG_DB']
+        assert stats['CONFIG_DB']['commands'] == 1
+        assert stats['CONFIG_DB']['ops'] == {'get_table': 1}
+
+    def test_subprocess(self, profiler):
+        subprocess.Popen(['true']).wait()
+        subprocess.check_output(['echo', 'profiled'])
+
+        summary = profiler.summary()['subprocess']
+        assert summary['count'] == 2
+        assert [spawn['command'] for spawn in summary['spawns']] == ['true', 'echo profiled']
+
+    def test_render(self, profiler):
+        import tabulate
+        import show.main as show
+
+        # tabulate imported by name before profiling was enabled is patched too
+        assert show.tabulate is tabulate.tabulate
+        assert getattr(show.tabulate, '_profiled', False)
+        show.tabulate([['Ethernet0', 'up']], ['Interface', 'Oper'])
+        assert profiler.summary()['render_time'] > 0
+
+    def test_emit(self, profiler):
+        profiler.emit()
+        profiler.emit()
+
+        with open(profiler.output) as f:
+            summaries = [json.loads(line) for line in f]
+        assert len(summaries) == 2
+        for key in ['command', 'wall_time', 'import_time', 'db', 'subprocess', 'render_time']:
+            assert key in summaries[0]
+        assert summaries[0]['import_time'] <= summaries[0]['wall_time']
+        # spawned tools append their summary to the same file
+        assert os.environ[profiling.PROFILE_ENV_VAR] == profiler.output
+
+    def test_enable_from_env(self):
+        with mock.patch.dict(os.environ, {profiling.PROFILE_ENV_VAR: '0'}):
+            profiling.enable_from_env()
+            assert not profiling.is_enabled()
+        with mock.patch.dict(os.environ, {profiling.PROFILE_ENV_VAR: '1'}):
+            profiling.enable_from_env()
+            try:
+                assert profiling.get_profiler().output == profiling.STDERR
+            finally:
+                profiling.disable()
+
+    def test_profile_option(self):
+        import show.main as show
+
+        runner = CliRunner()
+        with mock.patch('utilities_common.profiling.enable') as mock_enable:
+            result = runner.invoke(show.cli, ['--profile', 'version', '--help'])
+        assert result.exit_code == 0, result.output
+        mock_enable.assert_called_once_with()
+
+        result = runner.invoke(show.cli, ['--help'])
+        assert '--profile' not in result.output
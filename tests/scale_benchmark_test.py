@@ -0,0 +1,242 @@
+"""
+Round trip budgets of the show tools at scale.
+
+Every benchmark generates a synthetic dataset with scale_fixture, runs one
+tool in-process against it and checks the number of round trips issued to
+the mock DBs against a budget computed from the dataset size. The wall time
+of every tool is recorded as a test property (see --junitxml).
+
+The default 'small' scale keeps the suite fast. Run with
+SONIC_SCALE_BENCHMARK=large for 512 ports, 64k MACs, 100k routes and ACL
+files of up to 50k rules.
+"""
+
+import json
+import os
+import sys
+import time
+from io import StringIO
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from utilities_common.general import load_module_from_source
+
+from .mock_tables import dbconnector
+from .mock_tables.scale_fixture import ScaleSpec, write_dbs
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+SCALES = {
+    'small': {
+        'ports': ScaleSpec(ports=64, queues=8, vlans=4),
+        'fdb': ScaleSpec(ports=64, queues=0, vlans=4, fdb=2048),
+        'routes': ScaleSpec(ports=64, queues=0, vlans=1, routes=4096),
+        'acl_rules': [1000],
+    },
+    'large': {
+        'ports': ScaleSpec(ports=512, queues=8, vlans=32),
+        'fdb': ScaleSpec(ports=512, queues=0, vlans=32, fdb=65536),
+        'routes': ScaleSpec(ports=512, queues=0, vlans=1, routes=100000),
+        'acl_rules': [1000, 10000, 50000],
+    },
+}
+SCALE = SCALES[os.environ.get('SONIC_SCALE_BENCHMARK', 'small')]
+
+
+@pytest.fixture
+def scale_dbs(tmp_path):
+    """
+    Return a function that writes the DBs of a ScaleSpec and points the
+    mock connector to them, with DB stats reset.
+    """
+    def setup(spec):
+        dbconnector.topo = write_dbs(spec, str(tmp_path))
+        dbconnector.reset_db_stats()
+        return spec
+
+    yield setup
+    dbconnector.topo = None
+    dbconnector.reset_db_stats()
+
+
+def write_acl_file(path, rules):
+    """
+    Write an openconfig ACL file with <rules> rules in the DATAACL table.
+    """
+    acl_entry = {}
+    for seq in range(1, rules + 1):
+        acl_entry[str(seq)] = {
+            "config": {"sequence-id": seq},
+            "actions": {"config": {"forwarding-action": "ACCEPT"}},
+            "ip": {"config": {
+                "protocol": "IP_TCP",
+                "source-ip-address": "10.{}.{}.{}/32".format(seq >> 16, (seq >> 8) & 0xff, seq & 0xff),
+                "destination-ip-address": "192.168.0.0/16",
+            }},
+            "transport": {"config": {"destination-port": str(1024 + seq % 60000), "tcp-flags": ["TCP_SYN"]}},
+        }
+    filename = os.path.join(path, 'acl_{}.json'.format(rules))
+    with open(filename, 'w') as f:
+        json.dump({"acl": {"acl-sets": {"acl-set": {"dataacl": {"acl-entries": {"acl-entry": acl_entry}}}}}}, f)
+    return filename
+
+
+def run_benchmark(record_property, name, func):
+    dbconnector.reset_db_stats()
+    start = time.time()
+    with mock.patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+        func()
+    wall_time = time.time() - start
+    round_trips = dbconnector.total_round_trips()
+    record_property('{}_wall_time'.format(name), round(wall_time, 3))
+    record_property('{}_round_trips'.format(name), round_trips)
+    print('{}: {} round trips in {:.3f}s {}'.format(name, round_trips, wall_time, dbconnector.db_stats))
+    return mock_stdout.getvalue(), round_trips
+
+
+class TestScaleBenchmark(object):
+    def test_portstat(self, scale_dbs, record_property):
+        spec = scale_dbs(SCALE['ports'])
+        portstat = load_module_from_source('portstat', os.path.join(scripts_path, 'portstat'))
+
+        def show():
+            stat = portstat.Portstat(None, 'all')
+            cnstat_dict, ratestat_dict = stat.get_cnstat_dict()
+            stat.cnstat_print(cnstat_dict, ratestat_dict, None, False, False, False, False, False)
+
+        output, round_trips = run_benchmark(record_property, 'portstat', show)
+        assert output.count('Ethernet') == spec.ports
+        # the name map, then the name, counters, 6 rates, speed and state of every port
+        assert round_trips <= 1 + spec.ports * 12
+
+    def test_portstat_watch(self, scale_dbs, record_property):
+        spec = scale_dbs(SCALE['ports'])
+        portstat = load_module_from_source('portstat', os.path.join(scripts_path, 'portstat'))
+        watch = portstat.PortstatWatch(None, 'all')
+        watch.refresh()
+
+        def show():
+            watch.refresh()
+            print(watch.display('RX_UTIL', 10))
+
+        output, round_trips = run_benchmark(record_property, 'portstat_watch', show)
+        assert output.count('Ethernet') == 10
+        # a refresh only reads the counters and rates of the ports, in pipelined batches
+        assert round_trips <= 2 * (spec.ports // 512 + 1)
+
+    def test_intfutil_status(self, scale_dbs, record_property):
+        spec = scale_dbs(SCALE['ports'])
+        intfutil = load_module_from_source('intfutil', os.path.join(scripts_path, 'intfutil'))
+
+        def show():
+            intfutil.IntfStatus(None, None, 'all').display_intf_status()
+
+        output, round_trips = run_benchmark(record_property, 'intfutil', show)
+        assert output.count('Ethernet') == spec.ports
+        # the table keys, then the CONFIG_DB, APPL_DB and STATE_DB fields of every port
+        assert round_trips <= 8 + spec.ports * 13
+
+    def test_fdbshow(self, scale_dbs, record_property):
+        spec = scale_dbs(SCALE['fdb'])
+        fdbshow = load_module_from_source('fdbshow', os.path.join(scripts_path, 'fdbshow'))
+
+        def show():
+            fdbshow.FdbShow().display(None, None, None, None, False)
+
+        output, round_trips = run_benchmark(record_property, 'fdbshow', show)
+        assert 'Total number of entries {}'.format(spec.fdb) in output
+        # one round trip per FDB entry and per bridge port, plus the VLAN lookups
+        assert round_trips <= 4 + spec.fdb + spec.ports + spec.vlans * 2
+
+    def test_dump_state_route(self, scale_dbs, record_property):
+        spec = scale_dbs(SCALE['routes'])
+        from dump.main import dump
+
+        def show():
+            result = CliRunner().invoke(dump, ['state', 'route', '10.0.1.0/24,10.0.2.0/24'])
+            print(result.output)
+            assert result.exit_code == 0, result.output
+
+        output, round_trips = run_benchmark(record_property, 'dump_state_route', show)
+        assert '10.0.2.0/24' in output
+        # the cost of a lookup does not depend on the number of routes
+        assert round_trips <= 24
+
+
+    @pytest.mark.parametrize('rules', SCALE['acl_rules'])
+    def test_acl_loader(self, tmp_path, record_property, rules):
+        from acl_loader.main import AclLoader
+
+        filename = write_acl_file(str(tmp_path), rules)
+        acl_loader = AclLoader()
+        acl_loader.set_max_priority(rules + 1)
+
+        parsers = ['fast']
+        try:
+            import openconfig_acl  # noqa: F401
+            parsers.append('pyangbind')
+        except ImportError:
+            pass
+
+        for parser in parsers:
+            acl_loader.rules_info = {}
+
+            def load():
+                acl_loader.load_rules_from_file(filename, use_pyangbind=(parser == 'pyangbind'))
+
+            _, round_trips = run_benchmark(record_property, 'acl_loader_{}_{}'.format(parser, rules), load)
+            # the rules and the default deny rule
+            assert len(acl_loader.rules_info) == rules + 1
+            # the capabilities are read once, not for every rule
+            assert round_trips <= 2
+            acl_loader.capabilities = {}
+
+
+class TestMockDBStats(object):
+    def setup_method(self):
+        dbconnector.reset_db_stats()
+
+    def test_round_trips(self):
+        from swsscommon.swsscommon import SonicV2Connector
+
+        db = SonicV2Connector()
+        db.connect(db.APPL_DB)
+        keys = db.keys(db.APPL_DB, 'PORT_TABLE:*')
+        db.get_all(db.APPL_DB, keys[0])
+
+        client = db.get_redis_client(db.APPL_DB)
+        pipe = client.pipeline()
+        for key in keys:
+            pipe.hgetall(key)
+        pipe.execute()
+
+        stats = dbconnector.db_stats['APPL_DB']
+        assert stats.round_trips == 3
+        assert stats.commands['keys'] == 1
+        assert stats.commands['hgetall'] == len(keys) + 1
+        assert stats.total_commands == len(keys) + 2
+
+    def test_scale_namespaces(self, scale_dbs):
+        from swsscommon.swsscommon import SonicV2Connector
+
+        spec = scale_dbs(ScaleSpec(ports=4, queues=2, vlans=2, fdb=8, routes=8, acl_rules=2, namespaces=2))
+        dbconnector.load_namespace_config()
+        try:
+            db = SonicV2Connector(namespace='asic1')
+            db.connect(db.COUNTERS_DB)
+            db.connect(db.ASIC_DB)
+            port_name_map = db.get_all(db.COUNTERS_DB, 'COUNTERS_PORT_NAME_MAP')
+            assert sorted(port_name_map) == ['Ethernet16', 'Ethernet20', 'Ethernet24', 'Ethernet28']
+            for port_oid in port_name_map.values():
+                assert db.exists(db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_PORT:' + port_oid)
+                assert db.get(db.COUNTERS_DB, 'RATES:' + port_oid, 'RX_BPS') is not None
+            assert len(db.get_all(db.COUNTERS_DB, 'COUNTERS_QUEUE_NAME_MAP')) == spec.ports * spec.queues
+            assert len(db.keys(db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:*')) == spec.fdb
+            assert len(db.keys(db.ASIC_DB, 'ASIC_STATE:SAI_OBJECT_TYPE_ROUTE_ENTRY:*')) == spec.routes
+        finally:
+            dbconnector.load_database_config()
@@ -33,7 +33,7 @@ def mock_docker_api():
     def pull(repo, ref):
         return Image(f'{repo}:{ref}')
 
-    def load(filename):
+    def load(filename, index=None):
         return Image(filename)
 
     docker.pull = MagicMock(side_effect=pull)
@@ -146,7 +146,7 @@ def fake_metadata_resolver():
             yang = self.metadata_store[ref['name']][ref['tag']]['yang']
             return Metadata(manifest, components, yang)
 
-        def from_tarball(self, filepath: str) -> Manifest:
+        def from_tarball(self, filepath: str, index=None) -> Manifest:
             path, ref = filepath.split(':')
             manifest = Manifest.marshal(self.metadata_store[path][ref]['manifest'])
             components = self.metadata_store[path][ref]['components']
@@ -1,10 +1,11 @@
 #!/usr/bin/env python
 
 import re
-from unittest.mock import Mock, call
+from unittest.mock import MagicMock, Mock, call, patch
 
 import pytest
 
+from sonic_package_manager.database import PackageDatabase, PackageEntry
 from sonic_package_manager.errors import *
 from sonic_package_manager.version import Version
 
@@ -207,10 +208,10 @@ def test_manager_installation_tag(package_manager,
     mock_docker_api.pull.assert_called_once_with('Azure/docker-test', '1.6.0')
 
 
-def test_installation_from_file(package_manager, mock_docker_api, sonic_fs):
+def test_installation_from_file(package_manager, mock_docker_api, sonic_fs, anything):
     sonic_fs.create_file('Azure/docker-test:1.6.0')
     package_manager.install(tarball='Azure/docker-test:1.6.0')
-    mock_docker_api.load.assert_called_once_with('Azure/docker-test:1.6.0')
+    mock_docker_api.load.assert_called_once_with('Azure/docker-test:1.6.0', anything)
 
 
 def test_installation_from_registry(package_manager, mock_docker_api):
@@ -327,3 +328,98 @@ def test_manager_migration(package_manager, fake_db_for_migration):
         call('test-package-6=2.0.0')],
         any_order=True
     )
+
+
+def test_manager_migration_all_skipped(package_manager):
+    old_package_database = PackageDatabase({
+        # installed in the same version as in the current database
+        'test-package-3': PackageEntry('test-package-3', 'Azure/docker-test-3',
+                                       default_reference='1.5.0', version=Version.parse('1.5.0'),
+                                       installed=True, image_id='Azure/docker-test-3:1.5.0'),
+        # not in the current database
+        'test-package-4': PackageEntry('test-package-4', 'Azure/docker-test-4',
+                                       default_reference='1.5.0'),
+    })
+
+    package_manager.install = Mock()
+    package_manager.database.commit = Mock()
+    timings = package_manager.migrate_packages(old_package_database)
+
+    package_manager.install.assert_not_called()
+    assert timings == {}
+    # the entry added from the old database is saved
+    assert package_manager.database.has_package('test-package-4')
+    package_manager.database.commit.assert_called_once_with()
+
+
+def test_manager_migration_dependency_order(package_manager, fake_db_for_migration,
+                                            fake_metadata_resolver):
+    manifest = fake_metadata_resolver.metadata_store['Azure/docker-test-3']['1.6.0']['manifest']
+    manifest['package']['depends'] = ['test-package-6>=2.0.0']
+    manifest = fake_metadata_resolver.metadata_store['Azure/docker-test-6']['2.0.0']['manifest']
+    manifest['package']['depends'] = ['test-package-4>=1.0.0', 'swss>=1.0.0']
+
+    package_manager.install = Mock()
+    timings = package_manager.migrate_packages(fake_db_for_migration, jobs=2)
+
+    # dependencies are installed before the packages that depend on them
+    assert package_manager.install.call_args_list == [
+        call('test-package-4=1.5.0'),
+        call('test-package-5=1.9.0'),
+        call('test-package-6=2.0.0'),
+        call('test-package-3=1.6.0'),
+    ]
+    assert sorted(timings) == ['test-package-3', 'test-package-4',
+                               'test-package-5', 'test-package-6']
+
+
+def test_manager_migration_circular_dependency(package_manager, fake_db_for_migration,
+                                               fake_metadata_resolver):
+    manifest = fake_metadata_resolver.metadata_store['Azure/docker-test-3']['1.6.0']['manifest']
+    manifest['package']['depends'] = ['test-package-6>=2.0.0']
+    manifest = fake_metadata_resolver.metadata_store['Azure/docker-test-6']['2.0.0']['manifest']
+    manifest['package']['depends'] = ['test-package-3>=1.0.0']
+
+    package_manager.install = Mock()
+    with pytest.raises(PackageManagerError, match='Circular dependency'):
+        package_manager.migrate_packages(fake_db_for_migration)
+    package_manager.install.assert_not_called()
+
+
+def test_manager_migration_dockerd(package_manager, fake_db_for_migration,
+                                   fake_metadata_resolver, mock_docker_api):
+    old_docker = MagicMock()
+    old_docker.save = Mock(side_effect=lambda image: [f'{image} layer'.encode()])
+    mock_docker_api.without_progress = Mock(return_value=mock_docker_api)
+    mock_docker_api.load_data = Mock(side_effect=lambda data: b''.join(data).decode())
+
+    package_manager.install = Mock()
+    package_manager.install_from_source = Mock()
+    package_manager.upgrade_from_source = Mock()
+
+    with patch('sonic_package_manager.manager.docker'), \
+         patch('sonic_package_manager.manager.DockerApi', return_value=old_docker), \
+         patch('sonic_package_manager.manager.MetadataResolver', return_value=fake_metadata_resolver), \
+         patch('tempfile.NamedTemporaryFile') as tmpfile:
+        package_manager.migrate_packages(fake_db_for_migration, '/var/run/docker.sock')
+
+    # images are streamed from the old dockerd into the new one, without a tarball on disk
+    tmpfile.assert_not_called()
+    mock_docker_api.load.assert_not_called()
+    old_docker.save.assert_has_calls([
+        call('Azure/docker-test-3:1.6.0'),
+        call('Azure/docker-test-6:2.0.0')],
+        any_order=True
+    )
+    sources = [args[0] for args, _ in package_manager.upgrade_from_source.call_args_list +
+               package_manager.install_from_source.call_args_list]
+    assert sorted(source.install_image(None) for source in sources) == [
+        'Azure/docker-test-3:1.6.0 layer',
+        'Azure/docker-test-6:2.0.0 layer',
+    ]
+    # packages whose default version is not older are installed from the registry
+    package_manager.install.assert_has_calls([
+        call('test-package-4=1.5.0'),
+        call('test-package-5=1.9.0')],
+        any_order=True
+    )
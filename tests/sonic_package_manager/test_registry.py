@@ -1,8 +1,15 @@
 #!/usr/bin/env python
 
+import http.server
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
 import requests
 import responses
-from sonic_package_manager.registry import RegistryResolver
+from sonic_package_manager.registry import Registry, RegistryResolver
 
 
 def test_get_registry_for():
@@ -34,3 +41,194 @@ def test_registry_auth():
                   json={'tags': ['a', 'b']},
                   status=requests.codes.ok)
     assert registry.tags('registry-server:5000/docker') == ['a', 'b']
+
+
+def add_auth_responses(registry, url):
+    responses.add(responses.GET, url,
+                  headers={
+                      'www-authenticate': 'Bearer realm="https://auth.docker.io/token",scope="repository:docker:pull"'
+                  },
+                  status=requests.codes.unauthorized)
+    responses.add(responses.GET,
+                  'https://auth.docker.io/token?scope=repository:docker:pull',
+                  json={'token': 'a', 'expires_in': 100},
+                  status=requests.codes.ok)
+
+
+def count_calls(url):
+    return len([c for c in responses.calls if c.request.url.startswith(url)])
+
+
+@responses.activate
+def test_registry_token_cache():
+    registry = Registry('https://registry-server:5000')
+    tags_url = registry.url + '/v2/docker/tags/list'
+    add_auth_responses(registry, tags_url)
+    responses.add(responses.GET, tags_url, json={'tags': ['a', 'b']}, status=requests.codes.ok)
+    responses.add(responses.GET, registry.url + '/v2/docker/manifests/1.0.0',
+                  json={'config': {'digest': 'sha256:1'}}, status=requests.codes.ok)
+
+    assert registry.tags('registry-server:5000/docker') == ['a', 'b']
+    assert registry.tags('registry-server:5000/docker') == ['a', 'b']
+    assert registry.manifest('registry-server:5000/docker', '1.0.0') == {'config': {'digest': 'sha256:1'}}
+
+    # the token is requested once and sent upfront with the following requests
+    assert count_calls('https://auth.docker.io/token') == 1
+    assert count_calls(tags_url) == 3
+    assert responses.calls[-1].request.headers['Authorization'] == 'Bearer a'
+
+
+@responses.activate
+def test_registry_token_expiry():
+    registry = Registry('https://registry-server:5000')
+    tags_url = registry.url + '/v2/docker/tags/list'
+    add_auth_responses(registry, tags_url)
+    responses.add(responses.GET, tags_url, json={'tags': ['a']}, status=requests.codes.ok)
+
+    with mock.patch('sonic_package_manager.registry.time.monotonic', return_value=1000):
+        registry.tags('registry-server:5000/docker')
+    assert count_calls('https://auth.docker.io/token') == 1
+
+    # the token has expired, the registry asks for a new one
+    responses.add(responses.GET, tags_url,
+                  headers={
+                      'www-authenticate': 'Bearer realm="https://auth.docker.io/token",scope="repository:docker:pull"'
+                  },
+                  status=requests.codes.unauthorized)
+    responses.add(responses.GET, tags_url, json={'tags': ['a']}, status=requests.codes.ok)
+    with mock.patch('sonic_package_manager.registry.time.monotonic', return_value=1100):
+        registry.tags('registry-server:5000/docker')
+    assert count_calls('https://auth.docker.io/token') == 2
+    assert 'Authorization' not in responses.calls[-3].request.headers
+
+
+@responses.activate
+def test_registry_token_rejected():
+    registry = Registry('https://registry-server:5000')
+    tags_url = registry.url + '/v2/docker/tags/list'
+    add_auth_responses(registry, tags_url)
+    responses.add(responses.GET, tags_url, json={'tags': ['a']}, status=requests.codes.ok)
+    registry.tags('registry-server:5000/docker')
+
+    # the cached token has not expired but the registry rejects it
+    responses.add(responses.GET, tags_url,
+                  headers={
+                      'www-authenticate': 'Bearer realm="https://auth.docker.io/token",scope="repository:docker:pull"'
+                  },
+                  status=requests.codes.unauthorized)
+    responses.replace(responses.GET,
+                      'https://auth.docker.io/token?scope=repository:docker:pull',
+                      json={'token': 'b', 'expires_in': 100},
+                      status=requests.codes.ok)
+    responses.add(responses.GET, tags_url, json={'tags': ['a']}, status=requests.codes.ok)
+    assert registry.tags('registry-server:5000/docker') == ['a']
+    assert registry.tags('registry-server:5000/docker') == ['a']
+
+    assert count_calls('https://auth.docker.io/token') == 2
+    assert responses.calls[-4].request.headers['Authorization'] == 'Bearer a'
+    assert responses.calls[-4].response.status_code == requests.codes.unauthorized
+    # the new token is cached in place of the rejected one
+    assert responses.calls[-2].request.headers['Authorization'] == 'Bearer b'
+    assert responses.calls[-1].request.headers['Authorization'] == 'Bearer b'
+
+
+@responses.activate
+def test_registry_etag_cache():
+    registry = Registry('https://registry-server:5000')
+    manifest_url = registry.url + '/v2/docker/manifests/latest'
+    responses.add(responses.GET, manifest_url, json={'config': {'digest': 'sha256:1'}},
+                  headers={'ETag': '"sha256:abc"'}, status=requests.codes.ok)
+    responses.add(responses.GET, manifest_url, status=requests.codes.not_modified)
+
+    manifest = registry.manifest('registry-server:5000/docker', 'latest')
+    assert registry.manifest('registry-server:5000/docker', 'latest') == manifest
+    assert 'If-None-Match' not in responses.calls[0].request.headers
+    assert responses.calls[1].request.headers['If-None-Match'] == '"sha256:abc"'
+
+
+@responses.activate
+def test_registry_immutable_cache():
+    registry = Registry('https://registry-server:5000')
+    responses.add(responses.GET, registry.url + '/v2/docker/blobs/sha256:1',
+                  json={'config': {'Labels': {}}}, status=requests.codes.ok)
+    responses.add(responses.GET, registry.url + '/v2/docker/manifests/sha256:2',
+                  json={'config': {'digest': 'sha256:1'}}, status=requests.codes.ok)
+
+    for _ in range(2):
+        assert registry.blobs('registry-server:5000/docker', 'sha256:1') == {'config': {'Labels': {}}}
+        assert registry.manifest('registry-server:5000/docker', 'sha256:2') == {'config': {'digest': 'sha256:1'}}
+    assert len(responses.calls) == 2
+
+
+def test_registry_resolver_reuses_registry():
+    resolver = RegistryResolver()
+    registry = resolver.get_registry_for('registry-server:5000/docker')
+    assert resolver.get_registry_for('registry-server:5000/docker-2') is registry
+    assert resolver.get_registry_for('registry-server.com/docker') is not registry
+
+
+@pytest.fixture
+def stub_registry():
+    """ Local HTTP registry serving tags of any repository behind
+    token authentication, recording connections and requests. """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # responses are written at once, not header by header
+        wbufsize = -1
+
+        def setup(self):
+            super().setup()
+            server.connections += 1
+
+        def send_json(self, code, content, headers=None):
+            body = json.dumps(content).encode()
+            self.send_response(code)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            server.requests.append(self.path)
+            if self.path.startswith('/token'):
+                self.send_json(200, {'token': 'stub', 'expires_in': 300})
+            elif self.headers.get('Authorization') != 'Bearer stub':
+                repository = self.path[len('/v2/'):self.path.index('/tags/list')]
+                realm = f'http://127.0.0.1:{server.server_port}/token'
+                self.send_json(401, {}, {
+                    'Www-Authenticate': f'Bearer realm="{realm}",scope="repository:{repository}:pull"'
+                })
+            else:
+                self.send_json(200, {'tags': ['1.0.0']})
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.connections = 0
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_registry_stub_connection_pool(stub_registry):
+    registry = Registry(f'http://127.0.0.1:{stub_registry.server_port}')
+    repositories = [f'docker-{i}' for i in range(16)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        tags = list(executor.map(registry.tags, repositories))
+    assert tags == [['1.0.0']] * len(repositories)
+    for repository in repositories:
+        assert registry.tags(repository) == ['1.0.0']
+
+    # connections are reused and a token is requested once per repository scope
+    assert stub_registry.connections <= registry.POOL_SIZE
+    token_requests = [path for path in stub_registry.requests if path.startswith('/token')]
+    assert len(token_requests) == len(repositories)
+    assert len(stub_registry.requests) == len(repositories) * 4
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+import io
+import json
+import tarfile
+from unittest.mock import MagicMock, patch
+
+import docker
+import pytest
+
+from sonic_package_manager.dockerapi import DockerApi
+from sonic_package_manager.errors import MetadataError
+from sonic_package_manager.metadata import MetadataResolver
+from sonic_package_manager.tarindex import TarIndex
+
+IMAGE_ID = '8f1b2c3d4e5f'
+LAYER_SIZE = 4 * 1024 * 1024
+
+
+def add_member(tar, name, content):
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    tar.addfile(info, io.BytesIO(content))
+
+
+@pytest.fixture
+def image_tarball(tmp_path):
+    """ Image tarball laid out like 'docker save' writes it,
+    with the manifest and configuration after the layers. """
+
+    manifest = {
+        'package': {'name': 'test-package', 'version': '1.0.0', 'base-os': {}},
+        'service': {'name': 'test-package'},
+    }
+    config = {'config': {'Labels': {'com.azure.sonic.manifest': json.dumps(manifest)}}}
+
+    path = str(tmp_path / 'image.tar')
+    with tarfile.open(path, 'w') as tar:
+        add_member(tar, 'abcdef/layer.tar', bytes(LAYER_SIZE))
+        add_member(tar, f'{IMAGE_ID}.json', json.dumps(config).encode())
+        add_member(tar, 'manifest.json', json.dumps([{
+            'Config': f'{IMAGE_ID}.json',
+            'RepoTags': ['Azure/docker-test:1.0.0'],
+            'Layers': ['abcdef/layer.tar'],
+        }]).encode())
+    yield path
+
+
+class CountingFile(io.FileIO):
+    """ File counting the bytes read from it. """
+
+    bytes_read = 0
+
+    def readinto(self, buffer):
+        count = super().readinto(buffer)
+        CountingFile.bytes_read += count or 0
+        return count
+
+
+def test_tar_index_reads_headers_only(image_tarball):
+    CountingFile.bytes_read = 0
+    with patch('sonic_package_manager.tarindex.open', create=True,
+               side_effect=lambda path, mode: io.BufferedReader(CountingFile(path))):
+        with TarIndex(image_tarball) as index:
+            assert index.image_id == f'sha256:{IMAGE_ID}'
+            assert index.repotags == ['Azure/docker-test:1.0.0']
+            assert 'com.azure.sonic.manifest' in index.image_config['config']['Labels']
+            assert sorted(index.members) == ['8f1b2c3d4e5f.json', 'abcdef/layer.tar', 'manifest.json']
+
+    # the layer is seeked over, not read
+    assert CountingFile.bytes_read < LAYER_SIZE / 16
+
+
+def test_tar_index_errors(tmp_path, image_tarball):
+    with TarIndex(image_tarball) as index:
+        with pytest.raises(MetadataError, match='No missing.json found'):
+            index.read('missing.json')
+
+    path = tmp_path / 'invalid.tar'
+    path.write_bytes(b'not a tarball')
+    with pytest.raises(MetadataError, match='Failed to read tarball'):
+        TarIndex(str(path)).members
+
+
+def test_tar_index_compressed(tmp_path, image_tarball):
+    path = str(tmp_path / 'image.tar.gz')
+    with tarfile.open(image_tarball) as src, tarfile.open(path, 'w:gz') as tar:
+        for member in src.getmembers():
+            add_member(tar, member.name, src.extractfile(member).read())
+
+    with TarIndex(path) as index:
+        assert index.image_id == f'sha256:{IMAGE_ID}'
+
+
+def test_metadata_resolver_tarball(image_tarball):
+    metadata_resolver = MetadataResolver(MagicMock(), MagicMock())
+    metadata = metadata_resolver.from_tarball(image_tarball)
+    assert metadata.manifest['package']['name'] == 'test-package'
+
+    with TarIndex(image_tarball) as index:
+        metadata_resolver.from_tarball(image_tarball, index)
+        members = index.members
+        metadata = metadata_resolver.from_tarball(image_tarball, index)
+        # the index is built once for all reads
+        assert index.members is members
+    assert str(metadata.manifest['package']['version']) == '1.0.0'
+
+
+def test_docker_load_streams_index(image_tarball):
+    client = MagicMock()
+    client.images.get.side_effect = docker.errors.ImageNotFound('not found')
+    streamed = []
+
+    def load_image(data, quiet):
+        streamed.append(data.read())
+        client.images.get.side_effect = None
+        return [{'stream': 'Loaded image: Azure/docker-test:1.0.0\n'}]
+
+    client.api.load_image = MagicMock(side_effect=load_image)
+
+    with TarIndex(image_tarball) as index:
+        index.image_config
+        image = DockerApi(client).load(image_tarball, index)
+
+    with open(image_tarball, 'rb') as f:
+        assert streamed == [f.read()]
+    assert image is client.images.get.return_value
+    client.images.get.assert_called_with('Azure/docker-test:1.0.0')
+
+
+def test_docker_load_skips_loaded_image(image_tarball):
+    client = MagicMock()
+    client.images.get.return_value.tags = ['Azure/docker-test:1.0.0', 'Azure/docker-test:latest']
+
+    with TarIndex(image_tarball) as index:
+        image = DockerApi(client).load(image_tarball, index)
+
+    assert image is client.images.get.return_value
+    client.images.get.assert_called_once_with(f'sha256:{IMAGE_ID}')
+    client.api.load_image.assert_not_called()
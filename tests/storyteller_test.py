@@ -0,0 +1,107 @@
+import gzip
+import os
+import sys
+import time
+from io import StringIO
+from unittest import mock
+
+from utilities_common.general import load_module_from_source
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+storyteller_path = os.path.join(scripts_path, 'storyteller')
+storyteller = load_module_from_source('storyteller', storyteller_path)
+
+old_log = [
+    'Jan  1 10:00:00.000001 sonic INFO systemd[1]: Starting swss',
+    'Jan  1 10:00:01.000001 sonic NOTICE admin: Rebooting with /usr/local/bin/reboot',
+    'Jan  1 10:00:02.000001 sonic INFO kernel: unrelated',
+]
+
+new_log = [
+    'Jan  2 10:00:00.000001 sonic INFO kernel: BOOT_IMAGE=/image/boot/vmlinuz',
+    'Jan  2 10:00:01.000001 sonic INFO kernel: unrelated 1',
+    'Jan  2 10:00:02.000001 sonic INFO kernel: unrelated 2',
+    'Jan  2 10:00:03.000001 sonic INFO kernel: unrelated 3',
+    'Jan  2 10:00:04.000001 sonic INFO bgpcfgd: Started',
+]
+
+
+def log_time(day, second=0):
+    return time.mktime(time.strptime('2021 Jan {} 10:00:{:02d}'.format(day, second), '%Y %b %d %H:%M:%S'))
+
+
+class TestStoryteller(object):
+    def write_logs(self, tmpdir):
+        old = str(tmpdir.join('syslog.1.gz'))
+        with gzip.open(old, 'wt') as fp:
+            fp.write('\n'.join(old_log) + '\n')
+        os.utime(old, (log_time(1, 2), log_time(1, 2)))
+
+        new = str(tmpdir.join('syslog'))
+        with open(new, 'w') as fp:
+            fp.write('\n'.join(new_log) + '\n')
+        os.utime(new, (log_time(2, 4), log_time(2, 4)))
+        return old, new
+
+    def run(self, tmpdir, category, **kwargs):
+        with mock.patch.object(storyteller, 'index_file', str(tmpdir.join('index'))), \
+                mock.patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            storyteller.find_log(str(tmpdir), 'syslog', storyteller.build_regex(category), jobs=1, **kwargs)
+        return mock_stdout.getvalue().splitlines()
+
+    def test_build_regex(self):
+        regex = storyteller.build_regex('bgp,Configure .* to\\|(x)')
+        assert regex == '(?:bgpcfgd)|(?:Configure .* to|\\(x\\))'
+
+    def test_all_categories_in_time_order(self, tmpdir):
+        old, new = self.write_logs(tmpdir)
+        output = self.run(tmpdir, 'reboot,service')
+        assert output == [
+            old + ':' + old_log[0],
+            old + ':' + old_log[1],
+            new + ':' + new_log[0],
+            new + ':' + new_log[4],
+        ]
+
+    def test_context(self, tmpdir):
+        old, new = self.write_logs(tmpdir)
+        output = self.run(tmpdir, 'bgp', before=1)
+        assert output == [new + '-' + new_log[3], new + ':' + new_log[4]]
+
+        output = self.run(tmpdir, 'reboot', after=1)
+        assert output == [
+            old + ':' + old_log[1],
+            old + '-' + old_log[2],
+            '--',
+            new + ':' + new_log[0],
+            new + '-' + new_log[1],
+        ]
+
+    def test_since_uses_index(self, tmpdir):
+        old, new = self.write_logs(tmpdir)
+        self.run(tmpdir, 'reboot')
+
+        index = storyteller.load_index(str(tmpdir.join('index')))
+        assert index[os.path.realpath(old)]['first'] == log_time(1, 0)
+        assert index[os.path.realpath(old)]['last'] == log_time(1, 2)
+        assert os.path.realpath(new) not in index
+
+        # a touched rotated file is skipped by its indexed timestamps, without being decompressed
+        os.utime(old, (log_time(3), log_time(3)))
+        entry = index[os.path.realpath(old)]
+        entry['mtime'] = os.stat(old).st_mtime
+        storyteller.save_index(index, str(tmpdir.join('index')))
+        with mock.patch.object(storyteller.gzip, 'open') as mock_gzip_open:
+            output = self.run(tmpdir, 'reboot', since=log_time(2))
+            mock_gzip_open.assert_not_called()
+        assert output == [new_log[0]]
+
+    def test_since_skips_older_lines(self, tmpdir):
+        _, new = self.write_logs(tmpdir)
+        output = self.run(tmpdir, 'reboot,service', since=log_time(2, 1))
+        assert output == [new_log[4]]
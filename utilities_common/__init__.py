@@ -0,0 +1,3 @@
+from utilities_common import profiling
+
+profiling.enable_from_env()
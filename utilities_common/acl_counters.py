@@ -0,0 +1,127 @@
+"""
+ACL counter reader shared by aclshow and the PBH statistics plugin.
+
+Both used to look up ACL_COUNTER_RULE_MAP and then issue one HGETALL per
+rule counter. The reader below resolves the map once, applies the
+table/rule filters before any counter is touched and fetches the counter
+hashes in pipelined batches. Cleared counters are kept as a compact
+snapshot of (packets, bytes) per rule instead of full counter hashes.
+"""
+
+import json
+from collections import namedtuple
+
+from utilities_common.db_pipeline import DEFAULT_BATCH_SIZE, get_pipelined_client, hgetall_batched
+
+COUNTERS = "COUNTERS"
+ACL_COUNTER_RULE_MAP = "ACL_COUNTER_RULE_MAP"
+
+COUNTER_PACKETS_ATTR = "SAI_ACL_COUNTER_ATTR_PACKETS"
+COUNTER_BYTES_ATTR = "SAI_ACL_COUNTER_ATTR_BYTES"
+
+SNAPSHOT_KEY_SEPARATOR = "|"
+
+AclCounter = namedtuple("AclCounter", ["packets", "bytes"])
+
+
+def filter_rule_keys(rule_keys, tables=None, rules=None):
+    """
+    Return the (table, rule) keys of <rule_keys> that belong to one of
+    <tables> and are named in <rules>. An empty filter matches everything.
+    """
+    tables = set(tables or [])
+    rules = set(rules or [])
+    return [(table, rule) for table, rule in rule_keys
+            if (not tables or table in tables) and (not rules or rule in rules)]
+
+
+class AclCounterReader(object):
+    """
+    Reads ACL rule counters from COUNTERS_DB.
+
+    <db> is a SonicV2Connector already connected to COUNTERS_DB.
+    """
+
+    def __init__(self, db, batch_size=DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.separator = db.get_db_separator(db.COUNTERS_DB)
+        self._rule_to_counter_map = None
+        self._client = None
+
+    def get_rule_counter_map(self):
+        """
+        Return ACL_COUNTER_RULE_MAP, read from the DB on first use only
+        """
+        if self._rule_to_counter_map is None:
+            self._rule_to_counter_map = self.db.get_all(self.db.COUNTERS_DB, ACL_COUNTER_RULE_MAP) or {}
+        return self._rule_to_counter_map
+
+    def read(self, rule_keys, tables=None, rules=None):
+        """
+        Return {(table, rule): AclCounter} for the rules in <rule_keys>
+        matching the <tables>/<rules> filters. Rules without a counter
+        are left out.
+        """
+        rule_to_counter_map = self.get_rule_counter_map()
+        if not rule_to_counter_map:
+            return {}
+
+        counter_keys = {}
+        for table, rule in filter_rule_keys(rule_keys, tables, rules):
+            counter_oid = rule_to_counter_map.get(table + self.separator + rule)
+            if counter_oid:
+                counter_keys[COUNTERS + self.separator + counter_oid] = (table, rule)
+
+        if self._client is None:
+            self._client = get_pipelined_client(self.db, "COUNTERS_DB")
+
+        counters = {}
+        for key, fvs in hgetall_batched(self._client, counter_keys, self.batch_size):
+            if fvs:
+                counters[counter_keys[key]] = AclCounter(int(fvs.get(COUNTER_PACKETS_ATTR, 0)),
+                                                         int(fvs.get(COUNTER_BYTES_ATTR, 0)))
+        return counters
+
+
+def get_counter_delta(counters, snapshot, key, field):
+    """
+    Return the value of <field> ("packets" or "bytes") of <key> relative to
+    the cleared <snapshot>, or the raw value if the counter went backwards.
+    """
+    value = getattr(counters[key], field)
+    if key in snapshot:
+        delta = value - getattr(snapshot[key], field)
+        if delta >= 0:
+            return delta
+    return value
+
+
+def save_snapshot(path, counters):
+    """
+    Save <counters> to <path> as {"<table>|<rule>": [packets, bytes]}
+    """
+    snapshot = {SNAPSHOT_KEY_SEPARATOR.join(key): list(counter) for key, counter in counters.items()}
+    with open(path, 'w') as fp:
+        json.dump(snapshot, fp, separators=(',', ':'))
+
+
+def load_snapshot(path):
+    """
+    Load a snapshot written by save_snapshot(). The list based format
+    written by older versions is still accepted.
+    """
+    with open(path) as fp:
+        data = json.load(fp)
+
+    snapshot = {}
+    if isinstance(data, list):
+        for e in data:
+            snapshot[e['key'][0], e['key'][1]] = AclCounter(int(e['value'].get(COUNTER_PACKETS_ATTR, 0)),
+                                                            int(e['value'].get(COUNTER_BYTES_ATTR, 0)))
+        return snapshot
+
+    for key, (packets, octets) in data.items():
+        table, rule = key.split(SNAPSHOT_KEY_SEPARATOR, 1)
+        snapshot[table, rule] = AclCounter(packets, octets)
+    return snapshot
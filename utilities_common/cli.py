@@ -11,7 +11,6 @@ import json
 import lazy_object_proxy
 import netaddr
 
-from natsort import natsorted
 from sonic_py_common import multi_asic
 from utilities_common.db import Db
 from utilities_common.general import load_db_config
@@ -144,6 +143,44 @@ class InterfaceAliasConverter(object):
             except KeyError:
                 break
 
+        # Lookup tables and line translator, built on first use
+        self._alias_map = None
+        self._name_map = None
+        self._translate_re = None
+
+    @property
+    def alias_map(self):
+        """Dict of SONiC interface name to vendor alias"""
+        if self._alias_map is None:
+            self._alias_map = {port_name: port['alias'] for port_name, port in self.port_dict.items()
+                               if 'alias' in port}
+        return self._alias_map
+
+    @property
+    def name_map(self):
+        """Dict of vendor alias to SONiC interface name"""
+        if self._name_map is None:
+            self._name_map = {}
+            for port_name, alias in self.alias_map.items():
+                # first port wins, as with a linear search
+                self._name_map.setdefault(alias, port_name)
+        return self._name_map
+
+    def translate(self, line):
+        """Replace, in a single pass, every SONiC interface name in <line>
+           that is at the start of the line or preceded by whitespace, and
+           followed by the end of the line, whitespace or a comma and
+           whitespace, with its vendor alias
+        """
+        if self._translate_re is None:
+            if not self.alias_map:
+                return line
+            # Longest names first so that Ethernet1 does not shadow Ethernet10
+            names = sorted(self.alias_map, key=len, reverse=True)
+            self._translate_re = re.compile(r"(?<!\S)({})(?=$|,?\s)".format(
+                '|'.join(re.escape(name) for name in names)))
+        return self._translate_re.sub(lambda m: self.alias_map[m.group(1)], line)
+
     def name_to_alias(self, interface_name):
         """Return vendor interface alias if SONiC
            interface name is given as argument
@@ -157,10 +194,9 @@ class InterfaceAliasConverter(object):
                 # interface_name holds the parent port name
                 interface_name = interface_name[:sub_intf_sep_idx]
 
-            for port_name in self.port_dict:
-                if interface_name == port_name:
-                    return self.port_dict[port_name]['alias'] if sub_intf_sep_idx == -1 \
-                            else self.port_dict[port_name]['alias'] + VLAN_SUB_INTERFACE_SEPARATOR + vlan_id
+            if interface_name in self.port_dict:
+                return self.port_dict[interface_name]['alias'] if sub_intf_sep_idx == -1 \
+                        else self.port_dict[interface_name]['alias'] + VLAN_SUB_INTERFACE_SEPARATOR + vlan_id
 
         # interface_name not in port_dict. Just return interface_name
         return interface_name if sub_intf_sep_idx == -1 else interface_name + VLAN_SUB_INTERFACE_SEPARATOR + vlan_id
@@ -178,9 +214,9 @@ class InterfaceAliasConverter(object):
                 # interface_alias holds the parent port alias
                 interface_alias = interface_alias[:sub_intf_sep_idx]
 
-            for port_name in self.port_dict:
-                if interface_alias == self.port_dict[port_name]['alias']:
-                    return port_name if sub_intf_sep_idx == -1 else port_name + VLAN_SUB_INTERFACE_SEPARATOR + vlan_id
+            port_name = self.name_map.get(interface_alias)
+            if port_name is not None:
+                return port_name if sub_intf_sep_idx == -1 else port_name + VLAN_SUB_INTERFACE_SEPARATOR + vlan_id
 
         # interface_alias not in port_dict. Just return interface_alias
         return interface_alias if sub_intf_sep_idx == -1 else interface_alias + VLAN_SUB_INTERFACE_SEPARATOR + vlan_id
@@ -194,6 +230,16 @@ def get_interface_naming_mode():
         mode = "default"
     return mode
 
+def get_interface_display_name_func(db=None):
+    """Return a function mapping a SONiC interface name to the name to
+       display: its vendor alias in alias naming mode, the name itself
+       otherwise. Commands building their output in-process get it once
+       and emit alias names directly instead of converting the output.
+    """
+    if get_interface_naming_mode() == "alias":
+        return InterfaceAliasConverter(db).name_to_alias
+    return lambda interface_name: interface_name
+
 def is_ipaddress(val):
     """ Validate if an entry is a valid IP """
     import netaddr
@@ -380,9 +426,7 @@ def print_output_in_alias_mode(output, index):
     if word:
         interface_name = word[index]
         interface_name = interface_name.replace(':', '')
-    for port_name in natsorted(list(iface_alias_converter.port_dict.keys())):
-            if interface_name == port_name:
-                alias_name = iface_alias_converter.port_dict[port_name]['alias']
+        alias_name = iface_alias_converter.alias_map.get(interface_name, "")
     if alias_name:
         if len(alias_name) < iface_alias_converter.alias_max_length:
             alias_name = alias_name.rjust(
@@ -499,11 +543,7 @@ def run_command_in_alias_mode(command):
                 whitespace and followed immediately by either the end of a line or whitespace
                 or a comma followed by whitespace
                 """
-                converted_output = raw_output
-                for port_name in iface_alias_converter.port_dict:
-                    converted_output = re.sub(r"(^|\s){}($|,{{0,1}}\s)".format(port_name),
-                            r"\1{}\2".format(iface_alias_converter.name_to_alias(port_name)),
-                            converted_output)
+                converted_output = iface_alias_converter.translate(raw_output)
                 click.echo(converted_output.rstrip('\n'))
 
     rc = process.poll()
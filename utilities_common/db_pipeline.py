@@ -0,0 +1,184 @@
+"""
+Batched Redis access helpers.
+
+The show/config scripts traditionally enumerate a table with KEYS and then
+fetch every entry with its own round trip. The helpers below replace that
+with an incremental SCAN and pipelined HGETALL batches, so the number of
+round trips is proportional to (entries / batch size) and the memory held
+at any time is bounded by the batch size rather than the table size.
+"""
+
+import itertools
+
+from swsscommon import swsscommon
+
+from utilities_common import profiling
+
+DEFAULT_SCAN_COUNT = 1000
+DEFAULT_BATCH_SIZE = 512
+
+
+def get_pipelined_client(db, db_name, unix_socket_path=None):
+    """
+    Return a Redis client for <db_name> that supports pipelining.
+
+    The client returned by SonicV2Connector.get_redis_client() is used when
+    it already exposes pipeline(). Otherwise a redis-py client is opened on
+    the same unix socket (or <unix_socket_path> if given) and database id.
+    If that is not possible the connector's own client is returned and the
+    helpers in this module fall back to one round trip per entry.
+    """
+    client = db.get_redis_client(db_name)
+    if hasattr(client, 'pipeline'):
+        return client
+
+    try:
+        import redis
+        namespace = getattr(db, 'namespace', '') or ''
+        if unix_socket_path is None:
+            unix_socket_path = swsscommon.SonicDBConfig.getDbSock(db_name, namespace)
+        client = redis.Redis(unix_socket_path=unix_socket_path,
+                             db=swsscommon.SonicDBConfig.getDbId(db_name, namespace),
+                             decode_responses=True)
+        return profiling.profile_client(client, db_name)
+    except Exception:
+        return client
+
+
+def chunked(iterable, size):
+    """
+    Split <iterable> into lists of at most <size> items without
+    materializing the whole iterable.
+    """
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def scan_keys(client, pattern, count=DEFAULT_SCAN_COUNT):
+    """
+    Iterate over keys matching <pattern> using SCAN.
+
+    Unlike KEYS this does not block the server or build the complete key
+    list in memory. As with any SCAN, a key may be reported more than once
+    if the keyspace is rehashed while the iteration is in progress.
+    """
+    if hasattr(client, 'scan_iter'):
+        for key in client.scan_iter(match=pattern, count=count):
+            yield key
+        return
+
+    if not hasattr(client, 'scan'):
+        for key in client.keys(pattern) or []:
+            yield key
+        return
+
+    cursor = 0
+    while True:
+        cursor, keys = client.scan(cursor, pattern, count)
+        for key in keys:
+            yield key
+        if int(cursor) == 0:
+            return
+
+
+def _run_batch(client, command, keys, args=()):
+    if hasattr(client, 'pipeline'):
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            getattr(pipe, command)(key, *args)
+        return pipe.execute()
+    return [getattr(client, command)(key, *args) for key in keys]
+
+
+def hgetall_batched(client, keys, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield (key, fvs) for each key in <keys>, issuing one pipelined round
+    trip per <batch_size> keys. Keys that do not exist yield an empty dict.
+    """
+    for chunk in chunked(keys, batch_size):
+        for key, fvs in zip(chunk, _run_batch(client, 'hgetall', chunk)):
+            yield key, fvs or {}
+
+
+def hget_batched(client, keys, field, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield (key, value) for <field> of each key in <keys>, one pipelined
+    round trip per <batch_size> keys. Missing keys or fields yield None.
+    """
+    for chunk in chunked(keys, batch_size):
+        for key, value in zip(chunk, _run_batch(client, 'hget', chunk, (field,))):
+            yield key, value
+
+
+def hset_batched(client, items, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write each (key, fvs) pair of <items> with HSET, one pipelined round
+    trip per <batch_size> keys. Existing fields not present in <fvs> are
+    left untouched.
+    """
+    for chunk in chunked(items, batch_size):
+        if hasattr(client, 'pipeline'):
+            pipe = client.pipeline(transaction=False)
+            for key, fvs in chunk:
+                for field, value in fvs.items():
+                    pipe.hset(key, field, value)
+            pipe.execute()
+        else:
+            for key, fvs in chunk:
+                for field, value in fvs.items():
+                    client.hset(key, field, value)
+
+
+# The read issued for every Redis type by dump_batched
+_DUMP_COMMANDS = {
+    'hash': ('hgetall', ()),
+    'string': ('get', ()),
+    'list': ('lrange', (0, -1)),
+    'set': ('smembers', ()),
+    'zset': ('zrange', (0, -1, False, True)),
+}
+
+
+def dump_batched(client, keys, batch_size=DEFAULT_BATCH_SIZE, with_ttl=False):
+    """
+    Yield (key, type, value) for each key in <keys> whatever its type, as
+    returned by HGETALL, GET, LRANGE, SMEMBERS or ZRANGE WITHSCORES. Every
+    <batch_size> keys take two pipelined round trips, one for the types and
+    one for the values. Keys that no longer exist are skipped.
+
+    With <with_ttl> the PTTL of every key is read in the same round trip as
+    its value and (key, type, value, pttl) is yielded instead.
+    """
+    for chunk in chunked(keys, batch_size):
+        reads = []
+        for key, key_type in zip(chunk, _run_batch(client, 'type', chunk)):
+            if isinstance(key_type, bytes):
+                key_type = key_type.decode()
+            if key_type in _DUMP_COMMANDS:
+                reads.append((key, key_type))
+
+        commands = []
+        for key, key_type in reads:
+            command, args = _DUMP_COMMANDS[key_type]
+            commands.append((command, key, args))
+            if with_ttl:
+                commands.append(('pttl', key, ()))
+
+        if hasattr(client, 'pipeline'):
+            pipe = client.pipeline(transaction=False)
+            for command, key, args in commands:
+                getattr(pipe, command)(key, *args)
+            values = pipe.execute() if commands else []
+        else:
+            values = [getattr(client, command)(key, *args) for command, key, args in commands]
+
+        if with_ttl:
+            for (key, key_type), value, pttl in zip(reads, values[::2], values[1::2]):
+                yield key, key_type, value, pttl
+        else:
+            for (key, key_type), value in zip(reads, values):
+                yield key, key_type, value
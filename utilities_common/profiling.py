@@ -0,0 +1,442 @@
+"""
+Profiling hooks for the CLI tools.
+
+Profiling is enabled by setting SONIC_CLI_PROFILE in the environment, or
+with the hidden --profile option of the show/config/sonic-clear root
+groups. When enabled, the tool records:
+
+  - import time, from process start to the first DB command or subprocess
+  - per DB command counts, round trips and latency, for SonicV2Connector,
+    ConfigDBConnector and the redis clients they hand out
+  - subprocess spawns and how long they ran
+  - render time, spent in tabulate and writing to stdout
+
+and emits a JSON summary at exit. SONIC_CLI_PROFILE=1 (or 'stderr') writes
+it to stderr, any other value is a file the summary is appended to as one
+JSON line. The variable is inherited by the tools the CLI spawns, so that
+every process of a command reports.
+
+Importing utilities_common enables profiling when SONIC_CLI_PROFILE is set,
+so the scripts get it without any code of their own.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+PROFILE_ENV_VAR = 'SONIC_CLI_PROFILE'
+STDERR = 'stderr'
+
+# Connector methods recorded as DB commands, the DB name is their first argument
+SONIC_V2_CONNECTOR_METHODS = [
+    'keys', 'get', 'get_all', 'set', 'hexists', 'exists', 'delete', 'delete_all_by_pattern', 'publish', 'hmset'
+]
+# ConfigDBConnector methods, recorded against the DB the connector is connected to
+CONFIG_DB_CONNECTOR_METHODS = [
+    'get_table', 'get_entry', 'get_keys', 'set_entry', 'mod_entry', 'mod_config', 'get_config', 'delete_table'
+]
+
+# Longest command line kept for a subprocess in the summary
+MAX_COMMAND_LENGTH = 120
+
+_profiler = None
+
+
+class Profiler(object):
+    def __init__(self, output):
+        self.output = output
+        self.start = time.time()
+        self.process_start = process_start_time() or self.start
+        self.first_command = None
+        self.db = defaultdict(lambda: {'commands': 0, 'round_trips': 0, 'time': 0.0, 'ops': defaultdict(int)})
+        self.subprocesses = []
+        self.render_time = 0.0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def _started(self):
+        if self.first_command is None:
+            self.first_command = time.time()
+
+    def record_db(self, db_name, op, elapsed, commands=1, round_trips=1):
+        with self.lock:
+            self._started()
+            stats = self.db[db_name]
+            stats['commands'] += commands
+            stats['round_trips'] += round_trips
+            stats['time'] += elapsed
+            stats['ops'][op] += commands
+
+    def record_subprocess(self, command, elapsed):
+        with self.lock:
+            self._started()
+            self.subprocesses.append({'command': command, 'time': round(elapsed, 6)})
+
+    def record_render(self, elapsed):
+        with self.lock:
+            self.render_time += elapsed
+
+    def nested(self):
+        """
+        Return True if a recorded call is already in progress in this
+        thread, so that calls made by the recorded ones are not counted twice.
+        """
+        return getattr(self.local, 'depth', 0) > 0
+
+    def enter(self):
+        self.local.depth = getattr(self.local, 'depth', 0) + 1
+
+    def leave(self):
+        self.local.depth -= 1
+
+    def summary(self):
+        end = time.time()
+        db = {}
+        for db_name, stats in sorted(self.db.items()):
+            db[db_name] = {
+                'commands': stats['commands'],
+                'round_trips': stats['round_trips'],
+                'time': round(stats['time'], 6),
+                'ops': dict(sorted(stats['ops'].items())),
+            }
+        return {
+            'command': sys.argv,
+            'pid': os.getpid(),
+            'wall_time': round(end - self.process_start, 6),
+            'import_time': round((self.first_command or end) - self.process_start, 6),
+            'db': db,
+            'db_time': round(sum(stats['time'] for stats in self.db.values()), 6),
+            'subprocess': {
+                'count': len(self.subprocesses),
+                'time': round(sum(s['time'] for s in self.subprocesses), 6),
+                'spawns': self.subprocesses,
+            },
+            'render_time': round(self.render_time, 6),
+        }
+
+    def emit(self):
+        summary = json.dumps(self.summary(), sort_keys=True)
+        if self.output == STDERR:
+            sys.stderr.write(summary + '\n')
+            sys.stderr.flush()
+        else:
+            with open(self.output, 'a') as f:
+                f.write(summary + '\n')
+
+
+def process_start_time():
+    """
+    Return the epoch time the current process started, or None if it
+    cannot be read from /proc.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # the command name may contain spaces, the fields after it do not
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        started_after_boot = float(fields[19]) / os.sysconf('SC_CLK_TCK')
+        return time.time() - (uptime - started_after_boot)
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+
+
+def is_enabled():
+    return _profiler is not None
+
+
+def get_profiler():
+    return _profiler
+
+
+def _timed(record):
+    """
+    Decorator factory: call the wrapped function and pass the elapsed time
+    to record(self, args, elapsed), unless called from a recorded call.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None or profiler.nested():
+                return func(*args, **kwargs)
+            profiler.enter()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.leave()
+                record(profiler, args, time.perf_counter() - start)
+        wrapper._profiled = True
+        return wrapper
+    return decorator
+
+
+class ProfiledClient(object):
+    """
+    Redis client proxy recording every command as a round trip to <db_name>,
+    and every pipeline execute as one round trip for all its commands.
+    """
+    def __init__(self, client, db_name):
+        self._client = client
+        self._db_name = db_name
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        if name == 'pipeline':
+            def pipeline(*args, **kwargs):
+                return ProfiledPipeline(attr(*args, **kwargs), self._db_name)
+            return pipeline
+        db_name = self._db_name
+        return _timed(lambda profiler, args, elapsed: profiler.record_db(db_name, name, elapsed))(attr)
+
+
+class ProfiledPipeline(object):
+    def __init__(self, pipeline, db_name):
+        self._pipeline = pipeline
+        self._db_name = db_name
+        self._queued = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._pipeline, name)
+        if not callable(attr):
+            return attr
+
+        def queue(*args, **kwargs):
+            self._queued += 1
+            result = attr(*args, **kwargs)
+            # commands return the pipeline itself for chaining
+            return self if result is self._pipeline else result
+        return queue
+
+    def execute(self, *args, **kwargs):
+        queued, self._queued = self._queued, 0
+        start = time.perf_counter()
+        try:
+            return self._pipeline.execute(*args, **kwargs)
+        finally:
+            if _profiler is not None:
+                _profiler.record_db(self._db_name, 'pipeline', time.perf_counter() - start, queued, 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return self._pipeline.__exit__(*args)
+
+
+def profile_client(client, db_name):
+    """
+    Return <client> wrapped in a ProfiledClient if profiling is enabled,
+    <client> itself otherwise.
+    """
+    if _profiler is None or isinstance(client, ProfiledClient):
+        return client
+    return ProfiledClient(client, db_name)
+
+
+def _config_db_name(connector):
+    for attr in ['db_name', 'getDbName']:
+        value = getattr(connector, attr, None)
+        if callable(value):
+            value = value()
+        if value:
+            return value
+    return 'CONFIG_DB'
+
+
+def _patch(cls, name, record):
+    func = cls.__dict__.get(name)
+    if func is None or getattr(func, '_profiled', False):
+        return
+    setattr(cls, name, _timed(record)(func))
+
+
+def _patch_connectors():
+    from swsscommon import swsscommon
+
+    def record_v2(profiler, args, elapsed, op=None):
+        if len(args) > 1:
+            profiler.record_db(args[1], op, elapsed)
+
+    def record_config(profiler, args, elapsed, op=None):
+        profiler.record_db(_config_db_name(args[0]), op, elapsed)
+
+    for cls_name in ['SonicV2Connector', 'ConfigDBConnector', 'ConfigDBPipeConnector']:
+        cls = getattr(swsscommon, cls_name, None)
+        if cls is None:
+            continue
+        for klass in cls.__mro__:
+            if klass is object:
+                continue
+            for name in SONIC_V2_CONNECTOR_METHODS:
+                _patch(klass, name, functools.partial(record_v2, op=name))
+            for name in CONFIG_DB_CONNECTOR_METHODS:
+                _patch(klass, name, functools.partial(record_config, op=name))
+
+            get_redis_client = klass.__dict__.get('get_redis_client')
+            if get_redis_client is not None and not getattr(get_redis_client, '_profiled', False):
+                def profiled_get_redis_client(self, *args, _get_redis_client=get_redis_client):
+                    db_name = args[0] if args else _config_db_name(self)
+                    return profile_client(_get_redis_client(self, *args), db_name)
+                profiled_get_redis_client._profiled = True
+                setattr(klass, 'get_redis_client', profiled_get_redis_client)
+
+
+def _format_command(args):
+    if isinstance(args, (list, tuple)):
+        args = ' '.join(str(arg) for arg in args)
+    return str(args)[:MAX_COMMAND_LENGTH]
+
+
+def _patch_subprocess():
+    import subprocess
+
+    if getattr(subprocess.Popen, '_profiled', False):
+        return
+
+    class ProfiledPopen(subprocess.Popen):
+        _profiled = True
+
+        def __init__(self, args, *posargs, **kwargs):
+            self._profile_command = _format_command(args)
+            self._profile_start = time.perf_counter()
+            self._profile_recorded = False
+            super(ProfiledPopen, self).__init__(args, *posargs, **kwargs)
+
+        def _profile_record(self):
+            if not self._profile_recorded and self.returncode is not None and _profiler is not None:
+                self._profile_recorded = True
+                _profiler.record_subprocess(self._profile_command, time.perf_counter() - self._profile_start)
+
+        def wait(self, *args, **kwargs):
+            try:
+                return super(ProfiledPopen, self).wait(*args, **kwargs)
+            finally:
+                self._profile_record()
+
+        def poll(self):
+            try:
+                return super(ProfiledPopen, self).poll()
+            finally:
+                self._profile_record()
+
+    subprocess.Popen = ProfiledPopen
+
+    system = os.system
+
+    def profiled_system(command):
+        start = time.perf_counter()
+        try:
+            return system(command)
+        finally:
+            if _profiler is not None:
+                _profiler.record_subprocess(_format_command(command), time.perf_counter() - start)
+    os.system = profiled_system
+
+
+class ProfiledStream(object):
+    """
+    Output stream proxy recording the time spent writing as render time.
+    """
+    def __init__(self, stream):
+        self._stream = stream
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def write(self, data):
+        start = time.perf_counter()
+        try:
+            return self._stream.write(data)
+        finally:
+            if _profiler is not None:
+                _profiler.record_render(time.perf_counter() - start)
+
+
+def _patch_render():
+    try:
+        import tabulate
+    except ImportError:
+        return
+
+    tabulate_func = tabulate.tabulate
+    if not getattr(tabulate_func, '_profiled', False):
+        profiled_tabulate = _timed(lambda profiler, args, elapsed: profiler.record_render(elapsed))(tabulate_func)
+        tabulate.tabulate = profiled_tabulate
+        # modules imported before profiling was enabled hold the original function
+        for module in list(sys.modules.values()):
+            if getattr(module, '__dict__', {}).get('tabulate') is tabulate_func:
+                module.tabulate = profiled_tabulate
+
+    if not isinstance(sys.stdout, ProfiledStream):
+        sys.stdout = ProfiledStream(sys.stdout)
+
+
+def enable(output=None):
+    """
+    Enable profiling and emit the summary to <output> at exit, the value of
+    SONIC_CLI_PROFILE or stderr by default. Profiling is also enabled in
+    the processes spawned from now on.
+    """
+    global _profiler
+
+    if _profiler is not None:
+        return _profiler
+
+    output = output or os.environ.get(PROFILE_ENV_VAR) or STDERR
+    if output in ['1', 'true', 'yes']:
+        output = STDERR
+    os.environ[PROFILE_ENV_VAR] = output
+
+    _profiler = Profiler(output)
+    _patch_connectors()
+    _patch_subprocess()
+    _patch_render()
+    atexit.register(_profiler.emit)
+    return _profiler
+
+
+def disable():
+    """
+    Stop profiling without emitting the summary. The patched functions stay
+    in place but no longer record anything.
+    """
+    global _profiler
+
+    if _profiler is None:
+        return
+    atexit.unregister(_profiler.emit)
+    if isinstance(sys.stdout, ProfiledStream):
+        sys.stdout = sys.stdout._stream
+    _profiler = None
+
+
+def enable_from_env():
+    """
+    Enable profiling if SONIC_CLI_PROFILE is set.
+    """
+    if os.environ.get(PROFILE_ENV_VAR) not in [None, '', '0']:
+        enable()
+
+
+def enable_profile_callback(ctx, param, value):
+    if value and not ctx.resilient_parsing:
+        enable()
+
+
+def profile_option(func):
+    """
+    Decorator adding the hidden --profile option to a click group.
+    """
+    import click
+    return click.option('--profile', is_flag=True, hidden=True, expose_value=False, is_eager=True,
+                        callback=enable_profile_callback,
+                        help='Emit a JSON profile of the command to stderr')(func)
@@ -0,0 +1,180 @@
+"""
+In-memory staging of ConfigDBConnector reads and writes.
+
+StagedDBConnector wraps a connected ConfigDBConnector and serves the
+typed (get_table/set_entry/...) and raw (get/set/keys/delete) calls from
+an in-memory copy of the database. Each table is read once, with SCAN and
+pipelined HGETALL, the first time it is touched. Writes only change the
+copy; flush() then writes the net difference against what was read in a
+single pipeline, and diff() reports that difference without writing it.
+"""
+
+import fnmatch
+
+from utilities_common.db_pipeline import get_pipelined_client, hgetall_batched, scan_keys
+
+
+class StagedDBConnector(object):
+    def __init__(self, connector, db_name, unix_socket_path=None):
+        self.connector = connector
+        self.db_name = db_name
+        self.separator = connector.TABLE_NAME_SEPARATOR
+        self._client = get_pipelined_client(connector, db_name, unix_socket_path)
+        self._original = {}
+        self._data = {}
+        self._loaded_tables = set()
+        self._all_loaded = False
+
+    def __getattr__(self, name):
+        # DB ids, separators and key/value conversion helpers come from the wrapped connector
+        return getattr(self.connector, name)
+
+    # Loading
+
+    def _load(self, pattern):
+        for key, fvs in hgetall_batched(self._client, scan_keys(self._client, pattern)):
+            if key not in self._original:
+                self._original[key] = fvs
+                self._data[key] = dict(fvs)
+
+    def _load_table(self, table):
+        if self._all_loaded or table in self._loaded_tables:
+            return
+        self._load(table + self.separator + '*')
+        # keys without a separator are their own table
+        if self._client.exists(table):
+            self._load(table)
+        self._loaded_tables.add(table)
+
+    def _load_key(self, key):
+        self._load_table(key.split(self.separator, 1)[0])
+
+    def _load_pattern(self, pattern):
+        table = pattern.split(self.separator, 1)[0]
+        if any(c in table for c in '*?['):
+            if not self._all_loaded:
+                self._load('*')
+                self._all_loaded = True
+        else:
+            self._load_table(table)
+
+    def _hash(self, table, key):
+        return '{}{}{}'.format(table, self.separator, self.connector.serialize_key(key))
+
+    # Typed API
+
+    def get_table(self, table):
+        self._load_table(table)
+        prefix = table + self.separator
+        data = {}
+        for key, fvs in self._data.items():
+            if key.startswith(prefix):
+                data[self.connector.deserialize_key(key[len(prefix):])] = self.connector.raw_to_typed(dict(fvs))
+        return data
+
+    def get_keys(self, table, split=True):
+        self._load_table(table)
+        prefix = table + self.separator
+        keys = []
+        for key in self._data:
+            if key.startswith(prefix):
+                key = key[len(prefix):]
+                keys.append(self.connector.deserialize_key(key) if split else key)
+        return keys
+
+    def get_entry(self, table, key):
+        self._load_table(table)
+        return self.connector.raw_to_typed(dict(self._data.get(self._hash(table, key), {})))
+
+    def set_entry(self, table, key, data):
+        self._load_table(table)
+        _hash = self._hash(table, key)
+        if data is None:
+            self._data.pop(_hash, None)
+        else:
+            self._data[_hash] = self.connector.typed_to_raw(data)
+
+    def mod_entry(self, table, key, data):
+        self._load_table(table)
+        _hash = self._hash(table, key)
+        if data is None:
+            self._data.pop(_hash, None)
+        else:
+            self._data.setdefault(_hash, {}).update(self.connector.typed_to_raw(data))
+
+    def delete_table(self, table):
+        self._load_table(table)
+        prefix = table + self.separator
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+    # Raw API, <db_id> is accepted for compatibility with SonicV2Connector
+
+    def keys(self, db_id, pattern='*'):
+        self._load_pattern(pattern)
+        return [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+
+    def get(self, db_id, key, field):
+        self._load_key(key)
+        return self._data.get(key, {}).get(field)
+
+    def get_all(self, db_id, key):
+        self._load_key(key)
+        return dict(self._data.get(key, {}))
+
+    def exists(self, db_id, key):
+        self._load_key(key)
+        return key in self._data
+
+    def set(self, db_id, key, field, value):
+        self._load_key(key)
+        self._data.setdefault(key, {})[field] = value
+
+    def delete(self, db_id, key):
+        self._load_key(key)
+        self._data.pop(key, None)
+
+    # Diff and flush
+
+    def diff(self):
+        """
+        Return a sorted list of (key, fields to set, fields to delete)
+        against the database content that was read. Fields to set is
+        None for keys that were deleted.
+        """
+        changes = []
+        for key in sorted(set(self._original) | set(self._data)):
+            old = self._original.get(key)
+            new = self._data.get(key)
+            if new is None:
+                changes.append((key, None, []))
+            elif old != new:
+                old = old or {}
+                to_set = {f: v for f, v in new.items() if old.get(f) != v}
+                to_del = sorted(f for f in old if f not in new)
+                changes.append((key, to_set, to_del))
+        return changes
+
+    def flush(self):
+        """
+        Write the net difference in one pipeline and return the number
+        of keys changed.
+        """
+        changes = self.diff()
+        if not changes:
+            return 0
+
+        pipe = self._client.pipeline(transaction=False) if hasattr(self._client, 'pipeline') else self._client
+        for key, to_set, to_del in changes:
+            if to_set is None:
+                pipe.delete(key)
+                continue
+            for field, value in to_set.items():
+                pipe.hset(key, field, value)
+            for field in to_del:
+                pipe.hdel(key, field)
+        if pipe is not self._client:
+            pipe.execute()
+
+        self._original = {key: dict(fvs) for key, fvs in self._data.items()}
+        return len(changes)